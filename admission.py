@@ -0,0 +1,242 @@
+# admission.py
+"""
+Admission control for the expensive endpoints.
+
+Routes are grouped into classes (ROUTE_CLASSES): auth (bcrypt on login and
+signup) and upload (resume uploads, bulk imports). Each class has its own
+concurrency limit, a bounded wait queue and a queue-time deadline; a request
+that finds the queue full, or is still waiting when its deadline passes, is
+shed with a 503 and Retry-After before it touches the threadpool or the hash
+pool. Auth routes are additionally rate limited per client with a token
+bucket (429). Everything else, notably the cheap reads, is never queued here,
+so a flood of logins or uploads cannot take their worker threads.
+
+AdmissionMiddleware is installed by main.py when ADMISSION_ENABLED is set.
+Limits are per process and the limiters assume one event loop per process
+(one uvicorn worker).
+"""
+import asyncio
+import math
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Dict, List, Optional, Pattern, Sequence, Tuple
+
+from fastapi.responses import JSONResponse
+from starlette.routing import compile_path
+
+import metrics
+
+
+def _env_bool(name: str, default: str) -> bool:
+    return os.getenv(name, default).lower() in ("1", "true", "yes")
+
+
+ADMISSION_ENABLED = _env_bool("ADMISSION_ENABLED", "true")
+ADMISSION_RETRY_AFTER_SECONDS = int(os.getenv("ADMISSION_RETRY_AFTER_SECONDS", "1"))
+
+# per-client token bucket on the auth routes (0 per minute = off)
+AUTH_RATE_LIMIT_PER_MINUTE = float(os.getenv("AUTH_RATE_LIMIT_PER_MINUTE", "30"))
+AUTH_RATE_LIMIT_BURST = int(os.getenv("AUTH_RATE_LIMIT_BURST", "10"))
+RATE_LIMIT_MAX_CLIENTS = int(os.getenv("RATE_LIMIT_MAX_CLIENTS", "10000"))
+# take the client address from X-Forwarded-For (only behind a proxy that sets it)
+RATE_LIMIT_TRUST_FORWARDED = _env_bool("RATE_LIMIT_TRUST_FORWARDED", "false")
+
+# class -> (method, path template) of its routes
+ROUTE_CLASSES: Dict[str, Sequence[Tuple[str, str]]] = {
+    "auth": (
+        ("POST", "/api/login"),
+        ("POST", "/api/signup"),
+    ),
+    "upload": (
+        ("POST", "/api/jobs/{job_id}/apply"),
+        ("POST", "/api/jobs/import"),
+    ),
+}
+
+# class -> (concurrency, queue length, queue timeout seconds) defaults
+CLASS_DEFAULTS = {
+    "auth": (8, 32, 2.0),
+    "upload": (8, 16, 5.0),
+}
+
+
+# ======================
+# Limiters
+# ======================
+class ConcurrencyLimiter:
+    """
+    At most `limit` requests at once; up to `max_queue` more wait in FIFO
+    order for at most `queue_timeout` seconds. acquire() returns False when
+    the request should be shed.
+    """
+
+    def __init__(self, limit: int, max_queue: int, queue_timeout: float):
+        self.limit = limit
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self._waiters: deque = deque()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> bool:
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            return True
+        if len(self._waiters) >= self.max_queue:
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            done, _ = await asyncio.wait((waiter,), timeout=self.queue_timeout)
+        except asyncio.CancelledError:
+            self._abandon(waiter)
+            raise
+        if not done:
+            self._abandon(waiter)
+            return False
+        return True
+
+    def _abandon(self, waiter: asyncio.Future):
+        if waiter.done() and not waiter.cancelled():
+            # the slot was handed over just as we gave up: pass it on
+            self.release()
+            return
+        waiter.cancel()
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def release(self):
+        # hand the slot straight to the oldest live waiter, so `active` is unchanged
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+
+class TokenBucket:
+    """Per-key token buckets; the least recently seen keys are dropped past max_keys."""
+
+    def __init__(self, rate_per_second: float, burst: int, max_keys: int):
+        self.rate = rate_per_second
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key: str) -> float:
+        """0 when a token was taken, else seconds until one is available."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.pop(key, (float(self.burst), now))
+            tokens = min(float(self.burst), tokens + (now - last) * self.rate)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0.0
+            else:
+                wait = (1 - tokens) / self.rate
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return wait
+
+
+def _class_limiter(name: str) -> ConcurrencyLimiter:
+    concurrency, queue, timeout = CLASS_DEFAULTS[name]
+    prefix = f"ADMISSION_{name.upper()}"
+    return ConcurrencyLimiter(
+        int(os.getenv(f"{prefix}_CONCURRENCY", str(concurrency))),
+        int(os.getenv(f"{prefix}_QUEUE", str(queue))),
+        float(os.getenv(f"{prefix}_QUEUE_TIMEOUT_SECONDS", str(timeout))),
+    )
+
+
+limiters: Dict[str, ConcurrencyLimiter] = {name: _class_limiter(name) for name in ROUTE_CLASSES}
+
+rate_limits: Dict[str, TokenBucket] = {}
+if AUTH_RATE_LIMIT_PER_MINUTE > 0:
+    rate_limits["auth"] = TokenBucket(AUTH_RATE_LIMIT_PER_MINUTE / 60, AUTH_RATE_LIMIT_BURST,
+                                      RATE_LIMIT_MAX_CLIENTS)
+
+
+# ======================
+# Classification
+# ======================
+_ROUTES: List[Tuple[str, Pattern, str]] = [
+    (method, compile_path(path)[0], name)
+    for name, routes in ROUTE_CLASSES.items()
+    for method, path in routes
+]
+
+
+def classify(method: str, path: str) -> Optional[str]:
+    # the app mounts no sub-paths, so the raw path is what the routes match against
+    for route_method, pattern, name in _ROUTES:
+        if method == route_method and pattern.match(path):
+            return name
+    return None
+
+
+def client_key(scope) -> str:
+    if RATE_LIMIT_TRUST_FORWARDED:
+        for name, value in scope.get("headers", ()):
+            if name == b"x-forwarded-for":
+                return value.decode("latin-1").split(",")[0].strip()
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+# ======================
+# Middleware
+# ======================
+def _reject(status_code: int, retry_after: float, message: str, error: str) -> JSONResponse:
+    return JSONResponse(
+        status_code=status_code,
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        content={"success": False, "message": message, "object": None, "errors": [error]},
+    )
+
+
+class AdmissionMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        name = classify(scope["method"], scope["path"]) if scope["type"] == "http" else None
+        if name is None:
+            await self.app(scope, receive, send)
+            return
+
+        bucket = rate_limits.get(name)
+        if bucket is not None:
+            wait = bucket.take(client_key(scope))
+            if wait:
+                metrics.admission_rejected.inc((name, "rate_limited"))
+                response = _reject(429, wait, "Too many requests, please retry later", "Rate limited")
+                await response(scope, receive, send)
+                return
+
+        limiter = limiters[name]
+        if not await limiter.acquire():
+            metrics.admission_rejected.inc((name, "overloaded"))
+            response = _reject(503, ADMISSION_RETRY_AFTER_SECONDS, "Server is busy, please retry shortly",
+                               "Overloaded")
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release()
+
+
+def install(app):
+    app.add_middleware(AdmissionMiddleware)
@@ -0,0 +1,169 @@
+# archive.py
+"""
+Hot/archive separation for closed jobs.
+
+Closed jobs whose last change is older than ARCHIVE_AFTER_DAYS are moved,
+together with their applications and final application counters, from jobs
+and applications into jobs_archive and applications_archive. Each batch of
+ARCHIVE_BATCH_SIZE jobs is one short transaction that copies the rows, deletes
+them from the hot tables (the search triggers drop them from the index) and
+takes them out of the facet counts, so browse, search, counts and the hot
+indexes only ever cover live postings and stay small as history grows.
+
+The Archiver runs in the background of every worker process, once per
+ARCHIVE_INTERVAL_SECONDS, pausing between batches so that it never holds the
+write lock for long. Batches of concurrent archivers do not overlap on
+Postgres (SKIP LOCKED); on SQLite the loser of a race rolls back and retries
+on its next run. `python manage.py archive-jobs` drains the backlog once.
+
+Reads use the hot tables unless a caller opts in (include_archived on the
+company's job list and on job details).
+"""
+import logging
+import os
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import func, insert, literal, select
+from sqlalchemy.orm import Session
+
+import catalog
+import counters
+import facets
+import models
+from database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+def _env_bool(name: str, default: str) -> bool:
+    return os.getenv(name, default).lower() in ("1", "true", "yes")
+
+
+ARCHIVE_ENABLED = _env_bool("ARCHIVE_ENABLED", "true")
+ARCHIVE_AFTER_DAYS = float(os.getenv("ARCHIVE_AFTER_DAYS", "180"))
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "200"))
+ARCHIVE_INTERVAL_SECONDS = float(os.getenv("ARCHIVE_INTERVAL_SECONDS", "3600"))
+ARCHIVE_BATCH_PAUSE_SECONDS = float(os.getenv("ARCHIVE_BATCH_PAUSE_SECONDS", "0.2"))
+
+Job, Application, Stats = models.Job, models.Application, models.JobApplicationStats
+
+# columns copied as they are; the archive tables add the counters and archived_at
+JOB_COLUMNS = [column.name for column in Job.__table__.columns]
+APPLICATION_COLUMNS = [column.name for column in Application.__table__.columns]
+COUNTER_COLUMNS = [column.name for column in counters.COLUMNS]
+
+
+def cutoff(now: Optional[datetime] = None, after_days: float = ARCHIVE_AFTER_DAYS) -> datetime:
+    return (now or datetime.utcnow()) - timedelta(days=after_days)
+
+
+def archive_batch(db: Session, before: datetime, limit: int = ARCHIVE_BATCH_SIZE) -> int:
+    """Archives up to `limit` jobs closed and unchanged since `before`, and commits; returns how many."""
+    candidates = (
+        db.query(Job.id, Job.location, Job.created_by, Job.status)
+        .filter(Job.status == models.JobStatus.closed, Job.updated_at < before)
+        .order_by(Job.updated_at)
+        .limit(limit)
+    )
+    if db.get_bind().dialect.name == "postgresql":
+        candidates = candidates.with_for_update(skip_locked=True)
+    jobs = candidates.all()
+    if not jobs:
+        db.rollback()
+        return 0
+
+    job_ids = [job.id for job in jobs]
+    archived_at = literal(datetime.utcnow(), models.JobArchive.archived_at.type)
+    try:
+        db.execute(insert(models.JobArchive).from_select(
+            JOB_COLUMNS + COUNTER_COLUMNS + ["archived_at"],
+            select(*[getattr(Job, name) for name in JOB_COLUMNS],
+                   *[func.coalesce(column, 0) for column in counters.COLUMNS], archived_at)
+            .outerjoin(Stats, Stats.job_id == Job.id)
+            .where(Job.id.in_(job_ids)),
+        ))
+        db.execute(insert(models.ApplicationArchive).from_select(
+            APPLICATION_COLUMNS + ["archived_at"],
+            select(*[getattr(Application, name) for name in APPLICATION_COLUMNS], archived_at)
+            .where(Application.job_id.in_(job_ids)),
+        ))
+        db.query(Application).filter(Application.job_id.in_(job_ids)).delete(synchronize_session=False)
+        db.query(Stats).filter(Stats.job_id.in_(job_ids)).delete(synchronize_session=False)
+        db.query(Job).filter(Job.id.in_(job_ids)).delete(synchronize_session=False)
+        facets.record(db, removed=[(job.location, job.created_by, job.status) for job in jobs])
+        catalog.bump(db)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return len(job_ids)
+
+
+def archive_all(session_factory=SessionLocal, before: Optional[datetime] = None,
+                batch_size: int = ARCHIVE_BATCH_SIZE, pause: float = 0, stop: Optional[threading.Event] = None) -> int:
+    """Archives batch after batch until nothing is left (or `stop` is set); returns the number of jobs archived."""
+    before = before or cutoff()
+    archived = 0
+    while stop is None or not stop.is_set():
+        db = session_factory()
+        try:
+            moved = archive_batch(db, before, batch_size)
+        finally:
+            db.close()
+        archived += moved
+        if moved < batch_size:
+            break
+        if pause:
+            time.sleep(pause)
+    return archived
+
+
+class Archiver:
+    def __init__(self, session_factory=SessionLocal):
+        self.session_factory = session_factory
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="job-archiver", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 10):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        # spread the workers' runs apart
+        self._stop.wait(random.uniform(0, min(ARCHIVE_INTERVAL_SECONDS, 60)))
+        while not self._stop.is_set():
+            try:
+                archived = archive_all(self.session_factory, pause=ARCHIVE_BATCH_PAUSE_SECONDS, stop=self._stop)
+                if archived:
+                    logger.info("Archived %d closed job(s)", archived)
+            except Exception:
+                logger.exception("Job archiving failed")
+            self._stop.wait(ARCHIVE_INTERVAL_SECONDS)
+
+
+_archiver: Optional[Archiver] = None
+
+
+def start_archiver():
+    global _archiver
+    if ARCHIVE_ENABLED and _archiver is None:
+        _archiver = Archiver()
+        _archiver.start()
+
+
+def stop_archiver():
+    global _archiver
+    if _archiver is not None:
+        _archiver.stop()
+        _archiver = None
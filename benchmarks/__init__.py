@@ -0,0 +1,17 @@
+"""
+Benchmarks for the Job Portal API.
+
+    python -m benchmarks.datagen --applicants 2000 --companies 50 --jobs-per-company 20 --seed 1
+    python -m benchmarks.micro
+    python -m benchmarks.load --requests 5000 --concurrency 32
+    python -m benchmarks.compare benchmarks/results/old.json benchmarks/results/new.json
+
+Everything runs against the database in DATABASE_URL (point it at a scratch
+database, e.g. sqlite:///./bench.db) and writes a JSON result file under
+benchmarks/results/ tagged with the current git commit, so runs from two
+commits can be compared.
+"""
+from dotenv import load_dotenv
+
+# the app modules read their settings at import and no longer load .env themselves
+load_dotenv()
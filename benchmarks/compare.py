@@ -0,0 +1,58 @@
+# benchmarks/compare.py
+"""
+Compares two result files of the same kind.
+
+    python -m benchmarks.compare BASELINE.json CANDIDATE.json [--metric p50_ms ...]
+
+Prints each case/operation with the baseline value, the candidate value and
+the relative change (negative is faster for latencies).
+"""
+import argparse
+import json
+
+DEFAULT_METRICS = ["p50_ms", "p95_ms", "p99_ms"]
+
+
+def _cases(document: dict) -> dict:
+    results = document["results"]
+    if document["kind"] == "load":
+        cases = dict(results["operations"])
+        cases["overall"] = dict(results["overall"], throughput_rps=results["throughput_rps"])
+        return cases
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--metric", action="append", help=f"Metric to compare (default: {', '.join(DEFAULT_METRICS)})")
+    args = parser.parse_args(argv)
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+    if baseline["kind"] != candidate["kind"]:
+        parser.error(f"cannot compare {baseline['kind']} results with {candidate['kind']} results")
+
+    metrics = args.metric or DEFAULT_METRICS
+    if baseline["kind"] == "load" and not args.metric:
+        metrics = metrics + ["throughput_rps"]
+
+    print(f"baseline  {baseline['meta'].get('commit')}  {baseline['meta'].get('timestamp')}")
+    print(f"candidate {candidate['meta'].get('commit')}  {candidate['meta'].get('timestamp')}")
+    base_cases, cand_cases = _cases(baseline), _cases(candidate)
+    for name in base_cases:
+        if name not in cand_cases:
+            continue
+        for metric in metrics:
+            old, new = base_cases[name].get(metric), cand_cases[name].get(metric)
+            if old is None or new is None:
+                continue
+            change = f"{(new - old) / old * 100:+7.1f}%" if old else "    n/a"
+            print(f"{name:40s} {metric:15s} {old:12.3f} {new:12.3f} {change}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+# benchmarks/datagen.py
+"""
+Seeded synthetic data for benchmarks.
+
+    python -m benchmarks.datagen [--applicants N] [--companies N] [--jobs-per-company N]
+                                 [--applications-per-applicant N] [--seed S]
+
+Creates companies, applicants, jobs and applications in DATABASE_URL with
+bulk inserts (the same seed always produces the same rows), then rebuilds the
+application counters, facet counts and the recommendation index. All accounts
+share BENCH_PASSWORD and use @bench.example.com addresses, which is how the
+load driver finds them.
+"""
+import argparse
+import io
+import os
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import List
+
+from sqlalchemy import insert
+
+BENCH_DOMAIN = "bench.example.com"
+BENCH_PASSWORD = "Bench#Passw0rd"
+
+# a minimal PDF; every generated application points at this one stored blob
+SAMPLE_RESUME = b"%PDF-1.4\n1 0 obj <<>> endobj\ntrailer <<>>\n%%EOF\n"
+
+FIRST_NAMES = ["Amina", "Brian", "Chen", "Daniel", "Esther", "Faith", "George", "Hana", "Ivan", "Joy",
+               "Kevin", "Lucy", "Moses", "Njeri", "Omar", "Priya", "Quinn", "Rosa", "Samuel", "Tariq"]
+LAST_NAMES = ["Achieng", "Baker", "Cohen", "Diallo", "Evans", "Fischer", "Garcia", "Hassan", "Ito", "Juma",
+              "Kamau", "Lopez", "Mwangi", "Nakamura", "Otieno", "Patel", "Rossi", "Silva", "Wanjiru", "Zhang"]
+COMPANY_WORDS = ["Acme", "Blue", "Cedar", "Delta", "Ember", "Falcon", "Granite", "Harbor", "Iris", "Juniper"]
+COMPANY_SUFFIXES = ["Labs", "Systems", "Works", "Digital", "Analytics", "Logistics", "Health", "Finance"]
+SENIORITY = ["Junior", "Mid", "Senior", "Lead", "Principal"]
+TECH = ["Python", "Go", "Rust", "Java", "TypeScript", "Data", "Cloud", "Mobile", "Security", "Platform"]
+ROLES = ["Engineer", "Developer", "Analyst", "Architect", "Scientist", "Manager"]
+LOCATIONS = ["Nairobi", "Mombasa", "Kisumu", "Kigali", "Lagos", "Accra", "Cairo", "Remote", None]
+SENTENCES = [
+    "You will design and ship features used by thousands of customers.",
+    "The team owns services end to end, from design reviews to on-call.",
+    "We value clear writing, careful testing and pragmatic decisions.",
+    "Experience with relational databases and HTTP APIs is a plus.",
+    "You will mentor colleagues and help shape our engineering practices.",
+    "The role is hybrid with flexible hours and a learning budget.",
+]
+
+BATCH_SIZE = 5000
+
+# timestamps are spread over the 180 days before this instant, so a seed always yields the same rows
+EPOCH = datetime(2026, 1, 1)
+
+
+def _uuid(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def _insert(db, model, rows: List[dict]):
+    for start in range(0, len(rows), BATCH_SIZE):
+        db.execute(insert(model), rows[start:start + BATCH_SIZE])
+
+
+def generate(db, *, applicants: int, companies: int, jobs_per_company: int,
+             applications_per_applicant: int, seed: int) -> dict:
+    """Inserts the data set (no commit) and returns the row counts."""
+    import catalog
+    import counters
+    import facets
+    import models
+    import storage
+    import utils
+
+    rng = random.Random(seed)
+    now = EPOCH
+    password_hash = utils.hash_password(BENCH_PASSWORD)
+
+    users, company_ids, applicant_ids = [], [], []
+    for i in range(companies):
+        user_id = _uuid(rng)
+        company_ids.append(user_id)
+        users.append({
+            "id": user_id,
+            "name": f"{rng.choice(COMPANY_WORDS)} {rng.choice(COMPANY_SUFFIXES)}",
+            "email": f"company{i}@{BENCH_DOMAIN}",
+            "password": password_hash,
+            "role": models.UserRole.company,
+            "is_verified": 1,
+        })
+    for i in range(applicants):
+        user_id = _uuid(rng)
+        applicant_ids.append(user_id)
+        users.append({
+            "id": user_id,
+            "name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            "email": f"applicant{i}@{BENCH_DOMAIN}",
+            "password": password_hash,
+            "role": models.UserRole.applicant,
+            "is_verified": 1,
+        })
+    _insert(db, models.User, users)
+
+    jobs, open_jobs = [], []
+    for company_id in company_ids:
+        for _ in range(jobs_per_company):
+            job_id = _uuid(rng)
+            status = rng.choices(
+                [models.JobStatus.open, models.JobStatus.draft, models.JobStatus.closed], weights=[8, 1, 1])[0]
+            created_at = now - timedelta(seconds=rng.randint(0, 180 * 24 * 3600))
+            jobs.append({
+                "id": job_id,
+                "title": f"{rng.choice(SENIORITY)} {rng.choice(TECH)} {rng.choice(ROLES)}",
+                "description": " ".join(rng.sample(SENTENCES, 3)),
+                "location": rng.choice(LOCATIONS),
+                "status": status,
+                "created_by": company_id,
+                "created_at": created_at,
+                "updated_at": created_at,
+            })
+            if status == models.JobStatus.open:
+                open_jobs.append((job_id, created_at))
+    _insert(db, models.Job, jobs)
+
+    resume_link = storage.get_backend().save(io.BytesIO(SAMPLE_RESUME)).link
+    statuses = list(models.ApplicationStatus)
+    applications = []
+    for applicant_id in applicant_ids:
+        count = min(len(open_jobs), rng.randint(0, applications_per_applicant))
+        for job_id, created_at in rng.sample(open_jobs, count):
+            applications.append({
+                "id": _uuid(rng),
+                "applicant_id": applicant_id,
+                "job_id": job_id,
+                "resume_link": resume_link,
+                "cover_letter": rng.choice([None, "I would love to join your team."]),
+                "status": rng.choices(statuses, weights=[10, 4, 2, 3, 1])[0],
+                "applied_at": created_at + (now - created_at) * rng.random(),
+            })
+    _insert(db, models.Application, applications)
+
+    counters.recompute(db)
+    facets.recompute(db)
+    catalog.bump(db)
+    return {"companies": companies, "applicants": applicants, "jobs": len(jobs),
+            "open_jobs": len(open_jobs), "applications": len(applications)}
+
+
+def migrate():
+    from alembic import command
+    from alembic.config import Config
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    command.upgrade(Config(os.path.join(root, "alembic.ini")), "head")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Seed the database with synthetic benchmark data")
+    parser.add_argument("--applicants", type=int, default=1000)
+    parser.add_argument("--companies", type=int, default=50)
+    parser.add_argument("--jobs-per-company", type=int, default=20)
+    parser.add_argument("--applications-per-applicant", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--no-migrate", action="store_true", help="Assume the schema is already at head")
+    args = parser.parse_args(argv)
+
+    if not args.no_migrate:
+        migrate()
+
+    import models
+    import recommend
+    from database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        if db.query(models.User.id).filter(models.User.email.like(f"%@{BENCH_DOMAIN}")).first():
+            parser.error("benchmark data is already present; use a fresh database")
+        started = time.perf_counter()
+        counts = generate(
+            db,
+            applicants=args.applicants,
+            companies=args.companies,
+            jobs_per_company=args.jobs_per_company,
+            applications_per_applicant=args.applications_per_applicant,
+            seed=args.seed,
+        )
+        db.commit()
+        recommend.rebuild(db)
+    finally:
+        db.close()
+    print(f"Generated {counts} in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
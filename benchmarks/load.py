@@ -0,0 +1,199 @@
+# benchmarks/load.py
+"""
+In-process load driver.
+
+    python -m benchmarks.load [--requests N] [--concurrency C] [--mix op=weight,...] [--seed S] [--out FILE]
+
+Drives the ASGI app directly through httpx (no network, no server process)
+with a weighted mix of signup, login, browse, job detail, apply and my-jobs
+requests issued by `concurrency` concurrent clients, against data created by
+benchmarks.datagen. Reports p50/p95/p99 latency per operation and overall
+throughput. A request counts as an error when it raises or returns a 4xx/5xx;
+a 200 whose body says success=false (e.g. a duplicate application) is
+counted as rejected.
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+from benchmarks import results
+from benchmarks.datagen import BENCH_DOMAIN, BENCH_PASSWORD, SAMPLE_RESUME, TECH, LOCATIONS
+
+DEFAULT_MIX = {"browse": 40, "detail": 25, "my_jobs": 10, "login": 10, "apply": 10, "signup": 5}
+
+
+def parse_mix(value: str) -> Dict[str, int]:
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"unknown operation {name!r}; choose from {', '.join(DEFAULT_MIX)}")
+        mix[name.strip()] = int(weight)
+    return mix
+
+
+def load_fixtures(sample: int) -> Tuple[List[str], List[str], List[str]]:
+    """Emails of benchmark companies and applicants, and ids of open jobs."""
+    import models
+    from database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        def emails(role):
+            return [email for email, in db.query(models.User.email)
+                    .filter(models.User.role == role, models.User.email.like(f"%@{BENCH_DOMAIN}"))
+                    .limit(sample)]
+
+        jobs = [job_id for job_id, in db.query(models.Job.id)
+                .filter(models.Job.status == models.JobStatus.open).limit(sample * 10)]
+        return emails(models.UserRole.company), emails(models.UserRole.applicant), jobs
+    finally:
+        db.close()
+
+
+class Workload:
+    def __init__(self, client, companies: List[str], applicants: List[str], jobs: List[str]):
+        self.client = client
+        self.companies = companies
+        self.applicants = applicants
+        self.jobs = jobs
+        self.tokens: Dict[str, str] = {}
+        self.signups = 0
+
+    async def _login(self, email: str) -> dict:
+        response = await self.client.post("/api/login", json={"email": email, "password": BENCH_PASSWORD})
+        if response.status_code == 200 and response.json().get("success"):
+            self.tokens[email] = response.json()["object"]["token"]
+        return response
+
+    async def _auth(self, email: str) -> dict:
+        if email not in self.tokens:
+            await self._login(email)
+        return {"Authorization": f"Bearer {self.tokens.get(email, '')}"}
+
+    async def warm_up(self):
+        """Logs every sampled account in once, outside the measurement."""
+        for email in self.companies + self.applicants:
+            await self._login(email)
+
+    async def signup(self, rng: random.Random):
+        self.signups += 1
+        email = f"load-{rng.getrandbits(48):x}-{self.signups}@{BENCH_DOMAIN}"
+        return await self.client.post("/api/signup", json={
+            "name": "Load Tester", "email": email, "password": BENCH_PASSWORD, "role": "applicant"})
+
+    async def login(self, rng: random.Random):
+        return await self._login(rng.choice(self.companies + self.applicants))
+
+    async def browse(self, rng: random.Random):
+        params = rng.choice([{}, {"q": rng.choice(TECH)}, {"location": rng.choice([l for l in LOCATIONS if l])}])
+        params["page"] = rng.randint(1, 3)
+        return await self.client.get("/api/jobs/browse", params=params,
+                                     headers=await self._auth(rng.choice(self.applicants)))
+
+    async def detail(self, rng: random.Random):
+        return await self.client.get(f"/api/jobs/{rng.choice(self.jobs)}",
+                                     headers=await self._auth(rng.choice(self.applicants)))
+
+    async def my_jobs(self, rng: random.Random):
+        return await self.client.get("/api/jobs/my", headers=await self._auth(rng.choice(self.companies)))
+
+    async def apply(self, rng: random.Random):
+        return await self.client.post(
+            f"/api/jobs/{rng.choice(self.jobs)}/apply",
+            files={"resume_file": ("resume.pdf", SAMPLE_RESUME, "application/pdf")},
+            headers=await self._auth(rng.choice(self.applicants)))
+
+
+async def drive(workload: Workload, mix: Dict[str, int], requests: int, concurrency: int, seed: int):
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+    rejected: Dict[str, int] = defaultdict(int)
+    remaining = [requests]
+
+    async def worker(worker_id: int):
+        rng = random.Random(seed * 1000 + worker_id)
+        while remaining[0] > 0:
+            remaining[0] -= 1
+            name = rng.choices(names, weights)[0]
+            started = time.perf_counter()
+            try:
+                response = await getattr(workload, name)(rng)
+            except Exception:
+                errors[name] += 1
+                continue
+            latencies[name].append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors[name] += 1
+            elif not response.json().get("success", True):
+                rejected[name] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    operations = {}
+    for name in names:
+        summary = results.summarize(latencies[name])
+        summary.update(errors=errors[name], rejected=rejected[name])
+        operations[name] = summary
+    completed = sum(len(v) for v in latencies.values())
+    return {
+        "elapsed_s": elapsed,
+        "throughput_rps": completed / elapsed if elapsed else 0.0,
+        "errors": sum(errors.values()),
+        "overall": results.summarize([t for v in latencies.values() for t in v]),
+        "operations": operations,
+    }
+
+
+async def run(args) -> dict:
+    import httpx
+
+    # every simulated user shares one client address; don't rate limit them as a single caller
+    os.environ.setdefault("AUTH_RATE_LIMIT_PER_MINUTE", "0")
+    import main
+
+    companies, applicants, jobs = load_fixtures(args.accounts)
+    if not (companies and applicants and jobs):
+        raise SystemExit("No benchmark data found; run `python -m benchmarks.datagen` first")
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+        workload = Workload(client, companies, applicants, jobs)
+        await workload.warm_up()
+        return await drive(workload, args.mix, args.requests, args.concurrency, args.seed)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a mixed workload against the app in-process")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX,
+                        help="Comma-separated op=weight, ops: " + ", ".join(DEFAULT_MIX))
+    parser.add_argument("--accounts", type=int, default=50, help="Accounts of each role to sample")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", help="Result file (default: benchmarks/results/load-<commit>-<time>.json)")
+    args = parser.parse_args(argv)
+
+    output = asyncio.run(run(args))
+
+    print(f"{output['throughput_rps']:.1f} req/s over {output['elapsed_s']:.1f}s, {output['errors']} errors")
+    for name, summary in output["operations"].items():
+        if summary["count"]:
+            print(f"  {name:8s} n={summary['count']:6d}  p50 {summary['p50_ms']:8.2f} ms  "
+                  f"p95 {summary['p95_ms']:8.2f} ms  p99 {summary['p99_ms']:8.2f} ms  "
+                  f"errors {summary['errors']}  rejected {summary['rejected']}")
+
+    parameters = {k: getattr(args, k) for k in ("requests", "concurrency", "mix", "accounts", "seed")}
+    print(f"Results written to {results.write('load', parameters, output, args.out)}")
+
+
+if __name__ == "__main__":
+    main()
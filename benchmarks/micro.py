@@ -0,0 +1,112 @@
+# benchmarks/micro.py
+"""
+Micro-benchmarks for the per-request building blocks.
+
+    python -m benchmarks.micro [--repeat N] [--only NAME ...] [--out FILE]
+
+Times password hashing and verification (at BCRYPT_ROUNDS), access token
+creation and decoding, and serialization of a BaseResponse / PaginatedResponse
+the way FastAPI renders them, next to the FAST_JSON_RESPONSES path for a typed
+page (see responses.py). Each case runs a warm-up call and then
+`repeat` timed calls; hashing cases default to fewer repetitions.
+"""
+import argparse
+import json
+import time
+import uuid
+from datetime import datetime
+from typing import Callable, Dict
+
+from benchmarks import results
+
+
+def _page_payload(items: int) -> dict:
+    now = datetime.utcnow()
+    return {
+        "items": [
+            {
+                "id": str(uuid.uuid4()),
+                "title": "Senior Python Engineer",
+                "description": "You will design and ship features used by thousands of customers. " * 3,
+                "location": "Nairobi",
+                "status": "Open",
+                "created_at": now,
+                "company_name": "Acme Labs",
+            }
+            for _ in range(items)
+        ],
+        "total": 1000, "page": 1, "size": items, "pages": 1000 // items,
+    }
+
+
+def cases() -> Dict[str, tuple]:
+    """name -> (callable, default repetitions)"""
+    from fastapi.encoders import jsonable_encoder
+
+    import responses
+    import schemas
+    import utils
+
+    password_hash = utils.hash_password("Bench#Passw0rd")
+    token = utils.create_access_token(str(uuid.uuid4()), "applicant")
+    detail = schemas.BaseResponse(success=True, message="Job details fetched", object=_page_payload(1)["items"][0])
+    page = schemas.PaginatedResponse(success=True, message="Jobs fetched successfully", object=_page_payload(100))
+    typed_page_model = schemas.PaginatedResponse[schemas.JobListItem]
+    typed_page = typed_page_model(success=True, message="Jobs fetched successfully", object=_page_payload(100))
+
+    def render(model):
+        # what FastAPI's JSONResponse does with a response_model
+        return json.dumps(jsonable_encoder(model), ensure_ascii=False, separators=(",", ":")).encode()
+
+    def render_validated(model):
+        # a returned model is validated against the response_model again before it is encoded
+        return render(type(model).model_validate(model.model_dump()))
+
+    return {
+        "hash_password": (lambda: utils.hash_password("Bench#Passw0rd"), 20),
+        "verify_password": (lambda: utils.verify_password("Bench#Passw0rd", password_hash), 20),
+        "create_access_token": (lambda: utils.create_access_token("user-id", "applicant"), 5000),
+        "decode_access_token": (lambda: utils.decode_access_token(token), 5000),
+        "base_response_render": (lambda: render(detail), 5000),
+        "paginated_response_100_render": (lambda: render(page), 500),
+        "paginated_response_100_model_dump_json": (lambda: page.model_dump_json().encode(), 500),
+        "typed_page_100_default_render": (lambda: render_validated(typed_page), 500),
+        "typed_page_100_fast_render": (lambda: responses.FastJSONResponse(typed_page).body, 500),
+    }
+
+
+def run_case(fn: Callable, repeat: int) -> dict:
+    fn()  # warm-up
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    summary = results.summarize(timings)
+    summary["ops_per_s"] = len(timings) / sum(timings) if sum(timings) else 0.0
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the micro-benchmarks")
+    parser.add_argument("--repeat", type=int, help="Timed calls per case (default: per-case)")
+    parser.add_argument("--only", action="append", help="Run only this case (repeatable)")
+    parser.add_argument("--out", help="Result file (default: benchmarks/results/micro-<commit>-<time>.json)")
+    args = parser.parse_args(argv)
+
+    import utils
+
+    output = {}
+    for name, (fn, default_repeat) in cases().items():
+        if args.only and name not in args.only:
+            continue
+        output[name] = run_case(fn, args.repeat or default_repeat)
+        print(f"{name:40s} p50 {output[name]['p50_ms']:9.3f} ms   p99 {output[name]['p99_ms']:9.3f} ms"
+              f"   {output[name]['ops_per_s']:10.1f} ops/s")
+
+    path = results.write("micro", {"repeat": args.repeat, "bcrypt_rounds": utils.BCRYPT_ROUNDS}, output, args.out)
+    print(f"Results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# benchmarks/results.py
+"""Latency summaries and the JSON result files shared by the benchmarks."""
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy.engine import make_url
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def percentile(sorted_values: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted sequence."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(latencies_s: List[float]) -> Dict[str, float]:
+    """Count, mean and p50/p95/p99/max of latencies given in seconds, reported in milliseconds."""
+    values = sorted(latencies_s)
+    if not values:
+        return {"count": 0}
+    ms = 1000.0
+    return {
+        "count": len(values),
+        "mean_ms": sum(values) / len(values) * ms,
+        "min_ms": values[0] * ms,
+        "p50_ms": percentile(values, 50) * ms,
+        "p95_ms": percentile(values, 95) * ms,
+        "p99_ms": percentile(values, 99) * ms,
+        "max_ms": values[-1] * ms,
+    }
+
+
+def _git(*args) -> Optional[str]:
+    try:
+        out = subprocess.run(["git", *args], capture_output=True, text=True, timeout=5,
+                             cwd=os.path.dirname(RESULTS_DIR))
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() if out.returncode == 0 else None
+
+
+def metadata() -> dict:
+    from database import DATABASE_URL
+
+    return {
+        "commit": _git("rev-parse", "HEAD"),
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "database": make_url(DATABASE_URL).get_backend_name(),
+    }
+
+
+def write(kind: str, parameters: dict, results: dict, out: Optional[str] = None) -> str:
+    """Writes {kind, meta, parameters, results} as JSON; returns the path."""
+    if out is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        meta_commit = (_git("rev-parse", "--short", "HEAD") or "nogit")
+        out = os.path.join(RESULTS_DIR, f"{kind}-{meta_commit}-{int(time.time())}.json")
+    document = {"kind": kind, "meta": metadata(), "parameters": parameters, "results": results}
+    with open(out, "w") as f:
+        json.dump(document, f, indent=2, sort_keys=True)
+    return out
@@ -0,0 +1,52 @@
+# catalog.py
+"""
+Catalog generation: a single counter row bumped in the same transaction as
+every job create, update, delete or import batch. Browse responses depend on
+the whole catalog, so their ETag and Last-Modified come from it; reading it
+is one primary-key lookup. Job details use the job's own version instead.
+"""
+import uuid
+from datetime import datetime
+from typing import Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+import models
+
+State = models.CatalogState
+
+CATALOG_ID = 1
+
+
+def bump(db: Session):
+    """Advances the generation (no commit); creates the row if it is missing."""
+    updated = (
+        db.query(State)
+        .filter(State.id == CATALOG_ID)
+        .update({State.generation: State.generation + 1, State.updated_at: func.now()},
+                synchronize_session=False)
+    )
+    if not updated:
+        db.add(State(id=CATALOG_ID, generation=1, token=uuid.uuid4().hex))
+
+
+def current(db: Session) -> Tuple[int, Optional[datetime]]:
+    """(generation, updated_at) of the catalog; (0, None) before its first write."""
+    row = db.query(State.generation, State.updated_at).filter(State.id == CATALOG_ID).first()
+    if not row:
+        return 0, None
+    return row.generation, row.updated_at
+
+
+def identity(db: Session) -> Tuple[Optional[str], int]:
+    """
+    (token, generation) of the catalog: the token is random per database, and
+    the generation only grows, so a cache built from this database at some
+    generation is stale when the token differs or the generation went back
+    (a restored backup). (None, 0) before the first write.
+    """
+    row = db.query(State.token, State.generation).filter(State.id == CATALOG_ID).first()
+    if not row:
+        return None, 0
+    return row.token, row.generation
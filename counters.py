@@ -0,0 +1,116 @@
+# counters.py
+"""
+Denormalized application counters per job (job_application_stats).
+
+Every write that adds an application or changes its status updates the
+counters in the same transaction, so the company dashboard reads them with a
+primary-key join instead of counting applications. recompute() rebuilds them
+from the applications table if they ever drift (`python manage.py
+repair-counters`).
+"""
+from typing import Iterable, Optional
+
+from sqlalchemy import func, insert
+from sqlalchemy.orm import Session
+
+import models
+
+Stats = models.JobApplicationStats
+
+# counter column for each application status (column names match the enum names)
+STATUS_COLUMNS = {status: getattr(Stats, status.name) for status in models.ApplicationStatus}
+
+# every counter column, for selecting them next to other columns
+COLUMNS = (Stats.total, *STATUS_COLUMNS.values())
+
+
+def create(db: Session, job_id: str):
+    """Adds the zeroed counter row for a new job."""
+    db.add(Stats(job_id=job_id, total=0, **{status.name: 0 for status in models.ApplicationStatus}))
+
+
+def create_many(db: Session, job_ids: Iterable[str]):
+    """Zeroed counter rows for a batch of new jobs, in one executemany."""
+    zeros = {status.name: 0 for status in models.ApplicationStatus}
+    rows = [{"job_id": job_id, "total": 0, **zeros} for job_id in job_ids]
+    if rows:
+        db.execute(insert(Stats), rows)
+
+
+def delete(db: Session, job_id: str):
+    db.query(Stats).filter(Stats.job_id == job_id).delete(synchronize_session=False)
+
+
+def record_application(db: Session, job_id: str, status: models.ApplicationStatus = models.ApplicationStatus.applied,
+                       count: int = 1):
+    column = STATUS_COLUMNS[status]
+    updated = (
+        db.query(Stats)
+        .filter(Stats.job_id == job_id)
+        .update({Stats.total: Stats.total + count, column: column + count}, synchronize_session=False)
+    )
+    if not updated:
+        # job predates the counters: build its row from the applications themselves
+        db.flush()
+        recompute(db, [job_id])
+
+
+def record_transition(db: Session, job_id: str, old: models.ApplicationStatus, new: models.ApplicationStatus,
+                      count: int = 1):
+    if old == new or count == 0:
+        return
+    old_column, new_column = STATUS_COLUMNS[old], STATUS_COLUMNS[new]
+    updated = (
+        db.query(Stats)
+        .filter(Stats.job_id == job_id)
+        .update({old_column: old_column - count, new_column: new_column + count}, synchronize_session=False)
+    )
+    if not updated:
+        db.flush()
+        recompute(db, [job_id])
+
+
+def recompute(db: Session, job_ids: Optional[Iterable[str]] = None) -> int:
+    """
+    Rebuilds counters from the applications table, for the given jobs or for
+    all of them, and drops rows of jobs that no longer exist. Returns the
+    number of counter rows written. Does not commit.
+    """
+    jobs = db.query(models.Job.id)
+    if job_ids is not None:
+        job_ids = list(job_ids)
+        jobs = jobs.filter(models.Job.id.in_(job_ids))
+    job_id_list = [job_id for job_id, in jobs]
+
+    counts = {job_id: {status: 0 for status in models.ApplicationStatus} for job_id in job_id_list}
+    rows = (
+        db.query(models.Application.job_id, models.Application.status, func.count(models.Application.id))
+        .group_by(models.Application.job_id, models.Application.status)
+    )
+    if job_ids is not None:
+        rows = rows.filter(models.Application.job_id.in_(job_ids))
+    for job_id, status, count in rows:
+        if job_id in counts:
+            counts[job_id][status] = count
+
+    stale = db.query(Stats)
+    if job_ids is not None:
+        stale = stale.filter(Stats.job_id.in_(job_ids))
+    stale.delete(synchronize_session=False)
+
+    if counts:
+        db.execute(insert(Stats), [
+            {"job_id": job_id, "total": sum(by_status.values()),
+             **{status.name: count for status, count in by_status.items()}}
+            for job_id, by_status in counts.items()
+        ])
+    return len(counts)
+
+
+def as_dict(stats) -> dict:
+    """
+    Per-status counts keyed by status value, from a Stats object or a row that
+    selected COLUMNS; zeros when the job has no counter row yet.
+    """
+    return {status.value: (getattr(stats, status.name, None) or 0) if stats else 0
+            for status in models.ApplicationStatus}
@@ -1,14 +1,88 @@
-from sqlalchemy import create_engine
+import os
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
-DATABASE_URL = "sqlite:///./jobportal.db"
 
-engine = create_engine(
-    DATABASE_URL, connect_args={"check_same_thread": False}
-)
+def _env_bool(name: str, default: str) -> bool:
+    return os.getenv(name, default).lower() in ("1", "true", "yes")
+
+
+def normalize_url(url: str) -> str:
+    # Heroku-style postgres:// URLs are not accepted by SQLAlchemy
+    if url.startswith("postgres://"):
+        return "postgresql://" + url[len("postgres://"):]
+    return url
+
+
+DATABASE_URL = normalize_url(os.getenv("DATABASE_URL", "sqlite:///./jobportal.db"))
+# Optional read replica for read-only endpoints (browse, job details); defaults to the primary
+DATABASE_READ_URL = normalize_url(os.getenv("DATABASE_READ_URL", "")) or None
+
+# Connection pool (ignored for in-memory SQLite)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = _env_bool("DB_POOL_PRE_PING", "true")
+
+# SQLite tuning, applied to every new connection
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_CACHE_SIZE_KIB = int(os.getenv("SQLITE_CACHE_SIZE_KIB", "65536"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+
+# Serve the routers through an AsyncEngine (aiosqlite / asyncpg) instead of the threadpool
+USE_ASYNC_DB = _env_bool("USE_ASYNC_DB", "false")
+
+
+def _engine_options(url: str) -> dict:
+    url = make_url(url)
+    if url.get_backend_name() == "sqlite":
+        options = {"connect_args": {"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000}}
+        if url.database in (None, "", ":memory:"):
+            return options
+    else:
+        options = {"pool_recycle": DB_POOL_RECYCLE}
+    options.update(
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_pre_ping=DB_POOL_PRE_PING,
+    )
+    return options
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    # WAL lets readers run alongside the single writer instead of failing with
+    # "database is locked"; NORMAL sync is durable at checkpoints under WAL
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KIB}")
+    cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+
+def configure_engine(sync_engine):
+    """Hooks dialect-specific connection setup onto a (sync or async-backed) engine."""
+    if sync_engine.dialect.name == "sqlite":
+        event.listen(sync_engine, "connect", _apply_sqlite_pragmas)
+    return sync_engine
+
+
+def build_engine(url: str):
+    return configure_engine(create_engine(url, **_engine_options(url)))
+
+
+engine = build_engine(DATABASE_URL)
+read_engine = build_engine(DATABASE_READ_URL) if DATABASE_READ_URL else engine
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
 
 Base = declarative_base()
 
@@ -19,3 +93,90 @@ def get_db():
         yield db
     finally:
         db.close()
+
+# dependency for read-only endpoints; may lag the primary when a replica is configured
+def get_read_db():
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def async_url(url: str) -> str:
+    """Same database, addressed through its asyncio driver."""
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend == "sqlite":
+        return url.set(drivername="sqlite+aiosqlite").render_as_string(hide_password=False)
+    if backend == "postgresql":
+        return url.set(drivername="postgresql+asyncpg").render_as_string(hide_password=False)
+    raise ValueError(f"No async driver configured for {backend}")
+
+
+async_engine = None
+async_read_engine = None
+AsyncSessionLocal = None
+AsyncReadSessionLocal = None
+
+if USE_ASYNC_DB:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    def build_async_engine(url: str):
+        options = _engine_options(url)
+        options.get("connect_args", {}).pop("check_same_thread", None)
+        async_engine = create_async_engine(async_url(url), **options)
+        configure_engine(async_engine.sync_engine)
+        return async_engine
+
+    async_engine = build_async_engine(DATABASE_URL)
+    async_read_engine = build_async_engine(DATABASE_READ_URL) if DATABASE_READ_URL else async_engine
+    # objects are read after commit when building responses; don't expire them
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+    AsyncReadSessionLocal = async_sessionmaker(async_read_engine, autoflush=False, expire_on_commit=False)
+
+
+# async dependencies
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def get_async_read_db():
+    async with AsyncReadSessionLocal() as db:
+        yield db
+
+
+async def run_db(db, fn, *args):
+    """
+    Runs fn(session, *args) from an async endpoint, whichever session it was
+    given. A plain Session runs it on the threadpool. An AsyncSession runs it
+    through run_sync, which is on the event loop (in a greenlet): only its
+    queries wait asynchronously, so any CPU or file work inside fn still
+    blocks the loop and belongs on the threadpool instead.
+    """
+    if hasattr(db, "run_sync"):
+        return await db.run_sync(fn, *args)
+    return await run_in_threadpool(fn, db, *args)
+
+
+# process lifecycle (see serve.py and main.lifespan)
+def _engines():
+    return {engine, read_engine}, {e for e in (async_engine, async_read_engine) if e is not None}
+
+
+def reset_after_fork():
+    """Forgets pooled connections inherited from a parent process without closing them."""
+    sync_engines, async_engines = _engines()
+    for e in sync_engines:
+        e.dispose(close=False)
+    for e in async_engines:
+        e.sync_engine.dispose(close=False)
+
+
+async def dispose_engines():
+    """Closes every pooled connection; run when the process shuts down."""
+    sync_engines, async_engines = _engines()
+    for e in sync_engines:
+        e.dispose()
+    for e in async_engines:
+        await e.dispose()
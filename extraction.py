@@ -0,0 +1,150 @@
+# extraction.py
+"""
+Plain text out of resume files (PDF, DOCX), for the resume search index.
+
+This module runs inside the extraction child processes started by resumes.py,
+so it imports nothing from the app. PDFs are read with pypdf when it is
+installed; without it a basic reader pulls the strings out of the page content
+streams, which covers PDFs written with simple fonts. DOCX text comes from
+word/document.xml, read up to a size cap so a zip bomb cannot exhaust memory.
+The result is normalized (NFKC, control characters dropped, whitespace
+collapsed) and cut to a maximum length.
+"""
+import io
+import re
+import unicodedata
+import zipfile
+import zlib
+
+try:
+    import pypdf
+except ImportError:  # optional
+    pypdf = None
+
+# decompressed document.xml read from a DOCX, and pages read from a PDF
+DOCX_MAX_XML_BYTES = 32 * 1024 * 1024
+PDF_MAX_PAGES = 50
+
+
+class ExtractionError(Exception):
+    """The file cannot be turned into text; retrying will not help."""
+
+
+def normalize(text: str, max_chars: int) -> str:
+    text = unicodedata.normalize("NFKC", text)
+    text = "".join(ch if unicodedata.category(ch)[0] != "C" else " " for ch in text)
+    return " ".join(text.split())[:max_chars]
+
+
+def extract(data: bytes, max_chars: int) -> str:
+    """Normalized text of a PDF or DOCX file's bytes; raises ExtractionError for anything else."""
+    if data.startswith(b"%PDF-"):
+        text = _pdf_text(data)
+    elif data.startswith(b"PK\x03\x04"):
+        text = _docx_text(data)
+    else:
+        raise ExtractionError("Not a PDF or DOCX file")
+    return normalize(text, max_chars)
+
+
+# ======================
+# DOCX
+# ======================
+_DOCX_TOKEN_RE = re.compile(rb"<w:t(?:\s[^>]*)?>([^<]*)</w:t>|<w:(?:tab|br|cr)\b[^>]*/>|</w:p>")
+_XML_ENTITY_RE = re.compile(r"&(#x[0-9a-fA-F]+|#[0-9]+|amp|lt|gt|quot|apos);")
+_XML_ENTITIES = {"amp": "&", "lt": "<", "gt": ">", "quot": '"', "apos": "'"}
+
+
+def _xml_entity(match) -> str:
+    name = match.group(1)
+    if name.startswith("#"):
+        try:
+            return chr(int(name[2:], 16) if name[1] in "xX" else int(name[1:]))
+        except (ValueError, OverflowError):
+            return " "
+    return _XML_ENTITIES[name]
+
+
+def _docx_text(data: bytes) -> str:
+    try:
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            with archive.open("word/document.xml") as document:
+                xml = document.read(DOCX_MAX_XML_BYTES)
+    except (zipfile.BadZipFile, KeyError, OSError, RuntimeError) as e:
+        raise ExtractionError(f"Unreadable DOCX: {e}")
+    # runs of text, with a space for tabs, breaks and paragraph ends
+    parts = [match.group(1) or b" " for match in _DOCX_TOKEN_RE.finditer(xml)]
+    return _XML_ENTITY_RE.sub(_xml_entity, b"".join(parts).decode("utf-8", "replace"))
+
+
+# ======================
+# PDF
+# ======================
+def _pdf_text(data: bytes) -> str:
+    if pypdf is None:
+        return _basic_pdf_text(data)
+    try:
+        reader = pypdf.PdfReader(io.BytesIO(data))
+        return "\n".join(page.extract_text() or "" for page in reader.pages[:PDF_MAX_PAGES])
+    except Exception as e:  # pypdf raises a variety of errors on damaged files
+        raise ExtractionError(f"Unreadable PDF: {e}")
+
+
+_STREAM_RE = re.compile(rb"<<(.*?)>>\s*stream\r?\n(.*?)\r?\n?endstream", re.S)
+# string operands of the text showing operators: (..) Tj, (..) ' and (..) ", and [(..) -250 (..)] TJ
+_TEXT_OP_RE = re.compile(rb"\[((?:\\.|[^\]\\])*)\]\s*TJ|\(((?:\\.|[^)\\])*)\)\s*(?:Tj|'|\")|(T\*|Td|TD|ET)(?!\w)", re.S)
+_TJ_STRING_RE = re.compile(rb"\(((?:\\.|[^)\\])*)\)|(-\d{3,})")
+_PDF_ESCAPES = {b"n": b"\n", b"r": b"\r", b"t": b"\t", b"b": b"", b"f": b"", b"(": b"(", b")": b")", b"\\": b"\\"}
+_PDF_ESCAPE_RE = re.compile(rb"\\([0-7]{1,3}|.)", re.S)
+
+
+def _pdf_string(raw: bytes) -> bytes:
+    def unescape(match):
+        value = match.group(1)
+        if value[:1].isdigit():
+            return bytes([int(value, 8) & 0xFF])
+        return _PDF_ESCAPES.get(value, value)
+    return _PDF_ESCAPE_RE.sub(unescape, raw)
+
+
+def _basic_pdf_text(data: bytes) -> str:
+    """Strings shown by the page content streams; enough for PDFs written with simple (single byte) fonts."""
+    chunks = []
+    for match in _STREAM_RE.finditer(data):
+        dictionary, stream = match.groups()
+        if b"/FlateDecode" in dictionary:
+            try:
+                stream = zlib.decompressobj().decompress(stream, DOCX_MAX_XML_BYTES)
+            except zlib.error:
+                continue
+        elif b"/Filter" in dictionary:
+            continue  # images and other encodings carry no text
+        for op in _TEXT_OP_RE.finditer(stream):
+            array, string, breaks = op.groups()
+            if breaks:
+                chunks.append(b" ")
+            elif string is not None:
+                chunks.append(_pdf_string(string))
+            else:
+                # a large negative kerning inside TJ is how PDFs space words
+                for part, gap in _TJ_STRING_RE.findall(array):
+                    chunks.append(_pdf_string(part) if not gap else b" ")
+    if not chunks:
+        raise ExtractionError("No text found in PDF")
+    return b"".join(chunks).decode("latin-1")
+
+
+# ======================
+# Child process
+# ======================
+def serve(conn, max_chars: int):
+    """Loop of an extraction child: receives file bytes, sends back ("ok", text) or ("error", message)."""
+    while True:
+        try:
+            data = conn.recv_bytes()
+        except (EOFError, OSError):
+            return
+        try:
+            conn.send(("ok", extract(data, max_chars)))
+        except ExtractionError as e:
+            conn.send(("error", str(e)))
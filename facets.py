@@ -0,0 +1,219 @@
+# facets.py
+"""
+Facet counts for job browsing: how many matching jobs there are per location,
+per company and per status.
+
+job_facet_counts holds, for every (location, status) and (company, status)
+pair, the number of jobs; every job write adjusts it in the same transaction
+(record()), so it never needs a scan of jobs. Its size depends on the number
+of distinct locations and companies, not of jobs. Without text filters the
+facets are folded from it once per catalog generation and then served from
+memory. With text filters they are counted over the search hits in one
+statement that looks the matching jobs up once, so they cost about what
+counting the matches does. Either way each facet is ranked and cut to
+FACET_LIMIT values in SQL.
+
+The location and company facets honour status_filter; the status facet does
+not, so that it shows what the other statuses would return. recompute()
+rebuilds the table if it ever drifts (`python manage.py repair-facets`).
+"""
+import os
+import threading
+from collections import Counter
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import String, cast, func, insert, literal, select, union_all
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+import models
+from guid import guid_text
+
+Facets = models.JobFacetCount
+
+FACET_LIMIT = int(os.getenv("FACET_LIMIT", "20"))
+
+# (location, company id, status) of a job
+JobKey = Tuple[Optional[str], str, models.JobStatus]
+
+_UPSERT_INSERTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+
+def _status(value) -> Optional[models.JobStatus]:
+    if value is None or isinstance(value, models.JobStatus):
+        return value
+    try:
+        return models.JobStatus(value)
+    except ValueError:
+        return models.JobStatus[value]
+
+
+def job_key(job) -> JobKey:
+    """The facet key of a Job object or of a row dict about to be inserted."""
+    if isinstance(job, dict):
+        return job.get("location"), job["created_by"], _status(job.get("status") or models.JobStatus.draft)
+    return job.location, job.created_by, _status(job.status)
+
+
+# ======================
+# Maintenance
+# ======================
+def record(db: Session, added: Iterable[JobKey] = (), removed: Iterable[JobKey] = ()):
+    """Counts jobs in (`added`) and out (`removed`) of the facets. Does not commit."""
+    deltas: Counter = Counter()
+    for sign, keys in ((1, added), (-1, removed)):
+        for location, company_id, status in keys:
+            if status is None:
+                continue
+            deltas[("location", location or "", status)] += sign
+            deltas[("company", company_id, status)] += sign
+    rows = [{"facet": facet, "value": value, "status": status, "count": delta}
+            for (facet, value, status), delta in deltas.items() if delta]
+    if not rows:
+        return
+
+    make_insert = _UPSERT_INSERTS.get(db.get_bind().dialect.name)
+    if make_insert is not None:
+        stmt = make_insert(Facets)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Facets.facet, Facets.value, Facets.status],
+            set_={"count": Facets.count + stmt.excluded["count"]},
+        )
+        db.execute(stmt, rows)
+        return
+
+    for row in rows:
+        updated = (
+            db.query(Facets)
+            .filter(Facets.facet == row["facet"], Facets.value == row["value"], Facets.status == row["status"])
+            .update({Facets.count: Facets.count + row["count"]}, synchronize_session=False)
+        )
+        if not updated:
+            db.execute(insert(Facets), [row])
+
+
+def recompute(db: Session) -> int:
+    """Rebuilds the table from jobs and returns the number of rows written. Does not commit."""
+    Job = models.Job
+    location = func.coalesce(Job.location, "")
+    db.query(Facets).delete(synchronize_session=False)
+    counts = [
+        select(literal("location"), location, Job.status, func.count())
+        .where(Job.status.isnot(None)).group_by(location, Job.status),
+        select(literal("company"), guid_text(Job.created_by), Job.status, func.count())
+        .where(Job.status.isnot(None)).group_by(Job.created_by, Job.status),
+    ]
+    written = 0
+    for query in counts:
+        result = db.execute(insert(Facets).from_select(["facet", "value", "status", "count"], query))
+        written += result.rowcount
+    return written
+
+
+# ======================
+# Reading
+# ======================
+def _grouped(facet: str, value, count, limit: int, where=(), render=None):
+    """
+    (facet, value, count) rows of the top `limit` values, as one member of a
+    UNION ALL. `render` turns the grouped value into text (default: a CAST).
+    """
+    ranked = (
+        select(literal(facet).label("facet"), (render or _as_string)(value).label("value"), count.label("count"))
+        .where(*where)
+        .group_by(value)
+        .having(count > 0)
+        .order_by(count.desc(), value)
+        .limit(limit)
+        .subquery()
+    )
+    return select(ranked.c.facet, ranked.c.value, ranked.c.count)
+
+
+def _as_string(value):
+    return cast(value, String)
+
+
+def _build(db: Session, rows) -> dict:
+    result = {"location": [], "company": [], "status": []}
+    for facet, value, count in rows:
+        if facet == "status":
+            result[facet].append({"value": models.JobStatus[value].value, "count": count})
+        else:
+            result[facet].append({"value": value or None, "count": count})
+    if result["company"]:
+        names = dict(
+            db.query(models.User.id, models.User.name)
+            .filter(models.User.id.in_([entry["value"] for entry in result["company"]]))
+        )
+        for entry in result["company"]:
+            entry["label"] = names.get(entry["value"])
+    return result
+
+
+def _catalog_query(status_filter: Optional[models.JobStatus], limit: int):
+    status_clause = [Facets.status == status_filter] if status_filter else []
+    total = func.sum(Facets.count)
+    return union_all(
+        # every job is in exactly one location row, so those also give the status facet
+        _grouped("status", Facets.status, total, len(models.JobStatus), [Facets.facet == "location"]),
+        _grouped("location", Facets.value, total, limit, [Facets.facet == "location", *status_clause]),
+        _grouped("company", Facets.value, total, limit, [Facets.facet == "company", *status_clause]),
+    )
+
+
+class _CatalogFacets:
+    """Facets of the whole catalog, per status filter, for one catalog generation at a time."""
+
+    def __init__(self):
+        self._generation = None
+        self._entries: Dict[Tuple[Optional[models.JobStatus], int], dict] = {}
+        self._lock = threading.Lock()
+
+    def get(self, db: Session, generation: int, status_filter: Optional[models.JobStatus], limit: int) -> dict:
+        key = (status_filter, limit)
+        with self._lock:
+            if self._generation == generation and key in self._entries:
+                return self._entries[key]
+
+        facets = _build(db, db.execute(_catalog_query(status_filter, limit)))
+
+        with self._lock:
+            if self._generation != generation:
+                self._generation = generation
+                self._entries = {}
+            self._entries[key] = facets
+        return facets
+
+
+_catalog_facets = _CatalogFacets()
+
+
+def catalog_facets(db: Session, generation: int, status_filter: Optional[models.JobStatus] = None,
+                   limit: int = FACET_LIMIT) -> dict:
+    """Facets over every job, from job_facet_counts (cached until the catalog changes)."""
+    return _catalog_facets.get(db, generation, status_filter, limit)
+
+
+def hit_facets(db: Session, hits, status_filter: Optional[models.JobStatus] = None,
+               limit: int = FACET_LIMIT) -> dict:
+    """Facets over the jobs in a search.match_subquery() result, in one statement."""
+    Job = models.Job
+    # the matching jobs are looked up once and grouped three ways
+    matched = (
+        select(func.coalesce(Job.location, "").label("location"), Job.created_by.label("company"),
+               Job.status.label("status"))
+        .join(hits, hits.c.job_id == Job.id)
+        .where(Job.status.isnot(None))
+        .cte("facet_hits")
+        .prefix_with("MATERIALIZED")
+    )
+    status_clause = [matched.c.status == status_filter] if status_filter else []
+    total = func.count()
+    query = union_all(
+        _grouped("status", matched.c.status, total, len(models.JobStatus)),
+        _grouped("location", matched.c.location, total, limit, status_clause),
+        # grouped on the raw id, rendered as text only for the top values
+        _grouped("company", matched.c.company, total, limit, status_clause, render=guid_text),
+    )
+    return _build(db, db.execute(query))
@@ -0,0 +1,89 @@
+# hashing.py
+"""
+Password hashing on a dedicated process pool.
+
+bcrypt is deliberately slow and holds the GIL while it runs, so hashing inline
+in a request stalls every other request in the worker. Here the work is sent
+to a small pool of processes with a bounded backlog: once `workers + max
+pending` calls are in flight, new calls fail fast with HashPoolSaturated
+(turned into a 503 by main.py) instead of queueing without limit.
+"""
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+
+import utils
+
+# 0 runs hashing inline in the calling thread (handy for local development)
+HASH_POOL_WORKERS = int(os.getenv("HASH_POOL_WORKERS", str(min(4, os.cpu_count() or 1))))
+HASH_POOL_MAX_PENDING = int(os.getenv("HASH_POOL_MAX_PENDING", "32"))
+HASH_POOL_RETRY_AFTER_SECONDS = int(os.getenv("HASH_POOL_RETRY_AFTER_SECONDS", "1"))
+
+
+class HashPoolSaturated(Exception):
+    """Raised when the hashing backlog is full."""
+
+
+class HashPool:
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.capacity = workers + max_pending
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn rather than fork: the server process runs threads
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    def submit(self, fn, *args) -> Future:
+        with self._lock:
+            if self._in_flight >= self.capacity:
+                raise HashPoolSaturated()
+            self._in_flight += 1
+            executor = self._get_executor()
+        try:
+            future = executor.submit(fn, *args)
+        except Exception:
+            self._release()
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, _future=None):
+        with self._lock:
+            self._in_flight -= 1
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+pool = HashPool(HASH_POOL_WORKERS, HASH_POOL_MAX_PENDING)
+
+
+async def _run(fn, *args):
+    if HASH_POOL_WORKERS <= 0:
+        return fn(*args)
+    return await asyncio.wrap_future(pool.submit(fn, *args))
+
+
+async def hash_password_async(password: str) -> str:
+    return await _run(utils.hash_password, password)
+
+
+async def verify_password_async(plain: str, hashed: str) -> bool:
+    return await _run(utils.verify_password, plain, hashed)
+
+
+def needs_rehash(hashed: str) -> bool:
+    """True when `hashed` was made with a different scheme or cost than BCRYPT_ROUNDS."""
+    return utils.pwd_context().needs_update(hashed)
@@ -0,0 +1,122 @@
+# http_cache.py
+"""
+Conditional GET for read endpoints.
+
+An endpoint names the version of the data behind a response (a job's version,
+the catalog generation) and its modification time. From those it gets a
+strong ETag and Last-Modified; a request whose If-None-Match (or, failing
+that, If-Modified-Since) still matches is answered 304 before any row data is
+loaded. Rendered bodies are also kept in a small per-process LRU keyed by
+ETag, so a changed-but-popular response is serialized once per version.
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Callable, Optional
+
+from fastapi import Request, Response
+from pydantic import BaseModel
+
+import responses
+
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1024"))
+
+# responses depend on the caller's token: let clients keep them, but revalidate every time
+CACHE_CONTROL = "private, no-cache"
+
+
+class ResponseCache:
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, etag: str) -> Optional[bytes]:
+        with self._lock:
+            body = self._entries.get(etag)
+            if body is not None:
+                self._entries.move_to_end(etag)
+            return body
+
+    def put(self, etag: str, body: bytes):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[etag] = body
+            self._entries.move_to_end(etag)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+cache = ResponseCache(RESPONSE_CACHE_MAX_ENTRIES)
+
+
+def make_etag(*parts) -> str:
+    digest = hashlib.sha256("\x1f".join(str(p) for p in parts).encode()).hexdigest()[:32]
+    return f'"{digest}"'
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes; they are UTC (func.now())
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
+
+
+def _unmodified_since(if_modified_since: str, last_modified: datetime) -> bool:
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since is None:
+        return False
+    return _as_utc(last_modified).replace(microsecond=0) <= _as_utc(since)
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is not None and last_modified is not None:
+        return _unmodified_since(if_modified_since, last_modified)
+    return False
+
+
+def conditional_response(request: Request, etag: str, last_modified: Optional[datetime],
+                         build: Callable[[], BaseModel]) -> Response:
+    """
+    304 when the client's copy is current, else the cached body for this
+    ETag, else build() rendered as JSON (serialized once, see responses.py).
+    Only successful bodies are cached and tagged, so failures never stick.
+    """
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(_as_utc(last_modified), usegmt=True)
+
+    if is_not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+
+    body = cache.get(etag)
+    if body is None:
+        model = build()
+        body = responses.render(model)
+        if not getattr(model, "success", True):
+            return Response(content=body, media_type="application/json")
+        cache.put(etag, body)
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,179 @@
+# job_import.py
+"""
+Bulk job import from newline-delimited JSON.
+
+The request body is read as a stream and split into lines as it arrives. Each
+line is validated on its own as a schemas.JobCreate; valid jobs are inserted
+JOB_IMPORT_BATCH_SIZE at a time with one executemany (plus their zeroed
+counter rows) and committed per batch. The per-line report is spooled to a
+temporary file instead of being kept in memory, so memory use stays flat
+however large the upload is. A failing batch does not undo earlier ones.
+"""
+import json
+import logging
+import os
+import tempfile
+from typing import AsyncIterator, BinaryIO, List, Optional, Tuple
+
+from pydantic import ValidationError
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+import catalog
+import counters
+import facets
+import models
+import recommend
+import schemas
+from database import run_db
+from guid import new_id
+
+logger = logging.getLogger(__name__)
+
+JOB_IMPORT_BATCH_SIZE = int(os.getenv("JOB_IMPORT_BATCH_SIZE", "1000"))
+JOB_IMPORT_MAX_LINE_BYTES = int(os.getenv("JOB_IMPORT_MAX_LINE_BYTES", str(64 * 1024)))
+
+# the report stays in memory up to this size, then moves to disk
+REPORT_SPOOL_BYTES = 1024 * 1024
+REPORT_CHUNK_SIZE = 64 * 1024
+
+
+async def iter_lines(chunks: AsyncIterator[bytes], max_line_bytes: int = JOB_IMPORT_MAX_LINE_BYTES):
+    """
+    Yields (line_number, line) for each line of a byte stream. Lines longer
+    than max_line_bytes are yielded as None instead of being buffered.
+    """
+    buffer = bytearray()
+    too_long = False
+    line_no = 0
+    async for chunk in chunks:
+        start = 0
+        while True:
+            end = chunk.find(b"\n", start)
+            if not too_long:
+                buffer += chunk[start:] if end < 0 else chunk[start:end]
+                if len(buffer) > max_line_bytes:
+                    too_long = True
+                    buffer.clear()
+            if end < 0:
+                break
+            line_no += 1
+            yield line_no, (None if too_long else bytes(buffer))
+            buffer.clear()
+            too_long = False
+            start = end + 1
+    if buffer or too_long:
+        yield line_no + 1, (None if too_long else bytes(buffer))
+
+
+def _validation_errors(error: ValidationError) -> List[str]:
+    return [
+        f"{'.'.join(str(part) for part in e['loc'])}: {e['msg']}" if e["loc"] else e["msg"]
+        for e in error.errors()
+    ]
+
+
+def insert_jobs(db: Session, rows: List[dict]):
+    """Inserts a batch of job rows, their counter rows and facet counts, and commits."""
+    try:
+        db.execute(insert(models.Job), rows)
+        counters.create_many(db, (row["id"] for row in rows))
+        facets.record(db, added=[facets.job_key(row) for row in rows])
+        catalog.bump(db)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+
+class JobImport:
+    def __init__(self, db, company_id: str, batch_size: int = JOB_IMPORT_BATCH_SIZE):
+        self.db = db
+        self.company_id = company_id
+        self.batch_size = batch_size
+        self.report: BinaryIO = tempfile.SpooledTemporaryFile(max_size=REPORT_SPOOL_BYTES, mode="w+b")
+        self.lines = 0
+        self.created = 0
+        self.failed = 0
+        # (line number, row to insert, or errors) for lines not yet reported
+        self._pending: List[Tuple[int, Optional[dict], Optional[List[str]]]] = []
+
+    def _write(self, entry: dict):
+        self.report.write(json.dumps(entry, separators=(",", ":")).encode() + b"\n")
+
+    async def add(self, line_no: int, line: Optional[bytes]):
+        if line is not None and not line.strip():
+            return
+        self.lines += 1
+        if line is None:
+            self._pending.append((line_no, None, [f"Line exceeds {JOB_IMPORT_MAX_LINE_BYTES} bytes"]))
+        else:
+            try:
+                payload = schemas.JobCreate.model_validate_json(line)
+            except ValidationError as e:
+                self._pending.append((line_no, None, _validation_errors(e)))
+            else:
+                self._pending.append((line_no, {
+                    "id": new_id(),
+                    "title": payload.title,
+                    "description": payload.description,
+                    "location": payload.location,
+                    "status": models.JobStatus(payload.status.value) if payload.status else models.JobStatus.draft,
+                    "created_by": self.company_id,
+                }, None))
+        if len(self._pending) >= self.batch_size:
+            await self.flush()
+
+    async def flush(self):
+        """Saves the buffered rows and reports every buffered line, in line order."""
+        pending, self._pending = self._pending, []
+        rows = [row for _, row, _ in pending if row is not None]
+        saved = True
+        if rows:
+            try:
+                await run_db(self.db, insert_jobs, rows)
+            except Exception:
+                logger.exception("Job import batch of %d rows failed", len(rows))
+                saved = False
+            else:
+                # takes the recommendation index's file lock and vectorizes in Python:
+                # on the threadpool, since run_db keeps an AsyncSession's work on the loop
+                await run_in_threadpool(recommend.update_jobs, rows, True)
+        for line_no, row, errors in pending:
+            if row is not None and saved:
+                self.created += 1
+                self._write({"line": line_no, "success": True, "job_id": row["id"]})
+            else:
+                self.failed += 1
+                self._write({"line": line_no, "success": False, "errors": errors or ["Could not be saved"]})
+
+    async def finish(self) -> BinaryIO:
+        """Flushes the last batch, appends the summary and rewinds the report."""
+        await self.flush()
+        self._write({"summary": {"lines": self.lines, "created": self.created, "failed": self.failed}})
+        self.report.seek(0)
+        return self.report
+
+
+async def run(db, company_id: str, chunks: AsyncIterator[bytes]) -> BinaryIO:
+    """Imports an NDJSON byte stream for a company; returns the NDJSON report file."""
+    job_import = JobImport(db, company_id)
+    try:
+        async for line_no, line in iter_lines(chunks):
+            await job_import.add(line_no, line)
+        return await job_import.finish()
+    except BaseException:
+        job_import.report.close()
+        raise
+
+
+def iter_report(report: BinaryIO):
+    try:
+        while True:
+            chunk = report.read(REPORT_CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        report.close()
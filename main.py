@@ -1,15 +1,57 @@
-from fastapi import FastAPI
-from database import Base, engine 
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from database import get_db, get_async_db, get_read_db, get_async_read_db, USE_ASYNC_DB
+import database
 from routers import auth,jobs
-import uvicorn
-import models
-import os
-Base.metadata.create_all(bind=engine)
+from routers.aio import asyncify_router
+import hashing
+import notifications
+import metrics
+import admission
+import archive
+import resumes
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # one-time setup per worker process; importing this module does no I/O
+    notifications.start_dispatcher()
+    archive.start_archiver()
+    resumes.start_extractor()
+    try:
+        yield
+    finally:
+        # runs after the server has drained in-flight requests
+        resumes.stop_extractor()
+        archive.stop_archiver()
+        notifications.stop_dispatcher()
+        hashing.pool.shutdown()
+        await database.dispose_engines()
+
+
+app = FastAPI(title="Job Portal API", lifespan=lifespan)
+
+for router in (auth.router, jobs.router):
+    if USE_ASYNC_DB:
+        router = asyncify_router(router, {get_db: get_async_db, get_read_db: get_async_read_db})
+    app.include_router(router)
+
+if admission.ADMISSION_ENABLED:
+    admission.install(app)
+
+# added last so it is outermost and also times requests shed by admission control
+if metrics.METRICS_ENABLED:
+    metrics.install(app, [database.engine, database.read_engine, database.async_engine, database.async_read_engine])
 
-app = FastAPI(title="Job Portal API")
 
-app.include_router(auth.router)
-app.include_router(jobs.router)
+@app.exception_handler(hashing.HashPoolSaturated)
+def hash_pool_saturated(request: Request, exc: hashing.HashPoolSaturated):
+    return JSONResponse(
+        status_code=503,
+        headers={"Retry-After": str(hashing.HASH_POOL_RETRY_AFTER_SECONDS)},
+        content={"success": False, "message": "Server is busy, please retry shortly", "object": None, "errors": ["Overloaded"]}
+    )
 
 @app.get("/")
 def home():
@@ -17,5 +59,5 @@ def home():
 
 
 if __name__ == "__main__":
-    port = int(os.environ.get("PORT", 8000))
-    uvicorn.run("main:app", host="0.0.0.0", port=port)
\ No newline at end of file
+    import serve
+    serve.main()
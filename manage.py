@@ -0,0 +1,173 @@
+# manage.py
+"""
+Maintenance commands.
+
+    python manage.py repair-counters [--job-id ID ...]
+    python manage.py repair-facets
+    python manage.py rebuild-search
+    python manage.py convert-ids [--no-backup]
+    python manage.py rebuild-recommendations
+    python manage.py archive-jobs [--older-than-days N]
+    python manage.py extract-resumes [--retry-failed]
+"""
+import argparse
+import os
+import sqlite3
+
+from dotenv import load_dotenv
+
+load_dotenv()  # before database reads DATABASE_URL
+
+from database import DATABASE_URL, SessionLocal
+
+
+def repair_counters(args):
+    import counters
+
+    db = SessionLocal()
+    try:
+        written = counters.recompute(db, args.job_id or None)
+        db.commit()
+        print(f"Recomputed application counters for {written} job(s)")
+    finally:
+        db.close()
+
+
+def repair_facets(args):
+    import facets
+
+    db = SessionLocal()
+    try:
+        written = facets.recompute(db)
+        db.commit()
+        print(f"Recomputed {written} job facet count(s)")
+    finally:
+        db.close()
+
+
+def rebuild_search(args):
+    import search
+
+    db = SessionLocal()
+    try:
+        indexed = search.rebuild(db)
+        db.commit()
+        print(f"Rebuilt the job search index ({indexed} job(s))")
+    finally:
+        db.close()
+
+
+def rebuild_recommendations(args):
+    import recommend
+
+    db = SessionLocal()
+    try:
+        indexed = recommend.rebuild(db)
+        print(f"Indexed {indexed} open job(s) for recommendations in {recommend.RECOMMEND_INDEX_DIR}")
+    finally:
+        db.close()
+
+
+def archive_jobs(args):
+    import archive
+
+    days = archive.ARCHIVE_AFTER_DAYS if args.older_than_days is None else args.older_than_days
+    archived = archive.archive_all(before=archive.cutoff(after_days=days))
+    print(f"Archived {archived} closed job(s) unchanged for {days:g} day(s)")
+
+
+def extract_resumes(args):
+    import resumes
+
+    db = SessionLocal()
+    # one extraction child for the whole run, not one per batch
+    process = resumes.ExtractionProcess()
+    try:
+        queued = resumes.enqueue_missing(db)
+        requeued = resumes.retry_failed(db) if args.retry_failed else 0
+        db.commit()
+        print(f"Queued {queued} new and {requeued} failed resume(s)")
+        extractor = resumes.Extractor()
+        while extractor.drain_once(process=process):
+            pass
+        print("Resume texts by status: " + ", ".join(f"{k}={v}" for k, v in resumes.queue_depth(db).items()))
+    finally:
+        process.close()
+        db.close()
+
+
+def _size(path: str) -> int:
+    return sum(os.path.getsize(p) for p in (path, path + "-wal") if os.path.exists(p))
+
+
+def convert_ids(args):
+    """Offline: migrates the ids to binary UUIDs (revision 0005) and compacts a SQLite file."""
+    from alembic import command
+    from alembic.config import Config
+    from sqlalchemy.engine import make_url
+
+    url = make_url(DATABASE_URL)
+    path = url.database if url.get_backend_name() == "sqlite" and url.database not in (None, "", ":memory:") else None
+    if path:
+        before = _size(path)
+        if not args.no_backup:
+            backup = path + ".bak"
+            # through the backup API, so pages still in the WAL are included
+            source, target = sqlite3.connect(path), sqlite3.connect(backup)
+            try:
+                source.backup(target)
+            finally:
+                source.close()
+                target.close()
+            print(f"Backed up {path} to {backup}")
+
+    command.upgrade(Config(os.path.join(os.path.dirname(os.path.abspath(__file__)), "alembic.ini")), "0005")
+
+    if path:
+        conn = sqlite3.connect(path)
+        try:
+            conn.execute("VACUUM")
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        finally:
+            conn.close()
+        print(f"Converted {path}: {before / 2**20:.1f} MiB -> {_size(path) / 2**20:.1f} MiB")
+    else:
+        print("Converted ids to uuid")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Job Portal maintenance commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    cmd = commands.add_parser("repair-counters", help="Rebuild per-job application counters from the applications table")
+    cmd.add_argument("--job-id", action="append", help="Only this job (repeatable); default is every job")
+    cmd.set_defaults(handler=repair_counters)
+
+    cmd = commands.add_parser("repair-facets", help="Rebuild the browse facet counts from the jobs table")
+    cmd.set_defaults(handler=repair_facets)
+
+    cmd = commands.add_parser("rebuild-search", help="Rebuild the job full-text search index from the jobs table")
+    cmd.set_defaults(handler=rebuild_search)
+
+    cmd = commands.add_parser("rebuild-recommendations", help="Rebuild the job recommendation index from the jobs table")
+    cmd.set_defaults(handler=rebuild_recommendations)
+
+    cmd = commands.add_parser("archive-jobs", help="Move long closed jobs and their applications to the archive tables now")
+    cmd.add_argument("--older-than-days", type=float, default=None,
+                     help="Retention window (default: ARCHIVE_AFTER_DAYS)")
+    cmd.set_defaults(handler=archive_jobs)
+
+    cmd = commands.add_parser("extract-resumes", help="Queue resumes missing from the keyword index and extract the whole queue now")
+    cmd.add_argument("--retry-failed", action="store_true", help="Also retry resumes whose extraction failed")
+    cmd.set_defaults(handler=extract_resumes)
+
+    cmd = commands.add_parser("convert-ids", help="Convert ids to binary UUIDs in place (stop the app first)")
+    cmd.add_argument("--no-backup", action="store_true", help="Skip the <database>.bak copy of a SQLite file")
+    cmd.set_defaults(handler=convert_ids)
+
+    args = parser.parse_args(argv)
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
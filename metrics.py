@@ -0,0 +1,253 @@
+# metrics.py
+"""
+Per-route request and SQL metrics in Prometheus text format.
+
+MetricsMiddleware times every HTTP request and opens a RequestStats in a
+context variable; cursor events on the engines add each statement's count,
+duration and row count to it. When the response is done the totals are
+observed into histograms labelled by method and route template, and requests
+issuing more than METRICS_QUERY_THRESHOLD statements (typically an N+1 loop)
+are logged and counted. GET /metrics renders everything.
+
+Nothing is installed unless METRICS_ENABLED is set, so a disabled deployment
+pays nothing. Rows are those reported by the driver's rowcount: Postgres
+reports them for SELECTs, SQLite only for writes.
+"""
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+from fastapi import FastAPI, Response
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "false").lower() in ("1", "true", "yes")
+METRICS_PATH = os.getenv("METRICS_PATH", "/metrics")
+METRICS_QUERY_THRESHOLD = int(os.getenv("METRICS_QUERY_THRESHOLD", "20"))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+ROW_BUCKETS = (0, 1, 10, 100, 1000, 10000, 100000)
+EXTRACTION_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labelnames: Sequence[str], buckets: Sequence[float]):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts..., +Inf count], sum
+        self._series: Dict[Tuple[str, ...], Tuple[list, list]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: Tuple[str, ...], value: float):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+            series[0][index] += 1
+            series[1][0] += value
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            snapshot = [(labels, list(counts), total[0]) for labels, (counts, total) in self._series.items()]
+        for labels, counts, total in sorted(snapshot):
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                le = 'le="%s"' % _number(bound)
+                yield f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}"
+            cumulative += counts[-1]
+            le = 'le="+Inf"'
+            yield f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(total)}"
+            yield f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}"
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: Sequence[str]):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: Tuple[str, ...], amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        with self._lock:
+            snapshot = sorted(self._values.items())
+        for labels, value in snapshot:
+            yield f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}"
+
+
+REQUEST_LABELS = ("method", "route")
+
+request_duration = Histogram("http_request_duration_seconds", "Request latency",
+                             REQUEST_LABELS + ("status",), LATENCY_BUCKETS)
+request_queries = Histogram("http_request_sql_queries", "SQL statements issued per request",
+                            REQUEST_LABELS, QUERY_BUCKETS)
+request_sql_time = Histogram("http_request_sql_duration_seconds", "Time spent in SQL per request",
+                             REQUEST_LABELS, LATENCY_BUCKETS)
+request_sql_rows = Histogram("http_request_sql_rows", "Rows reported by the driver per request",
+                             REQUEST_LABELS, ROW_BUCKETS)
+query_threshold_exceeded = Counter("http_request_sql_query_threshold_exceeded_total",
+                                   "Requests that issued more than METRICS_QUERY_THRESHOLD statements",
+                                   REQUEST_LABELS)
+admission_rejected = Counter("http_admission_rejected_total",
+                             "Requests shed by admission control (see admission.py)", ("route_class", "reason"))
+resume_extractions = Counter("resume_extractions_total",
+                             "Resume text extraction attempts by outcome: extracted, retried, failed (see resumes.py)",
+                             ("outcome",))
+resume_extraction_duration = Histogram("resume_extraction_duration_seconds",
+                                       "Time to read and extract one resume", ("outcome",), EXTRACTION_BUCKETS)
+
+REGISTRY = (request_duration, request_queries, request_sql_time, request_sql_rows, query_threshold_exceeded,
+            admission_rejected, resume_extractions, resume_extraction_duration)
+
+
+class RequestStats:
+    __slots__ = ("queries", "sql_seconds", "rows")
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.rows = 0
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_sql_stats", default=None)
+
+
+def current() -> Optional[RequestStats]:
+    """Stats of the request being handled, if any (None outside requests or with metrics off)."""
+    return _current.get()
+
+
+# ======================
+# SQL hooks
+# ======================
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("metrics_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    started = conn.info.get("metrics_started")
+    if stats is None or not started:
+        return
+    stats.sql_seconds += time.perf_counter() - started.pop()
+    stats.queries += 1
+    rowcount = getattr(cursor, "rowcount", -1)
+    if rowcount is not None and rowcount > 0:
+        stats.rows += rowcount
+
+
+def _handle_error(exception_context):
+    # a failed statement never reaches after_cursor_execute; count it and drop its start time
+    conn = exception_context.connection
+    stats = _current.get()
+    started = conn.info.get("metrics_started") if conn is not None else None
+    if stats is None or not started:
+        return
+    stats.sql_seconds += time.perf_counter() - started.pop()
+    stats.queries += 1
+
+
+def instrument_engine(engine):
+    sync_engine = getattr(engine, "sync_engine", engine)
+    if not event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(sync_engine, "handle_error", _handle_error)
+
+
+# ======================
+# Middleware and endpoint
+# ======================
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] == METRICS_PATH:
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            _current.reset(token)
+            _record(scope, status, time.perf_counter() - started, stats)
+
+
+def _record(scope, status: int, elapsed: float, stats: RequestStats):
+    route = scope.get("route")
+    labels = (scope["method"], getattr(route, "path", None) or "unmatched")
+    request_duration.observe(labels + (str(status),), elapsed)
+    request_queries.observe(labels, stats.queries)
+    request_sql_time.observe(labels, stats.sql_seconds)
+    request_sql_rows.observe(labels, stats.rows)
+    if stats.queries > METRICS_QUERY_THRESHOLD:
+        query_threshold_exceeded.inc(labels)
+        logger.warning("%s %s issued %d SQL statements (threshold %d): possible N+1",
+                       labels[0], labels[1], stats.queries, METRICS_QUERY_THRESHOLD)
+
+
+def render() -> str:
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def metrics_endpoint():
+    return Response(render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+def install(app: FastAPI, engines: Iterable):
+    """Adds the middleware, the cursor hooks on `engines` and the metrics endpoint."""
+    for engine in engines:
+        if engine is not None:
+            instrument_engine(engine)
+    app.add_middleware(MetricsMiddleware)
+    app.add_api_route(METRICS_PATH, metrics_endpoint, methods=["GET"], include_in_schema=False)
@@ -0,0 +1,259 @@
+"""initial schema
+
+Creates the tables the app used to create at startup with create_all, plus
+the full-text search index and its triggers. Tables that already exist
+(databases created before migrations were introduced) are left as they are,
+so this revision also adopts an existing jobportal.db.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+USER_ROLE = sa.Enum("applicant", "company", name="userrole")
+JOB_STATUS = sa.Enum("draft", "open", "closed", name="jobstatus")
+APPLICATION_STATUS = sa.Enum("applied", "reviewed", "interview", "rejected", "hired", name="applicationstatus")
+NOTIFICATION_STATUS = sa.Enum("pending", "sending", "sent", "failed", name="notificationstatus")
+
+SQLITE_SEARCH_DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS job_search_keys (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        job_id VARCHAR NOT NULL UNIQUE
+    )
+    """,
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(
+        title, description, location, company_name,
+        tokenize = 'unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS jobs_fts_ai AFTER INSERT ON jobs BEGIN
+        INSERT INTO job_search_keys (job_id) VALUES (NEW.id);
+        INSERT INTO jobs_fts (rowid, title, description, location, company_name)
+        VALUES (
+            last_insert_rowid(), NEW.title, NEW.description, NEW.location,
+            (SELECT name FROM users WHERE id = NEW.created_by)
+        );
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS jobs_fts_au AFTER UPDATE OF title, description, location ON jobs BEGIN
+        UPDATE jobs_fts
+        SET title = NEW.title, description = NEW.description, location = NEW.location
+        WHERE rowid = (SELECT id FROM job_search_keys WHERE job_id = NEW.id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS jobs_fts_ad AFTER DELETE ON jobs BEGIN
+        DELETE FROM jobs_fts WHERE rowid = (SELECT id FROM job_search_keys WHERE job_id = OLD.id);
+        DELETE FROM job_search_keys WHERE job_id = OLD.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS users_fts_au AFTER UPDATE OF name ON users BEGIN
+        UPDATE jobs_fts SET company_name = NEW.name
+        WHERE rowid IN (
+            SELECT k.id FROM job_search_keys k JOIN jobs j ON j.id = k.job_id
+            WHERE j.created_by = NEW.id
+        );
+    END
+    """,
+]
+
+POSTGRES_SEARCH_DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS job_search (
+        job_id VARCHAR PRIMARY KEY REFERENCES jobs (id) ON DELETE CASCADE,
+        document TSVECTOR NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_job_search_document ON job_search USING GIN (document)",
+    """
+    CREATE OR REPLACE FUNCTION job_search_document(j jobs) RETURNS tsvector AS $$
+        SELECT setweight(to_tsvector('simple', coalesce(j.title, '')), 'A')
+            || setweight(to_tsvector('simple', coalesce(j.description, '')), 'B')
+            || setweight(to_tsvector('simple', coalesce(j.location, '')), 'C')
+            || setweight(to_tsvector('simple', coalesce(
+                   (SELECT u.name FROM users u WHERE u.id = j.created_by), '')), 'D')
+    $$ LANGUAGE SQL STABLE
+    """,
+    """
+    CREATE OR REPLACE FUNCTION jobs_search_sync() RETURNS trigger AS $$
+    BEGIN
+        INSERT INTO job_search (job_id, document) VALUES (NEW.id, job_search_document(NEW))
+        ON CONFLICT (job_id) DO UPDATE SET document = EXCLUDED.document;
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS jobs_search_sync ON jobs",
+    """
+    CREATE TRIGGER jobs_search_sync AFTER INSERT OR UPDATE OF title, description, location ON jobs
+    FOR EACH ROW EXECUTE FUNCTION jobs_search_sync()
+    """,
+    """
+    CREATE OR REPLACE FUNCTION users_search_sync() RETURNS trigger AS $$
+    BEGIN
+        UPDATE job_search s SET document = job_search_document(j)
+        FROM jobs j WHERE j.id = s.job_id AND j.created_by = NEW.id;
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS users_search_sync ON users",
+    """
+    CREATE TRIGGER users_search_sync AFTER UPDATE OF name ON users
+    FOR EACH ROW EXECUTE FUNCTION users_search_sync()
+    """,
+]
+
+COUNTERS_BACKFILL = """
+    INSERT INTO job_application_stats (job_id, total, applied, reviewed, interview, rejected, hired)
+    SELECT j.id,
+           COUNT(a.id),
+           SUM(CASE WHEN a.status = 'applied' THEN 1 ELSE 0 END),
+           SUM(CASE WHEN a.status = 'reviewed' THEN 1 ELSE 0 END),
+           SUM(CASE WHEN a.status = 'interview' THEN 1 ELSE 0 END),
+           SUM(CASE WHEN a.status = 'rejected' THEN 1 ELSE 0 END),
+           SUM(CASE WHEN a.status = 'hired' THEN 1 ELSE 0 END)
+    FROM jobs j LEFT JOIN applications a ON a.job_id = j.id
+    GROUP BY j.id
+"""
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    existing = set(sa.inspect(bind).get_table_names())
+
+    if "users" not in existing:
+        op.create_table(
+            "users",
+            sa.Column("id", sa.String(), primary_key=True),
+            sa.Column("name", sa.String(), nullable=False),
+            sa.Column("email", sa.String(), nullable=False),
+            sa.Column("password", sa.String(), nullable=False),
+            sa.Column("role", USER_ROLE, nullable=False),
+            sa.Column("is_verified", sa.Integer()),
+        )
+        op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    if "jobs" not in existing:
+        op.create_table(
+            "jobs",
+            sa.Column("id", sa.String(), primary_key=True),
+            sa.Column("title", sa.String(100), nullable=False),
+            sa.Column("description", sa.Text(), nullable=False),
+            sa.Column("location", sa.String()),
+            sa.Column("status", JOB_STATUS),
+            sa.Column("created_by", sa.String(), sa.ForeignKey("users.id"), nullable=False),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+
+    if "applications" not in existing:
+        op.create_table(
+            "applications",
+            sa.Column("id", sa.String(), primary_key=True),
+            sa.Column("applicant_id", sa.String(), sa.ForeignKey("users.id"), nullable=False),
+            sa.Column("job_id", sa.String(), sa.ForeignKey("jobs.id"), nullable=False),
+            sa.Column("resume_link", sa.String(), nullable=False),
+            sa.Column("cover_letter", sa.Text()),
+            sa.Column("status", APPLICATION_STATUS),
+            sa.Column("applied_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+
+    if "job_application_stats" not in existing:
+        op.create_table(
+            "job_application_stats",
+            sa.Column("job_id", sa.String(), sa.ForeignKey("jobs.id"), primary_key=True),
+            sa.Column("total", sa.Integer(), nullable=False),
+            sa.Column("applied", sa.Integer(), nullable=False),
+            sa.Column("reviewed", sa.Integer(), nullable=False),
+            sa.Column("interview", sa.Integer(), nullable=False),
+            sa.Column("rejected", sa.Integer(), nullable=False),
+            sa.Column("hired", sa.Integer(), nullable=False),
+        )
+        op.execute(COUNTERS_BACKFILL)
+
+    if "notification_outbox" not in existing:
+        op.create_table(
+            "notification_outbox",
+            sa.Column("id", sa.String(), primary_key=True),
+            sa.Column("kind", sa.String(50), nullable=False),
+            sa.Column("recipient", sa.String(), nullable=False),
+            sa.Column("subject", sa.String(), nullable=False),
+            sa.Column("body", sa.Text(), nullable=False),
+            sa.Column("coalesce_key", sa.String()),
+            sa.Column("status", NOTIFICATION_STATUS, nullable=False),
+            sa.Column("attempts", sa.Integer(), nullable=False),
+            sa.Column("next_attempt_at", sa.DateTime(timezone=True), nullable=False),
+            sa.Column("claimed_by", sa.String()),
+            sa.Column("claimed_at", sa.DateTime(timezone=True)),
+            sa.Column("last_error", sa.Text()),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column("sent_at", sa.DateTime(timezone=True)),
+        )
+        op.create_index("ix_notification_outbox_due", "notification_outbox", ["status", "next_attempt_at"])
+
+    # full-text search index, kept in sync by triggers (see search.py)
+    if bind.dialect.name == "sqlite":
+        fresh = "jobs_fts" not in existing
+        for stmt in SQLITE_SEARCH_DDL:
+            op.execute(stmt)
+        if fresh:
+            op.execute("DELETE FROM job_search_keys")
+            op.execute("INSERT INTO job_search_keys (job_id) SELECT id FROM jobs")
+            op.execute(
+                "INSERT INTO jobs_fts (rowid, title, description, location, company_name) "
+                "SELECT k.id, j.title, j.description, j.location, u.name "
+                "FROM job_search_keys k JOIN jobs j ON j.id = k.job_id "
+                "LEFT JOIN users u ON u.id = j.created_by"
+            )
+    elif bind.dialect.name == "postgresql":
+        for stmt in POSTGRES_SEARCH_DDL:
+            op.execute(stmt)
+        op.execute(
+            "INSERT INTO job_search (job_id, document) "
+            "SELECT j.id, job_search_document(j) FROM jobs j "
+            "ON CONFLICT (job_id) DO NOTHING"
+        )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == "sqlite":
+        for name in ("users_fts_au", "jobs_fts_ad", "jobs_fts_au", "jobs_fts_ai"):
+            op.execute(f"DROP TRIGGER IF EXISTS {name}")
+        op.execute("DROP TABLE IF EXISTS jobs_fts")
+        op.execute("DROP TABLE IF EXISTS job_search_keys")
+    elif bind.dialect.name == "postgresql":
+        op.execute("DROP TRIGGER IF EXISTS users_search_sync ON users")
+        op.execute("DROP TRIGGER IF EXISTS jobs_search_sync ON jobs")
+        op.execute("DROP FUNCTION IF EXISTS users_search_sync()")
+        op.execute("DROP FUNCTION IF EXISTS jobs_search_sync()")
+        op.execute("DROP TABLE IF EXISTS job_search")
+        op.execute("DROP FUNCTION IF EXISTS job_search_document(jobs)")
+
+    op.drop_index("ix_notification_outbox_due", table_name="notification_outbox")
+    op.drop_table("notification_outbox")
+    op.drop_table("job_application_stats")
+    op.drop_table("applications")
+    op.drop_table("jobs")
+    op.drop_index("ix_users_email", table_name="users")
+    op.drop_table("users")
+    for enum in (NOTIFICATION_STATUS, APPLICATION_STATUS, JOB_STATUS, USER_ROLE):
+        enum.drop(bind, checkfirst=True)
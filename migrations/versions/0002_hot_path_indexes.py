@@ -0,0 +1,83 @@
+"""hot-path indexes and one application per applicant and job
+
+Adds composite indexes matching the filters and sort orders used by the list
+endpoints, and a unique index on applications (job_id, applicant_id) so that
+duplicate applications are rejected by the database itself. Any duplicates
+already present are removed first, keeping each applicant's earliest
+application, and the application counters are rebuilt if that happened.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 00:00:01
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, Sequence[str], None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = [
+    # view_my_jobs: created_by = ? [AND status = ?] ORDER BY created_at DESC, id DESC
+    ("ix_jobs_created_by_created_at", "jobs", ["created_by", "created_at", "id"]),
+    ("ix_jobs_created_by_status_created_at", "jobs", ["created_by", "status", "created_at", "id"]),
+    # browse_jobs without a search term: ORDER BY created_at DESC, id DESC
+    ("ix_jobs_created_at", "jobs", ["created_at", "id"]),
+    # view_job_applications: job_id = ? [AND status = ?] ORDER BY applied_at DESC, id DESC
+    ("ix_applications_job_applied_at", "applications", ["job_id", "applied_at", "id"]),
+    ("ix_applications_job_status_applied_at", "applications", ["job_id", "status", "applied_at", "id"]),
+    # an applicant's own applications
+    ("ix_applications_applicant_id", "applications", ["applicant_id"]),
+]
+
+DELETE_DUPLICATE_APPLICATIONS = """
+    DELETE FROM applications WHERE id IN (
+        SELECT a.id FROM applications a
+        WHERE EXISTS (
+            SELECT 1 FROM applications b
+            WHERE b.job_id = a.job_id AND b.applicant_id = a.applicant_id
+              AND (b.applied_at < a.applied_at OR (b.applied_at = a.applied_at AND b.id < a.id))
+        )
+    )
+"""
+
+REBUILD_COUNTERS = [
+    "DELETE FROM job_application_stats",
+    """
+    INSERT INTO job_application_stats (job_id, total, applied, reviewed, interview, rejected, hired)
+    SELECT j.id,
+           COUNT(a.id),
+           SUM(CASE WHEN a.status = 'applied' THEN 1 ELSE 0 END),
+           SUM(CASE WHEN a.status = 'reviewed' THEN 1 ELSE 0 END),
+           SUM(CASE WHEN a.status = 'interview' THEN 1 ELSE 0 END),
+           SUM(CASE WHEN a.status = 'rejected' THEN 1 ELSE 0 END),
+           SUM(CASE WHEN a.status = 'hired' THEN 1 ELSE 0 END)
+    FROM jobs j LEFT JOIN applications a ON a.job_id = j.id
+    GROUP BY j.id
+    """,
+]
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    removed = bind.execute(sa.text(DELETE_DUPLICATE_APPLICATIONS)).rowcount
+    if removed:
+        for stmt in REBUILD_COUNTERS:
+            op.execute(stmt)
+
+    op.create_index("uq_applications_job_applicant", "applications", ["job_id", "applicant_id"], unique=True)
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
+    op.drop_index("uq_applications_job_applicant", table_name="applications")
@@ -0,0 +1,44 @@
+"""job versions and catalog generation
+
+Adds jobs.version / jobs.updated_at, bumped on every job write, and the
+single-row catalog_state table whose generation changes with any job write.
+They back the ETag and Last-Modified headers of job details and browse.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 00:00:02
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, Sequence[str], None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # plain ADD COLUMN (no batch copy) so the search triggers on jobs survive on SQLite
+    op.add_column("jobs", sa.Column("version", sa.Integer(), nullable=False, server_default="1"))
+    op.add_column("jobs", sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True))
+    op.execute("UPDATE jobs SET updated_at = created_at")
+
+    catalog_state = op.create_table(
+        "catalog_state",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("generation", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.execute(catalog_state.insert().values(id=1, generation=1, updated_at=sa.func.now()))
+
+
+def downgrade() -> None:
+    op.drop_table("catalog_state")
+    # ALTER TABLE ... DROP COLUMN (SQLite 3.35+) rather than a batch copy, for the same reason
+    op.execute("ALTER TABLE jobs DROP COLUMN updated_at")
+    op.execute("ALTER TABLE jobs DROP COLUMN version")
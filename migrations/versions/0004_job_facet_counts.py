@@ -0,0 +1,50 @@
+"""job facet counts
+
+Adds job_facet_counts, the number of jobs per location and per company for
+each job status, which browse serves its facet counts from. It is filled from
+the existing jobs here and kept up to date by facets.py on every job write.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 00:00:03
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, Sequence[str], None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# the type already exists on Postgres (created with jobs.status)
+JOB_STATUS = sa.Enum("draft", "open", "closed", name="jobstatus", create_type=False)
+
+FACETS_BACKFILL = """
+INSERT INTO job_facet_counts (facet, value, status, count)
+SELECT 'location', COALESCE(location, ''), status, COUNT(*) FROM jobs
+WHERE status IS NOT NULL GROUP BY COALESCE(location, ''), status
+UNION ALL
+SELECT 'company', created_by, status, COUNT(*) FROM jobs
+WHERE status IS NOT NULL GROUP BY created_by, status
+"""
+
+
+def upgrade() -> None:
+    op.create_table(
+        "job_facet_counts",
+        sa.Column("facet", sa.String(16), primary_key=True),
+        sa.Column("value", sa.String(), primary_key=True),
+        sa.Column("status", JOB_STATUS, primary_key=True),
+        sa.Column("count", sa.Integer(), nullable=False),
+    )
+    op.execute(FACETS_BACKFILL)
+
+
+def downgrade() -> None:
+    op.drop_table("job_facet_counts")
@@ -0,0 +1,90 @@
+"""binary uuid keys
+
+Converts the ids of users, jobs and applications, and every column that
+refers to them, from 36-character strings to 16-byte blobs on SQLite and to
+the native uuid type on Postgres (see guid.py). On SQLite the values are
+rewritten in place and the columns keep their declared type, since SQLite
+stores a blob as-is whatever the column's affinity; run VACUUM afterwards to
+give the freed pages back (`python manage.py convert-ids` does both). On
+Postgres the foreign keys are dropped for the type change and recreated.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 00:00:04
+
+"""
+import uuid
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, Sequence[str], None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+ID_COLUMNS = [
+    ("users", "id"),
+    ("jobs", "id"),
+    ("jobs", "created_by"),
+    ("applications", "id"),
+    ("applications", "applicant_id"),
+    ("applications", "job_id"),
+    ("job_application_stats", "job_id"),
+]
+
+# search index key tables from 0001
+SQLITE_ID_COLUMNS = ID_COLUMNS + [("job_search_keys", "job_id")]
+POSTGRES_ID_COLUMNS = ID_COLUMNS + [("job_search", "job_id")]
+
+# (constraint, table, column, referenced table, ON DELETE) as Postgres named them in 0001
+POSTGRES_FOREIGN_KEYS = [
+    ("jobs_created_by_fkey", "jobs", "created_by", "users", None),
+    ("applications_applicant_id_fkey", "applications", "applicant_id", "users", None),
+    ("applications_job_id_fkey", "applications", "job_id", "jobs", None),
+    ("job_application_stats_job_id_fkey", "job_application_stats", "job_id", "jobs", None),
+    ("job_search_job_id_fkey", "job_search", "job_id", "jobs", "CASCADE"),
+]
+
+
+def _guid_blob(value):
+    return uuid.UUID(value).bytes if isinstance(value, str) else value
+
+
+def _guid_str(value):
+    return str(uuid.UUID(bytes=bytes(value))) if isinstance(value, bytes) else value
+
+
+def _convert_sqlite(function, from_type: str):
+    # a Python function on the raw connection does the conversion, one UPDATE per column
+    op.get_bind().connection.driver_connection.create_function("convert_guid", 1, function, deterministic=True)
+    for table, column in SQLITE_ID_COLUMNS:
+        op.execute(f"UPDATE {table} SET {column} = convert_guid({column}) WHERE typeof({column}) = '{from_type}'")
+
+
+def _convert_postgres(sql_type: str, cast: str):
+    for name, table, _, _, _ in POSTGRES_FOREIGN_KEYS:
+        op.execute(f"ALTER TABLE {table} DROP CONSTRAINT {name}")
+    for table, column in POSTGRES_ID_COLUMNS:
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} TYPE {sql_type} USING {column}::{cast}")
+    for name, table, column, referred, ondelete in POSTGRES_FOREIGN_KEYS:
+        op.create_foreign_key(name, table, referred, [column], ["id"], ondelete=ondelete)
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        _convert_sqlite(_guid_blob, "text")
+    elif dialect == "postgresql":
+        _convert_postgres("UUID", "uuid")
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        _convert_sqlite(_guid_str, "blob")
+    elif dialect == "postgresql":
+        _convert_postgres("VARCHAR", "text")
@@ -0,0 +1,77 @@
+"""job archive
+
+Adds jobs_archive and applications_archive, where archive.py moves closed
+jobs past the retention window together with their applications, and the
+(status, updated_at) index on jobs it finds them with.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 00:00:05
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, Sequence[str], None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# ids as stored since 0005: 16 bytes, native uuid on Postgres
+ID = sa.LargeBinary(16).with_variant(postgresql.UUID(as_uuid=False), "postgresql")
+
+# the types already exist on Postgres (created with jobs / applications)
+JOB_STATUS = sa.Enum("draft", "open", "closed", name="jobstatus", create_type=False)
+APPLICATION_STATUS = sa.Enum("applied", "reviewed", "interview", "rejected", "hired",
+                             name="applicationstatus", create_type=False)
+
+
+def upgrade() -> None:
+    op.create_index("ix_jobs_status_updated_at", "jobs", ["status", "updated_at"])
+
+    op.create_table(
+        "jobs_archive",
+        sa.Column("id", ID, primary_key=True),
+        sa.Column("title", sa.String(100), nullable=False),
+        sa.Column("description", sa.Text(), nullable=False),
+        sa.Column("location", sa.String()),
+        sa.Column("status", JOB_STATUS, nullable=False),
+        sa.Column("created_by", ID, sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True)),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+        sa.Column("total", sa.Integer(), nullable=False),
+        sa.Column("applied", sa.Integer(), nullable=False),
+        sa.Column("reviewed", sa.Integer(), nullable=False),
+        sa.Column("interview", sa.Integer(), nullable=False),
+        sa.Column("rejected", sa.Integer(), nullable=False),
+        sa.Column("hired", sa.Integer(), nullable=False),
+        sa.Column("archived_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index("ix_jobs_archive_created_by_created_at", "jobs_archive", ["created_by", "created_at", "id"])
+
+    op.create_table(
+        "applications_archive",
+        sa.Column("id", ID, primary_key=True),
+        sa.Column("applicant_id", ID, sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("job_id", ID, sa.ForeignKey("jobs_archive.id"), nullable=False),
+        sa.Column("resume_link", sa.String(), nullable=False),
+        sa.Column("cover_letter", sa.Text()),
+        sa.Column("status", APPLICATION_STATUS),
+        sa.Column("applied_at", sa.DateTime(timezone=True)),
+        sa.Column("archived_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index("ix_applications_archive_job_applied_at", "applications_archive", ["job_id", "applied_at", "id"])
+    op.create_index("ix_applications_archive_applicant_id", "applications_archive", ["applicant_id"])
+
+
+def downgrade() -> None:
+    op.drop_table("applications_archive")
+    op.drop_table("jobs_archive")
+    op.drop_index("ix_jobs_status_updated_at", table_name="jobs")
@@ -0,0 +1,107 @@
+"""resume texts
+
+Adds resume_texts, the extraction queue and extracted text of every stored
+resume file (see resumes.py), and its full-text index: an external-content
+FTS5 table kept in sync by triggers on SQLite, a generated tsvector column
+behind a GIN index on Postgres. The resumes of existing applications are
+queued here; the background extractor works through them.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17 00:00:06
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0007"
+down_revision: Union[str, Sequence[str], None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+EXTRACTION_STATUS = sa.Enum("pending", "extracting", "done", "failed", name="extractionstatus")
+
+SQLITE_SEARCH_DDL = [
+    """
+    CREATE VIRTUAL TABLE resume_fts USING fts5(
+        body, content = 'resume_texts', content_rowid = 'id',
+        tokenize = 'unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER resume_fts_ai AFTER INSERT ON resume_texts BEGIN
+        INSERT INTO resume_fts (rowid, body) SELECT NEW.id, NEW.body WHERE NEW.body IS NOT NULL;
+    END
+    """,
+    """
+    CREATE TRIGGER resume_fts_au AFTER UPDATE OF body ON resume_texts BEGIN
+        INSERT INTO resume_fts (resume_fts, rowid, body) SELECT 'delete', OLD.id, OLD.body WHERE OLD.body IS NOT NULL;
+        INSERT INTO resume_fts (rowid, body) SELECT NEW.id, NEW.body WHERE NEW.body IS NOT NULL;
+    END
+    """,
+    """
+    CREATE TRIGGER resume_fts_ad AFTER DELETE ON resume_texts BEGIN
+        INSERT INTO resume_fts (resume_fts, rowid, body) SELECT 'delete', OLD.id, OLD.body WHERE OLD.body IS NOT NULL;
+    END
+    """,
+]
+
+POSTGRES_SEARCH_DDL = [
+    """
+    ALTER TABLE resume_texts ADD COLUMN document TSVECTOR
+    GENERATED ALWAYS AS (to_tsvector('simple', coalesce(body, ''))) STORED
+    """,
+    "CREATE INDEX ix_resume_texts_document ON resume_texts USING GIN (document)",
+]
+
+# {pending} is the enum literal, typed on Postgres
+QUEUE_BACKFILL = """
+INSERT INTO resume_texts (resume_link, status, attempts, next_attempt_at)
+SELECT DISTINCT resume_link, {pending}, 0, CURRENT_TIMESTAMP FROM applications
+"""
+
+
+def upgrade() -> None:
+    op.create_table(
+        "resume_texts",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("resume_link", sa.String(), nullable=False, unique=True),
+        sa.Column("status", EXTRACTION_STATUS, nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("next_attempt_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("claimed_by", sa.String()),
+        sa.Column("claimed_at", sa.DateTime(timezone=True)),
+        sa.Column("last_error", sa.Text()),
+        sa.Column("body", sa.Text()),
+        sa.Column("extracted_at", sa.DateTime(timezone=True)),
+    )
+    op.create_index("ix_resume_texts_due", "resume_texts", ["status", "next_attempt_at"])
+
+    dialect = op.get_bind().dialect.name
+    pending = "'pending'"
+    if dialect == "sqlite":
+        for stmt in SQLITE_SEARCH_DDL:
+            op.execute(stmt)
+    elif dialect == "postgresql":
+        for stmt in POSTGRES_SEARCH_DDL:
+            op.execute(stmt)
+        pending = "'pending'::extractionstatus"
+
+    op.execute(QUEUE_BACKFILL.format(pending=pending))
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        for name in ("resume_fts_ad", "resume_fts_au", "resume_fts_ai"):
+            op.execute(f"DROP TRIGGER IF EXISTS {name}")
+        op.execute("DROP TABLE IF EXISTS resume_fts")
+    op.drop_index("ix_resume_texts_due", table_name="resume_texts")
+    op.drop_table("resume_texts")
+    if dialect == "postgresql":
+        EXTRACTION_STATUS.drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,35 @@
+"""catalog token
+
+Adds catalog_state.token, a random value per database. The recommendation
+index records it (with the catalog generation) when it is built and is
+rebuilt when it no longer matches, e.g. after a restore or when an index
+directory is reused against another database.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17 00:00:07
+
+"""
+import uuid
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0008"
+down_revision: Union[str, Sequence[str], None] = "0007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("catalog_state", sa.Column("token", sa.String(32), nullable=True))
+    catalog_state = sa.table("catalog_state", sa.column("token", sa.String))
+    op.execute(catalog_state.update().values(token=uuid.uuid4().hex))
+
+
+def downgrade() -> None:
+    # ALTER TABLE ... DROP COLUMN (SQLite 3.35+) rather than a batch copy, as in 0003
+    op.execute("ALTER TABLE catalog_state DROP COLUMN token")
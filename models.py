@@ -1,11 +1,12 @@
 import uuid
-from sqlalchemy import Column, String, Enum, ForeignKey, Text, DateTime
+from sqlalchemy import Column, String, Enum, ForeignKey, Text, DateTime, Index
 from sqlalchemy.dialects.sqlite import INTEGER
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 import enum
 
 from database import Base
+from guid import GUID, new_id
 
 class UserRole(str, enum.Enum):
     applicant = "applicant"
@@ -23,10 +24,22 @@ class ApplicationStatus(str, enum.Enum):
     rejected = "Rejected"
     hired = "Hired"
 
+class ExtractionStatus(str, enum.Enum):
+    pending = "Pending"
+    extracting = "Extracting"
+    done = "Done"
+    failed = "Failed"
+
+class NotificationStatus(str, enum.Enum):
+    pending = "Pending"
+    sending = "Sending"
+    sent = "Sent"
+    failed = "Failed"
+
 class User(Base):
     __tablename__ = "users"
 
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(GUID, primary_key=True, default=new_id)
     name = Column(String, nullable=False)
     email = Column(String, unique=True, index=True, nullable=False)
     password = Column(String, nullable=False)
@@ -39,23 +52,34 @@ class User(Base):
 class Job(Base):
     __tablename__ = "jobs"
 
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(GUID, primary_key=True, default=new_id)
     title = Column(String(100), nullable=False)
     description = Column(Text, nullable=False)
     location = Column(String, nullable=True)
     status = Column(Enum(JobStatus), default=JobStatus.draft)
-    created_by = Column(String, ForeignKey("users.id"), nullable=False)
+    created_by = Column(GUID, ForeignKey("users.id"), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # bumped on every change; with updated_at it drives the job's ETag and Last-Modified
+    version = Column(INTEGER, nullable=False, default=1, server_default="1")
+    updated_at = Column(DateTime(timezone=True), default=func.now(), onupdate=func.now())
 
     creator = relationship("User", back_populates="jobs")
     applications = relationship("Application", back_populates="job")
 
+    __table_args__ = (
+        Index("ix_jobs_created_by_created_at", "created_by", "created_at", "id"),
+        Index("ix_jobs_created_by_status_created_at", "created_by", "status", "created_at", "id"),
+        Index("ix_jobs_created_at", "created_at", "id"),
+        # closed jobs past the retention window, for the archiver
+        Index("ix_jobs_status_updated_at", "status", "updated_at"),
+    )
+
 class Application(Base):
     __tablename__ = "applications"
 
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    applicant_id = Column(String, ForeignKey("users.id"), nullable=False)
-    job_id = Column(String, ForeignKey("jobs.id"), nullable=False)
+    id = Column(GUID, primary_key=True, default=new_id)
+    applicant_id = Column(GUID, ForeignKey("users.id"), nullable=False)
+    job_id = Column(GUID, ForeignKey("jobs.id"), nullable=False)
     resume_link = Column(String, nullable=False)
     cover_letter = Column(Text, nullable=True)
     status = Column(Enum(ApplicationStatus), default=ApplicationStatus.applied)
@@ -63,3 +87,126 @@ class Application(Base):
 
     applicant = relationship("User", back_populates="applications")
     job = relationship("Job", back_populates="applications")
+
+    __table_args__ = (
+        # one application per applicant and job, enforced by the database
+        Index("uq_applications_job_applicant", "job_id", "applicant_id", unique=True),
+        Index("ix_applications_job_applied_at", "job_id", "applied_at", "id"),
+        Index("ix_applications_job_status_applied_at", "job_id", "status", "applied_at", "id"),
+        Index("ix_applications_applicant_id", "applicant_id"),
+    )
+
+class JobApplicationStats(Base):
+    """Per-job application counters, maintained by counters.py alongside every application write."""
+    __tablename__ = "job_application_stats"
+
+    job_id = Column(GUID, ForeignKey("jobs.id"), primary_key=True)
+    total = Column(INTEGER, default=0, nullable=False)
+    applied = Column(INTEGER, default=0, nullable=False)
+    reviewed = Column(INTEGER, default=0, nullable=False)
+    interview = Column(INTEGER, default=0, nullable=False)
+    rejected = Column(INTEGER, default=0, nullable=False)
+    hired = Column(INTEGER, default=0, nullable=False)
+
+class JobArchive(Base):
+    """Closed job moved out of jobs by archive.py, with its final application counters."""
+    __tablename__ = "jobs_archive"
+
+    id = Column(GUID, primary_key=True)
+    title = Column(String(100), nullable=False)
+    description = Column(Text, nullable=False)
+    location = Column(String, nullable=True)
+    status = Column(Enum(JobStatus), nullable=False)
+    created_by = Column(GUID, ForeignKey("users.id"), nullable=False)
+    created_at = Column(DateTime(timezone=True))
+    version = Column(INTEGER, nullable=False)
+    updated_at = Column(DateTime(timezone=True))
+    total = Column(INTEGER, default=0, nullable=False)
+    applied = Column(INTEGER, default=0, nullable=False)
+    reviewed = Column(INTEGER, default=0, nullable=False)
+    interview = Column(INTEGER, default=0, nullable=False)
+    rejected = Column(INTEGER, default=0, nullable=False)
+    hired = Column(INTEGER, default=0, nullable=False)
+    archived_at = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        Index("ix_jobs_archive_created_by_created_at", "created_by", "created_at", "id"),
+    )
+
+class ApplicationArchive(Base):
+    """Application of an archived job, moved out of applications by archive.py."""
+    __tablename__ = "applications_archive"
+
+    id = Column(GUID, primary_key=True)
+    applicant_id = Column(GUID, ForeignKey("users.id"), nullable=False)
+    job_id = Column(GUID, ForeignKey("jobs_archive.id"), nullable=False)
+    resume_link = Column(String, nullable=False)
+    cover_letter = Column(Text, nullable=True)
+    status = Column(Enum(ApplicationStatus))
+    applied_at = Column(DateTime(timezone=True))
+    archived_at = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        Index("ix_applications_archive_job_applied_at", "job_id", "applied_at", "id"),
+        Index("ix_applications_archive_applicant_id", "applicant_id"),
+    )
+
+class JobFacetCount(Base):
+    """Job counts per facet value (location, company) and job status, maintained by facets.py alongside every job write."""
+    __tablename__ = "job_facet_counts"
+
+    facet = Column(String(16), primary_key=True)
+    value = Column(String, primary_key=True)  # "" for jobs without a location
+    status = Column(Enum(JobStatus), primary_key=True)
+    count = Column(INTEGER, default=0, nullable=False)
+
+class CatalogState(Base):
+    """Single row whose generation is bumped by every job write; browse ETags are derived from it (see catalog.py)."""
+    __tablename__ = "catalog_state"
+
+    id = Column(INTEGER, primary_key=True)
+    generation = Column(INTEGER, nullable=False, default=1)
+    updated_at = Column(DateTime(timezone=True), nullable=False, default=func.now())
+    token = Column(String(32), nullable=True)  # random per database; derived caches (recommend.py) check it
+
+class ResumeText(Base):
+    """Extraction queue entry and extracted text of one stored resume file, filled by resumes.Extractor."""
+    __tablename__ = "resume_texts"
+
+    id = Column(INTEGER, primary_key=True, autoincrement=True)  # rowid of the SQLite full-text index
+    resume_link = Column(String, unique=True, nullable=False)
+    status = Column(Enum(ExtractionStatus), default=ExtractionStatus.pending, nullable=False)
+    attempts = Column(INTEGER, default=0, nullable=False)
+    next_attempt_at = Column(DateTime(timezone=True), nullable=False)
+    claimed_by = Column(String, nullable=True)
+    claimed_at = Column(DateTime(timezone=True), nullable=True)
+    last_error = Column(Text, nullable=True)
+    body = Column(Text, nullable=True)  # normalized text, indexed for keyword search
+    extracted_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("ix_resume_texts_due", "status", "next_attempt_at"),
+    )
+
+class Notification(Base):
+    """Outbox row: written in the same transaction as the change it reports, delivered later by notifications.Dispatcher."""
+    __tablename__ = "notification_outbox"
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    kind = Column(String(50), nullable=False)
+    recipient = Column(String, nullable=False)
+    subject = Column(String, nullable=False)
+    body = Column(Text, nullable=False)
+    coalesce_key = Column(String, nullable=True)  # rows sharing a key are delivered as one digest
+    status = Column(Enum(NotificationStatus), default=NotificationStatus.pending, nullable=False)
+    attempts = Column(INTEGER, default=0, nullable=False)
+    next_attempt_at = Column(DateTime(timezone=True), nullable=False)
+    claimed_by = Column(String, nullable=True)
+    claimed_at = Column(DateTime(timezone=True), nullable=True)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    sent_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("ix_notification_outbox_due", "status", "next_attempt_at"),
+    )
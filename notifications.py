@@ -0,0 +1,291 @@
+# notifications.py
+"""
+Transactional outbox for outgoing notifications.
+
+Handlers call enqueue() inside their own transaction, so a notification
+exists exactly when the change it reports was committed. A background
+Dispatcher drains the outbox: it claims due rows in batches, merges rows
+sharing a coalesce key (e.g. several applications to one company) into a
+single digest, hands them to a Transport and retries failures with
+exponential backoff. Request latency never depends on the mail provider.
+"""
+import logging
+import os
+import smtplib
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from typing import List, Optional
+
+from sqlalchemy.orm import Session
+
+import models
+from database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_TRANSPORT = os.getenv("NOTIFY_TRANSPORT", "console")
+NOTIFY_FILE_DIR = os.getenv("NOTIFY_FILE_DIR", "./outbox")
+NOTIFY_DISPATCHER_ENABLED = os.getenv("NOTIFY_DISPATCHER_ENABLED", "true").lower() in ("1", "true", "yes")
+NOTIFY_POLL_SECONDS = float(os.getenv("NOTIFY_POLL_SECONDS", "2"))
+NOTIFY_BATCH_SIZE = int(os.getenv("NOTIFY_BATCH_SIZE", "100"))
+NOTIFY_COALESCE_SECONDS = float(os.getenv("NOTIFY_COALESCE_SECONDS", "10"))
+NOTIFY_MAX_ATTEMPTS = int(os.getenv("NOTIFY_MAX_ATTEMPTS", "8"))
+NOTIFY_BACKOFF_SECONDS = float(os.getenv("NOTIFY_BACKOFF_SECONDS", "5"))
+NOTIFY_BACKOFF_MAX_SECONDS = float(os.getenv("NOTIFY_BACKOFF_MAX_SECONDS", "3600"))
+NOTIFY_CLAIM_LEASE_SECONDS = float(os.getenv("NOTIFY_CLAIM_LEASE_SECONDS", "300"))
+
+SMTP_HOST = os.getenv("SMTP_HOST", "localhost")
+SMTP_PORT = int(os.getenv("SMTP_PORT", "25"))
+SMTP_USER = os.getenv("SMTP_USER")
+SMTP_PASSWORD = os.getenv("SMTP_PASSWORD")
+SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "false").lower() in ("1", "true", "yes")
+SMTP_FROM = os.getenv("SMTP_FROM", "no-reply@jobportal.local")
+
+
+def enqueue(db: Session, *, kind: str, recipient: str, subject: str, body: str,
+            coalesce_key: Optional[str] = None) -> models.Notification:
+    """
+    Adds a notification to the outbox in the caller's transaction (no commit).
+    Coalescable notifications wait NOTIFY_COALESCE_SECONDS so that repeats can
+    be merged into one message.
+    """
+    delay = NOTIFY_COALESCE_SECONDS if coalesce_key else 0
+    notification = models.Notification(
+        kind=kind,
+        recipient=recipient,
+        subject=subject,
+        body=body,
+        coalesce_key=coalesce_key,
+        status=models.NotificationStatus.pending,
+        attempts=0,
+        next_attempt_at=datetime.utcnow() + timedelta(seconds=delay),
+    )
+    db.add(notification)
+    return notification
+
+
+# ======================
+# Transports
+# ======================
+def _email(recipient: str, subject: str, body: str) -> EmailMessage:
+    message = EmailMessage()
+    message["From"] = SMTP_FROM
+    message["To"] = recipient
+    message["Subject"] = subject
+    message.set_content(body)
+    return message
+
+
+class Transport:
+    def send_batch(self, messages: List[EmailMessage]) -> List[Optional[Exception]]:
+        """Delivers messages, returning one entry per message: None on success, else the error."""
+        raise NotImplementedError
+
+
+class ConsoleTransport(Transport):
+    """Dev stand-in: prints each message."""
+
+    def send_batch(self, messages):
+        for message in messages:
+            print(f"=== EMAIL to {message['To']} ===")
+            print(f"Subject: {message['Subject']}")
+            print(message.get_content())
+            print("==========================")
+        return [None] * len(messages)
+
+
+class FileTransport(Transport):
+    """Local stand-in: writes each message as an .eml file into NOTIFY_FILE_DIR."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def send_batch(self, messages):
+        os.makedirs(self.directory, exist_ok=True)
+        results = []
+        for message in messages:
+            try:
+                name = f"{time.time():.6f}-{uuid.uuid4().hex[:8]}.eml"
+                with open(os.path.join(self.directory, name), "wb") as f:
+                    f.write(bytes(message))
+                results.append(None)
+            except OSError as e:
+                results.append(e)
+        return results
+
+
+class SMTPTransport(Transport):
+    """Sends a whole batch over a single SMTP connection."""
+
+    def send_batch(self, messages):
+        try:
+            smtp = smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=30)
+        except (OSError, smtplib.SMTPException) as e:
+            return [e] * len(messages)
+        results = []
+        try:
+            if SMTP_STARTTLS:
+                smtp.starttls()
+            if SMTP_USER:
+                smtp.login(SMTP_USER, SMTP_PASSWORD or "")
+            for message in messages:
+                try:
+                    smtp.send_message(message)
+                    results.append(None)
+                except smtplib.SMTPException as e:
+                    results.append(e)
+        except (OSError, smtplib.SMTPException) as e:
+            results += [e] * (len(messages) - len(results))
+        finally:
+            try:
+                smtp.quit()
+            except (OSError, smtplib.SMTPException):
+                pass
+        return results
+
+
+def get_transport() -> Transport:
+    if NOTIFY_TRANSPORT == "smtp":
+        return SMTPTransport()
+    if NOTIFY_TRANSPORT == "file":
+        return FileTransport(NOTIFY_FILE_DIR)
+    return ConsoleTransport()
+
+
+# ======================
+# Dispatcher
+# ======================
+def _backoff(attempts: int) -> timedelta:
+    return timedelta(seconds=min(NOTIFY_BACKOFF_SECONDS * (2 ** (attempts - 1)), NOTIFY_BACKOFF_MAX_SECONDS))
+
+
+def _digest(rows: List[models.Notification]) -> EmailMessage:
+    if len(rows) == 1:
+        return _email(rows[0].recipient, rows[0].subject, rows[0].body)
+    subject = f"{rows[0].subject} (+{len(rows) - 1} more)"
+    body = "\n\n".join(row.body for row in rows)
+    return _email(rows[0].recipient, subject, body)
+
+
+class Dispatcher:
+    def __init__(self, transport: Transport, session_factory=SessionLocal):
+        self.transport = transport
+        self.session_factory = session_factory
+        self.worker_id = uuid.uuid4().hex
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="notification-dispatcher", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 10):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                delivered = self.drain_once()
+            except Exception:
+                logger.exception("Notification dispatch failed")
+                delivered = 0
+            # keep draining while there is a backlog, otherwise poll
+            if delivered < NOTIFY_BATCH_SIZE:
+                self._stop.wait(NOTIFY_POLL_SECONDS)
+
+    def _claim(self, db: Session, now: datetime) -> List[models.Notification]:
+        Notification = models.Notification
+
+        # release claims of dispatchers that died mid-batch
+        db.query(Notification).filter(
+            Notification.status == models.NotificationStatus.sending,
+            Notification.claimed_at < now - timedelta(seconds=NOTIFY_CLAIM_LEASE_SECONDS),
+        ).update({Notification.status: models.NotificationStatus.pending, Notification.claimed_by: None},
+                 synchronize_session=False)
+
+        due = (
+            db.query(Notification.id)
+            .filter(Notification.status == models.NotificationStatus.pending,
+                    Notification.next_attempt_at <= now)
+            .order_by(Notification.next_attempt_at)
+            .limit(NOTIFY_BATCH_SIZE)
+            .subquery()
+        )
+        db.query(Notification).filter(
+            Notification.id.in_(due.select()),
+            Notification.status == models.NotificationStatus.pending,
+        ).update({Notification.status: models.NotificationStatus.sending,
+                  Notification.claimed_by: self.worker_id,
+                  Notification.claimed_at: now},
+                 synchronize_session=False)
+        db.commit()
+
+        return (
+            db.query(Notification)
+            .filter(Notification.claimed_by == self.worker_id,
+                    Notification.status == models.NotificationStatus.sending)
+            .order_by(Notification.created_at)
+            .all()
+        )
+
+    def drain_once(self) -> int:
+        """Delivers one batch of due notifications; returns how many outbox rows it handled."""
+        db = self.session_factory()
+        try:
+            now = datetime.utcnow()
+            rows = self._claim(db, now)
+            if not rows:
+                return 0
+
+            groups: "OrderedDict[str, List[models.Notification]]" = OrderedDict()
+            for row in rows:
+                key = f"{row.coalesce_key}|{row.recipient}" if row.coalesce_key else row.id
+                groups.setdefault(key, []).append(row)
+
+            results = self.transport.send_batch([_digest(group) for group in groups.values()])
+
+            for group, error in zip(groups.values(), results):
+                for row in group:
+                    row.claimed_by = None
+                    row.claimed_at = None
+                    if error is None:
+                        row.status = models.NotificationStatus.sent
+                        row.sent_at = now
+                        continue
+                    row.attempts += 1
+                    row.last_error = str(error)[:2000]
+                    if row.attempts >= NOTIFY_MAX_ATTEMPTS:
+                        row.status = models.NotificationStatus.failed
+                        logger.error("Giving up on notification %s to %s: %s", row.id, row.recipient, error)
+                    else:
+                        row.status = models.NotificationStatus.pending
+                        row.next_attempt_at = now + _backoff(row.attempts)
+            db.commit()
+            return len(rows)
+        finally:
+            db.close()
+
+
+_dispatcher: Optional[Dispatcher] = None
+
+
+def start_dispatcher():
+    global _dispatcher
+    if NOTIFY_DISPATCHER_ENABLED and _dispatcher is None:
+        _dispatcher = Dispatcher(get_transport())
+        _dispatcher.start()
+
+
+def stop_dispatcher():
+    global _dispatcher
+    if _dispatcher is not None:
+        _dispatcher.stop()
+        _dispatcher = None
@@ -0,0 +1,179 @@
+# pagination.py
+"""
+Pagination helpers shared by the list endpoints.
+
+Two modes are supported:
+  - page/size (offset) for existing clients;
+  - opaque cursors (keyset), which seek straight to the row after the last
+    one returned, so every page costs the same no matter how deep it is.
+
+Totals are served from a short-lived in-process cache instead of running a
+COUNT on every request.
+"""
+import base64
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Hashable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import DateTime, String, literal, tuple_, type_coerce
+
+from guid import GUID
+
+COUNT_CACHE_TTL_SECONDS = float(os.getenv("COUNT_CACHE_TTL_SECONDS", "30"))
+COUNT_CACHE_MAX_ENTRIES = int(os.getenv("COUNT_CACHE_MAX_ENTRIES", "4096"))
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+# ======================
+# Cursors
+# ======================
+def _cursor_value(value: Any):
+    # datetimes are kept in the same text form SQLite stores them in, so on
+    # SQLite the seek predicate compares them as text (see keyset_page)
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ")
+    if isinstance(value, (str, int, float)) or value is None:
+        return value
+    return str(value)
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    raw = json.dumps([_cursor_value(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, arity: int) -> List[Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise InvalidCursor("Malformed cursor")
+    if not isinstance(values, list) or len(values) != arity:
+        raise InvalidCursor("Cursor does not match this listing")
+    return values
+
+
+def _parse_datetime(value) -> datetime:
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise InvalidCursor("Malformed cursor")
+
+
+def _seek_value(column, value):
+    if isinstance(column.type, GUID):
+        try:
+            uuid.UUID(str(value))
+        except ValueError:
+            raise InvalidCursor("Malformed cursor")
+    return literal(value, column.type)
+
+
+def keyset_page(query, order_by: Sequence, cursor: str, size: int, row_key: Callable[[Any], Tuple]):
+    """
+    Returns (rows, next_cursor) for the page after `cursor` ("" for the first page).
+
+    `order_by` lists the columns the listing is sorted on, all descending, ending
+    with a unique column (the primary key) so the ordering is total. `row_key`
+    extracts the same values from a result row to build the next cursor.
+    """
+    if cursor:
+        values = decode_cursor(cursor, len(order_by))
+        on_sqlite = query.session.get_bind().dialect.name == "sqlite"
+        columns = []
+        for i, col in enumerate(order_by):
+            if isinstance(getattr(col, "type", None), DateTime):
+                # SQLite stores datetimes as text, so they are compared as text there;
+                # elsewhere the value is parsed back and compared as a timestamp
+                if on_sqlite:
+                    col = type_coerce(col, String)
+                else:
+                    values[i] = _parse_datetime(values[i])
+            columns.append(col)
+        # bind each value as its column's type, so ids are compared as ids (bytes on SQLite)
+        query = query.filter(tuple_(*columns) < tuple_(*[_seek_value(c, v) for c, v in zip(columns, values)]))
+
+    rows = query.order_by(*[col.desc() for col in order_by]).limit(size + 1).all()
+    next_cursor = encode_cursor(row_key(rows[size - 1])) if len(rows) > size else None
+    return rows[:size], next_cursor
+
+
+def offset_page(query, order_by: Sequence, page: int, size: int):
+    return query.order_by(*[col.desc() for col in order_by]).offset((page - 1) * size).limit(size).all()
+
+
+# ======================
+# Cached totals
+# ======================
+class _CountCache:
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[float, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], int]) -> int:
+        now = time.monotonic()
+        with self._lock:
+            hit = self._entries.get(key)
+            if hit and hit[0] > now:
+                return hit[1]
+        value = compute()
+        with self._lock:
+            self._entries[key] = (now + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+count_cache = _CountCache(COUNT_CACHE_TTL_SECONDS, COUNT_CACHE_MAX_ENTRIES)
+
+
+def cached_total(key: Hashable, count_query) -> int:
+    """Row count for `count_query`, reused for COUNT_CACHE_TTL_SECONDS per key."""
+    if COUNT_CACHE_TTL_SECONDS <= 0:
+        return count_query.count()
+    return count_cache.get_or_compute(key, count_query.count)
+
+
+def paginate(
+    query,
+    *,
+    order_by: Sequence,
+    row_key: Callable[[Any], Tuple],
+    count_query,
+    count_key: Hashable,
+    cursor: Optional[str] = None,
+    with_total: bool = False,
+    page: int = 1,
+    size: int = 10,
+):
+    """
+    Fetches one page of `query` and returns (rows, meta), where meta holds the
+    pagination fields of the response object.
+
+    With `cursor` set (an empty string starts from the top) the page is found
+    by keyset seek and the total is only included on request; otherwise the
+    classic page/size fields are returned.
+    """
+    if cursor is not None:
+        rows, next_cursor = keyset_page(query, order_by, cursor, size, row_key)
+        total = cached_total(count_key, count_query) if with_total else None
+        return rows, {"total": total, "size": size, "next_cursor": next_cursor}
+
+    total = cached_total(count_key, count_query)
+    rows = offset_page(query, order_by, page, size)
+    return rows, {"total": total, "page": page, "size": size, "pages": (total + size - 1) // size}
@@ -0,0 +1,514 @@
+# recommend.py
+"""
+"Recommended for you" jobs for applicants.
+
+Every open job is a sparse vector of hashed terms from its title (weighted
+TITLE_WEIGHT) and description: log-scaled term frequencies, cut to the job's
+RECOMMEND_TERMS_PER_JOB strongest terms and L2-normalised. The vectors are
+the rows of a CSR matrix (indptr / indices / data) kept in memory-mapped
+files under RECOMMEND_INDEX_DIR, alongside each row's job id, an alive flag
+and per-term document frequencies. Every worker maps the same files, so they
+share one copy through the page cache and start without rebuilding anything.
+
+An applicant's profile is built the same way from the titles, descriptions
+and cover letters of their latest applications, weighted by inverse document
+frequency. Ranking is one gather-multiply-reduce over the matrix (numpy), then
+a partial sort for the top results.
+
+Writes are incremental: a changed job's old row is flagged dead and its new
+vector appended (only open jobs get a row), under an fcntl lock shared by all
+processes. When the files run out of room, or most rows are dead, the live
+rows are copied into a new, larger generation of files. Readers never lock:
+the header is published with a sequence counter they retry on. The index is
+a derived cache; it is built from the database on first use, and
+`python manage.py rebuild-recommendations` rebuilds it at any time. The header
+records the database's catalog token and generation (catalog.identity()) at
+build time, and recommend() rebuilds an index built from another database,
+or from a later state of this one (a restored backup).
+"""
+import hashlib
+import heapq
+import logging
+import math
+import os
+import threading
+import time
+import uuid
+import zlib
+from collections import defaultdict
+from contextlib import contextmanager
+from functools import lru_cache
+from operator import itemgetter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+import catalog
+import models
+import search
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process servers only
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+RECOMMEND_INDEX_DIR = os.getenv("RECOMMEND_INDEX_DIR", "./recommend_index")
+RECOMMEND_DIM = int(os.getenv("RECOMMEND_DIM", str(1 << 18)))
+RECOMMEND_TERMS_PER_JOB = int(os.getenv("RECOMMEND_TERMS_PER_JOB", "32"))
+RECOMMEND_PROFILE_APPLICATIONS = int(os.getenv("RECOMMEND_PROFILE_APPLICATIONS", "50"))
+
+TITLE_WEIGHT = 2.0
+
+STOP_WORDS = frozenset(
+    "a an and are as at be but by for from has have in into is it its of on or our that the their this "
+    "to was we were will with you your".split()
+)
+
+# header fields, an int64 each; seq is odd while a writer is publishing, and
+# db_token / catalog_generation identify the database the index was built from
+SEQ, GENERATION, ROWS, NNZ, DEAD, DIM, ROW_CAPACITY, NNZ_CAPACITY, DB_TOKEN, CATALOG_GENERATION = range(10)
+HEADER_SIZE = 10
+
+# array file -> dtype and shape for (row capacity, nnz capacity, dim)
+ARRAYS = {
+    "indptr": (np.int64, lambda rows, nnz, dim: (rows + 1,)),
+    "indices": (np.int32, lambda rows, nnz, dim: (nnz,)),
+    "data": (np.float32, lambda rows, nnz, dim: (nnz,)),
+    "ids": (np.uint64, lambda rows, nnz, dim: (rows, 2)),
+    "alive": (np.uint8, lambda rows, nnz, dim: (rows,)),
+    "df": (np.int32, lambda rows, nnz, dim: (dim,)),
+}
+
+# (job id, title, description, is open)
+JobText = Tuple[str, Optional[str], Optional[str], bool]
+
+# (catalog token, catalog generation) of a database, see catalog.identity()
+Identity = Tuple[Optional[str], int]
+
+
+class IndexUnavailable(Exception):
+    """The index files are missing or were left half-written; rebuild it."""
+
+
+# ======================
+# Vectors
+# ======================
+@lru_cache(maxsize=1 << 16)
+def _feature(token: str, dim: int) -> int:
+    # crc32 rather than hash(): features must agree across processes and restarts
+    return zlib.crc32(token.encode()) % dim
+
+
+def term_weights(fields: Iterable[Tuple[Optional[str], float]], dim: int) -> Dict[int, float]:
+    """Hashed term -> 1 + log(weighted term frequency) over (text, weight) fields."""
+    tf: Dict[int, float] = defaultdict(float)
+    for text, weight in fields:
+        for token in search.tokenize((text or "").lower()):
+            if len(token) > 1 and token not in STOP_WORDS:
+                tf[_feature(token, dim)] += weight
+    return {feature: 1.0 + math.log(count) for feature, count in tf.items()}
+
+
+def job_vector(title: Optional[str], description: Optional[str], dim: int,
+               terms: int = RECOMMEND_TERMS_PER_JOB) -> Tuple[np.ndarray, np.ndarray]:
+    """(indices, data) of a job's row. Never empty: a job without terms gets one zero entry."""
+    weights = term_weights(((title, TITLE_WEIGHT), (description, 1.0)), dim)
+    if not weights:
+        return np.zeros(1, np.int32), np.zeros(1, np.float32)
+    items = heapq.nlargest(terms, weights.items(), key=itemgetter(1)) if len(weights) > terms else weights.items()
+    indices = np.fromiter((feature for feature, _ in items), np.int32)
+    data = np.fromiter((weight for _, weight in items), np.float32)
+    return indices, data / np.linalg.norm(data)
+
+
+def _id_words(job_id) -> Tuple[int, int]:
+    value = uuid.UUID(str(job_id)).int
+    return value >> 64, value & 0xFFFFFFFFFFFFFFFF
+
+
+def _job_id(words) -> str:
+    return str(uuid.UUID(int=int(words[0]) << 64 | int(words[1])))
+
+
+def job_text(job) -> JobText:
+    """The indexed fields of a Job object or of a row dict about to be inserted."""
+    if isinstance(job, dict):
+        return job["id"], job.get("title"), job.get("description"), job.get("status") == models.JobStatus.open
+    return job.id, job.title, job.description, job.status == models.JobStatus.open
+
+
+# ======================
+# Index files
+# ======================
+class JobIndex:
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._thread_lock = threading.Lock()
+        self._lock_file = None
+        self._header: Optional[np.memmap] = None
+        self._mapped: Tuple[Optional[int], Dict[str, np.memmap]] = (None, {})
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _header_map(self) -> Optional[np.memmap]:
+        if self._header is None:
+            try:
+                if os.path.getsize(self._path("header")) != HEADER_SIZE * 8:
+                    return None  # older layout: treated as missing, rebuild() replaces it
+                self._header = np.memmap(self._path("header"), dtype=np.int64, mode="r+", shape=(HEADER_SIZE,))
+            except FileNotFoundError:
+                return None
+        return self._header
+
+    def _arrays(self, state: np.ndarray, create: bool = False) -> Dict[str, np.memmap]:
+        generation = int(state[GENERATION])
+        if self._mapped[0] == generation and not create:
+            return self._mapped[1]
+        sizes = int(state[ROW_CAPACITY]), int(state[NNZ_CAPACITY]), int(state[DIM])
+        arrays = {
+            name: np.memmap(self._path(f"{name}.{generation}"), dtype=dtype, mode="w+" if create else "r+",
+                            shape=shape(*sizes))
+            for name, (dtype, shape) in ARRAYS.items()
+        }
+        self._mapped = (generation, arrays)
+        return arrays
+
+    def snapshot(self) -> Optional[np.ndarray]:
+        """A consistent copy of the header, or None when there is no index yet."""
+        header = self._header_map()
+        if header is None:
+            return None
+        deadline = time.monotonic() + 1.0
+        while True:
+            seq = int(header[SEQ])
+            if seq % 2 == 0:
+                state = np.array(header)
+                if int(header[SEQ]) == seq:
+                    return state
+            elif time.monotonic() > deadline:
+                with self._locked():
+                    return self._writer_state()
+            time.sleep(0.0005)
+
+    def _writer_state(self) -> Optional[np.ndarray]:
+        """The header as seen by the lock holder, who is the only writer."""
+        header = self._header_map()
+        if header is None:
+            return None
+        if int(header[SEQ]) % 2:
+            # a writer died while publishing
+            raise IndexUnavailable("Index header was left half-written")
+        return np.array(header)
+
+    @contextmanager
+    def _locked(self):
+        with self._thread_lock:
+            if fcntl is None:
+                yield
+                return
+            if self._lock_file is None:
+                os.makedirs(self.directory, exist_ok=True)
+                self._lock_file = open(self._path("lock"), "a+b")
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    def _publish(self, header: np.memmap, state: np.ndarray):
+        header[SEQ] += 1
+        header[GENERATION:] = state[GENERATION:]
+        header[SEQ] += 1
+
+    # ----------------------
+    # Writing
+    # ----------------------
+    def update(self, jobs: Iterable[JobText], new: bool = False):
+        """
+        Re-indexes jobs after they were saved: drops their current rows and
+        appends rows for the open ones. `new` skips the lookup of existing
+        rows (freshly inserted jobs). A no-op while there is no index yet.
+        """
+        jobs = list(jobs)
+        with self._locked():
+            state = self._writer_state()
+            if state is None or state[GENERATION] == 0:
+                return
+            old_generation = int(state[GENERATION])
+            arrays = self._arrays(state)
+            if not new:
+                state[DEAD] += self._kill(state, arrays, [job[0] for job in jobs])
+
+            dim = int(state[DIM])
+            rows = [(_id_words(job_id), job_vector(title, description, dim))
+                    for job_id, title, description, is_open in jobs if is_open]
+            added_nnz = sum(len(indices) for _, (indices, _) in rows)
+            full = state[ROWS] + len(rows) > state[ROW_CAPACITY] or state[NNZ] + added_nnz > state[NNZ_CAPACITY]
+            mostly_dead = state[DEAD] > max(1024, state[ROWS] - state[DEAD])
+            if (rows and full) or mostly_dead:
+                state, arrays = self._compact(state, arrays, len(rows), added_nnz)
+
+            n, nnz = int(state[ROWS]), int(state[NNZ])
+            for words, (indices, data) in rows:
+                arrays["indices"][nnz:nnz + len(indices)] = indices
+                arrays["data"][nnz:nnz + len(indices)] = data
+                np.add.at(arrays["df"], indices[data > 0], 1)
+                arrays["ids"][n] = words
+                arrays["alive"][n] = 1
+                nnz += len(indices)
+                n += 1
+                arrays["indptr"][n] = nnz
+            state[ROWS], state[NNZ] = n, nnz
+            self._publish(self._header_map(), state)
+            if state[GENERATION] != old_generation:
+                self._retire(old_generation)
+
+    def remove(self, job_ids: Iterable[str]):
+        with self._locked():
+            state = self._writer_state()
+            if state is None or state[GENERATION] == 0:
+                return
+            killed = self._kill(state, self._arrays(state), list(job_ids))
+            if killed:
+                state[DEAD] += killed
+                self._publish(self._header_map(), state)
+
+    def _kill(self, state, arrays, job_ids: List[str]) -> int:
+        n = int(state[ROWS])
+        ids, alive, indptr = arrays["ids"][:n], arrays["alive"][:n], arrays["indptr"]
+        killed = 0
+        for job_id in job_ids:
+            hi, lo = _id_words(job_id)
+            for row in np.flatnonzero((ids[:, 0] == hi) & (ids[:, 1] == lo) & (alive == 1)):
+                alive[row] = 0
+                start, end = indptr[row], indptr[row + 1]
+                indices = arrays["indices"][start:end]
+                np.subtract.at(arrays["df"], indices[arrays["data"][start:end] > 0], 1)
+                killed += 1
+        return killed
+
+    def _compact(self, state, arrays, extra_rows: int, extra_nnz: int):
+        """Copies the live rows into a new generation with room for the extra rows; returns its state and arrays."""
+        n = int(state[ROWS])
+        keep = np.flatnonzero(arrays["alive"][:n])
+        indptr = arrays["indptr"][:n + 1]
+        lengths = (indptr[1:] - indptr[:-1])[keep]
+        live_nnz = int(lengths.sum())
+        new_state = state.copy()
+        new_state[GENERATION] += 1
+        new_state[ROW_CAPACITY] = _capacity(len(keep) + extra_rows, 1024)
+        new_state[NNZ_CAPACITY] = _capacity(live_nnz + extra_nnz, 1024 * RECOMMEND_TERMS_PER_JOB)
+        new_state[ROWS], new_state[NNZ], new_state[DEAD] = len(keep), live_nnz, 0
+        new = self._arrays(new_state, create=True)
+
+        np.cumsum(lengths, out=new["indptr"][1:len(keep) + 1])
+        positions = np.repeat(indptr[keep] - new["indptr"][:len(keep)], lengths) + np.arange(live_nnz)
+        new["indices"][:live_nnz] = arrays["indices"][positions]
+        new["data"][:live_nnz] = arrays["data"][positions]
+        new["ids"][:len(keep)] = arrays["ids"][keep]
+        new["alive"][:len(keep)] = 1
+        new["df"][:] = arrays["df"]
+        return new_state, new
+
+    def _retire(self, generation: int):
+        # processes that still map the old files keep reading them; they remap on the next snapshot
+        for name in ARRAYS:
+            try:
+                os.remove(self._path(f"{name}.{generation}"))
+            except FileNotFoundError:
+                pass
+
+    def rebuild(self, jobs: Iterable[JobText], dim: int = RECOMMEND_DIM, if_stale: bool = False,
+                identity: Identity = (None, 0)) -> int:
+        """
+        Replaces the index with one built from `jobs` (every job, or only the
+        open ones) of the database with `identity`; returns its row count.
+        With `if_stale`, leaves an index that is usable for that database
+        alone (another process may have just built it) and returns -1.
+        """
+        with self._locked():
+            if if_stale:
+                try:
+                    state = self._writer_state()
+                except IndexUnavailable:
+                    state = None
+                if state is not None and state[GENERATION] and built_from(state, identity):
+                    return -1
+            ids, vectors = [], []
+            for job_id, title, description, is_open in jobs:
+                if is_open:
+                    ids.append(_id_words(job_id))
+                    vectors.append(job_vector(title, description, dim))
+            nnz = sum(len(indices) for indices, _ in vectors)
+
+            header = self._header_map()
+            if header is None:
+                os.makedirs(self.directory, exist_ok=True)
+                np.zeros(HEADER_SIZE, np.int64).tofile(self._path("header.tmp"))
+                os.replace(self._path("header.tmp"), self._path("header"))
+                header = self._header_map()
+            if int(header[SEQ]) % 2:
+                header[SEQ] += 1  # left odd by a writer that died; _publish needs it even
+            old_generation = int(header[GENERATION])
+
+            state = np.zeros(HEADER_SIZE, np.int64)
+            state[GENERATION], state[ROWS], state[NNZ], state[DIM] = old_generation + 1, len(ids), nnz, dim
+            state[DB_TOKEN], state[CATALOG_GENERATION] = _token_word(identity[0]), identity[1]
+            state[ROW_CAPACITY] = _capacity(len(ids), 1024)
+            state[NNZ_CAPACITY] = _capacity(nnz, 1024 * RECOMMEND_TERMS_PER_JOB)
+            arrays = self._arrays(state, create=True)
+            if ids:
+                indices = np.concatenate([indices for indices, _ in vectors])
+                data = np.concatenate([data for _, data in vectors])
+                arrays["indices"][:nnz] = indices
+                arrays["data"][:nnz] = data
+                np.cumsum([len(v) for v, _ in vectors], out=arrays["indptr"][1:len(ids) + 1])
+                arrays["ids"][:len(ids)] = ids
+                arrays["alive"][:len(ids)] = 1
+                arrays["df"][:] = np.bincount(indices[data > 0], minlength=dim)
+            for array in arrays.values():
+                array.flush()
+
+            self._publish(header, state)
+            header.flush()
+            if old_generation:
+                self._retire(old_generation)
+            return len(ids)
+
+    # ----------------------
+    # Reading
+    # ----------------------
+    def _read(self):
+        """(header state, arrays) of the current generation, remapping when a writer moved on."""
+        while True:
+            state = self.snapshot()
+            if state is None or state[GENERATION] == 0:
+                raise IndexUnavailable("No recommendation index yet")
+            try:
+                return state, self._arrays(state)
+            except FileNotFoundError:
+                continue  # retired between the snapshot and the mapping
+
+    def query_vector(self, weights: Dict[int, float]) -> np.ndarray:
+        """Dense query vector of profile term weights, scaled by inverse document frequency."""
+        state, arrays = self._read()
+        live = int(state[ROWS] - state[DEAD])
+        q = np.zeros(int(state[DIM]), np.float32)
+        if weights:
+            features = np.fromiter(weights.keys(), np.int64, len(weights))
+            values = np.fromiter(weights.values(), np.float32, len(weights))
+            q[features] = values * (np.log((1 + live) / (1 + arrays["df"][features])) + 1)
+        return q
+
+    def top(self, q: np.ndarray, limit: int) -> List[Tuple[str, float]]:
+        """The `limit` live jobs scoring highest against `q`, as (job id, score), best first."""
+        state, arrays = self._read()
+        n, nnz = int(state[ROWS]), int(state[NNZ])
+        if n == 0 or limit <= 0:
+            return []
+        # every row has at least one entry, so reduceat sums exactly each row's products
+        products = arrays["data"][:nnz] * q[arrays["indices"][:nnz]]
+        scores = np.add.reduceat(products, arrays["indptr"][:n])
+        scores[arrays["alive"][:n] == 0] = 0
+        k = min(limit, n)
+        best = np.argpartition(scores, n - k)[n - k:]
+        best = best[np.argsort(scores[best])[::-1]]
+        best = best[scores[best] > 0]
+        return [(_job_id(words), float(score)) for words, score in zip(arrays["ids"][best], scores[best])]
+
+
+def _capacity(needed: int, minimum: int) -> int:
+    return max(minimum, needed + needed // 2)
+
+
+def _token_word(token: Optional[str]) -> int:
+    if not token:
+        return 0
+    return int.from_bytes(hashlib.sha256(token.encode()).digest()[:8], "big", signed=True)
+
+
+def built_from(state: np.ndarray, identity: Identity) -> bool:
+    """
+    Whether the index with header `state` can serve the database with
+    `identity`: same token, and built at a generation the database has
+    reached (an older one after a restore means jobs it may not have).
+    """
+    token, generation = identity
+    return int(state[DB_TOKEN]) == _token_word(token) and int(state[CATALOG_GENERATION]) <= generation
+
+
+index = JobIndex(RECOMMEND_INDEX_DIR)
+
+
+# ======================
+# Application hooks
+# ======================
+def update_jobs(jobs: Iterable, new: bool = False):
+    """Re-indexes saved Job objects or inserted row dicts. Call after the commit; never raises."""
+    try:
+        index.update((job_text(job) for job in jobs), new=new)
+    except Exception:
+        logger.exception("Recommendation index update failed; run `python manage.py rebuild-recommendations`")
+
+
+def remove_jobs(job_ids: Iterable[str]):
+    """Drops deleted jobs from the index. Call after the commit; never raises."""
+    try:
+        index.remove(job_ids)
+    except Exception:
+        logger.exception("Recommendation index update failed; run `python manage.py rebuild-recommendations`")
+
+
+def rebuild(db: Session, if_stale: bool = False) -> int:
+    """Rebuilds the index from every open job; returns the number indexed (see JobIndex.rebuild)."""
+    # read first: the jobs scanned below are at least as new as this generation
+    identity = catalog.identity(db)
+    Job = models.Job
+    rows = (
+        db.query(Job.id, Job.title, Job.description)
+        .filter(Job.status == models.JobStatus.open)
+        .execution_options(yield_per=5000)
+    )
+    return index.rebuild(((job_id, title, description, True) for job_id, title, description in rows),
+                         if_stale=if_stale, identity=identity)
+
+
+# ======================
+# Recommending
+# ======================
+def recommend(db: Session, applicant_id: str, limit: int) -> List[Tuple[str, float]]:
+    """
+    (job id, score) of the open jobs most similar to the applicant's latest
+    applications, excluding jobs they applied to; empty without applications.
+    """
+    Application, Job = models.Application, models.Job
+    profile = (
+        db.query(Job.title, Job.description, Application.cover_letter)
+        .join(Job, Job.id == Application.job_id)
+        .filter(Application.applicant_id == applicant_id)
+        .order_by(Application.applied_at.desc())
+        .limit(RECOMMEND_PROFILE_APPLICATIONS)
+        .all()
+    )
+    if not profile:
+        return []
+    applied = {job_id for job_id, in db.query(Application.job_id).filter(Application.applicant_id == applicant_id)}
+
+    try:
+        state = index.snapshot()
+    except IndexUnavailable:
+        state = None
+    if state is None or state[GENERATION] == 0 or not built_from(state, catalog.identity(db)):
+        rebuild(db, if_stale=True)
+        state = index.snapshot()
+
+    fields = []
+    for title, description, cover_letter in profile:
+        fields += [(title, TITLE_WEIGHT), (description, 1.0), (cover_letter, 1.0)]
+    q = index.query_vector(term_weights(fields, int(state[DIM])))
+    hits = index.top(q, limit + len(applied))
+    return [(job_id, score) for job_id, score in hits if job_id not in applied][:limit]
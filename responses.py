@@ -0,0 +1,44 @@
+# responses.py
+"""
+Opt-in fast JSON path for the typed response envelopes.
+
+By default an endpoint returns its envelope (e.g. BaseResponse[JobDetail])
+and FastAPI validates it against the response_model once more before encoding
+it. With FAST_JSON_RESPONSES set, respond() wraps the envelope in a
+FastJSONResponse instead: FastAPI passes Response objects through untouched,
+and the already-validated model is serialized once, straight to bytes, by
+pydantic-core. Non-model content is encoded with orjson when it is installed.
+Both paths produce the same JSON.
+"""
+import os
+from typing import Any
+
+import pydantic_core
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # optional
+    orjson = None
+
+FAST_JSON_RESPONSES = os.getenv("FAST_JSON_RESPONSES", "false").lower() in ("1", "true", "yes")
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel) or orjson is None:
+            return pydantic_core.to_json(content)
+        return orjson.dumps(content, default=pydantic_core.to_jsonable_python)
+
+
+def respond(model: BaseModel):
+    """What an endpoint should return for `model` under the configured path."""
+    if FAST_JSON_RESPONSES:
+        return FastJSONResponse(model)
+    return model
+
+
+def render(model: BaseModel) -> bytes:
+    """`model` as a JSON body, for callers that build the Response themselves."""
+    return pydantic_core.to_json(model)
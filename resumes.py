@@ -0,0 +1,298 @@
+# resumes.py
+"""
+Background text extraction for uploaded resumes, for keyword search.
+
+apply_for_job only adds a pending row to resume_texts in its own transaction
+(enqueue(); one row per stored file, so a resume sent with many applications
+is extracted once). Extractor threads claim pending rows in batches, read the
+file from storage (at most RESUME_EXTRACT_MAX_BYTES) and hand it to a child
+process running extraction.py. Each thread keeps one long-lived child, so the
+pool is bounded by RESUME_EXTRACT_WORKERS per server process; a child that
+runs past RESUME_EXTRACT_TIMEOUT_SECONDS is killed and replaced. The
+normalized text lands in resume_texts.body, which database triggers (SQLite
+FTS5) or a generated tsvector column (Postgres) index; see migration 0007 and
+search.resume_match_subquery().
+
+Files that cannot be parsed fail at once; timeouts, crashed children and
+storage errors are retried with exponential backoff, up to
+RESUME_EXTRACT_MAX_ATTEMPTS. Progress is exported through metrics.py.
+`python manage.py extract-resumes` queues resumes uploaded before this
+existed (or failed ones, with --retry-failed) and drains the queue.
+"""
+import logging
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import func, insert
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+import extraction
+import metrics
+import models
+import storage
+from database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+def _env_bool(name: str, default: str) -> bool:
+    return os.getenv(name, default).lower() in ("1", "true", "yes")
+
+
+RESUME_EXTRACT_ENABLED = _env_bool("RESUME_EXTRACT_ENABLED", "true")
+RESUME_EXTRACT_WORKERS = int(os.getenv("RESUME_EXTRACT_WORKERS", "1"))
+RESUME_EXTRACT_POLL_SECONDS = float(os.getenv("RESUME_EXTRACT_POLL_SECONDS", "2"))
+RESUME_EXTRACT_BATCH_SIZE = int(os.getenv("RESUME_EXTRACT_BATCH_SIZE", "10"))
+RESUME_EXTRACT_TIMEOUT_SECONDS = float(os.getenv("RESUME_EXTRACT_TIMEOUT_SECONDS", "20"))
+RESUME_EXTRACT_MAX_BYTES = int(os.getenv("RESUME_EXTRACT_MAX_BYTES", str(storage.RESUME_MAX_BYTES)))
+RESUME_TEXT_MAX_CHARS = int(os.getenv("RESUME_TEXT_MAX_CHARS", "100000"))
+RESUME_EXTRACT_MAX_ATTEMPTS = int(os.getenv("RESUME_EXTRACT_MAX_ATTEMPTS", "5"))
+RESUME_EXTRACT_BACKOFF_SECONDS = float(os.getenv("RESUME_EXTRACT_BACKOFF_SECONDS", "30"))
+RESUME_EXTRACT_LEASE_SECONDS = float(os.getenv("RESUME_EXTRACT_LEASE_SECONDS", "300"))
+
+ResumeText = models.ResumeText
+Status = models.ExtractionStatus
+
+_UPSERT_INSERTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+
+def enqueue(db: Session, resume_link: str):
+    """Queues the stored file for extraction in the caller's transaction (no commit); a no-op if it already is."""
+    row = {"resume_link": resume_link, "status": Status.pending, "attempts": 0, "next_attempt_at": datetime.utcnow()}
+    make_insert = _UPSERT_INSERTS.get(db.get_bind().dialect.name)
+    if make_insert is not None:
+        db.execute(make_insert(ResumeText).on_conflict_do_nothing(index_elements=[ResumeText.resume_link]), [row])
+    elif not db.query(ResumeText.id).filter(ResumeText.resume_link == resume_link).first():
+        db.execute(insert(ResumeText), [row])
+
+
+def enqueue_missing(db: Session) -> int:
+    """Queues every application's resume that has no row yet; returns how many. Does not commit."""
+    links = (
+        db.query(models.Application.resume_link).distinct()
+        .outerjoin(ResumeText, ResumeText.resume_link == models.Application.resume_link)
+        .filter(ResumeText.id.is_(None))
+    )
+    queued = 0
+    for (link,) in links.all():
+        enqueue(db, link)
+        queued += 1
+    return queued
+
+
+def retry_failed(db: Session) -> int:
+    """Puts failed rows back in the queue with a fresh set of attempts. Does not commit."""
+    return (
+        db.query(ResumeText)
+        .filter(ResumeText.status == Status.failed)
+        .update({ResumeText.status: Status.pending, ResumeText.attempts: 0,
+                 ResumeText.next_attempt_at: datetime.utcnow()}, synchronize_session=False)
+    )
+
+
+# ======================
+# Child processes
+# ======================
+class ExtractionTimeout(Exception):
+    pass
+
+
+class ExtractionProcess:
+    """One long-lived extraction child (spawned, not forked: the server process runs threads)."""
+
+    def __init__(self, timeout: float = RESUME_EXTRACT_TIMEOUT_SECONDS, max_chars: int = RESUME_TEXT_MAX_CHARS):
+        self.timeout = timeout
+        self.max_chars = max_chars
+        self._process = None
+        self._conn = None
+
+    def _start(self):
+        context = multiprocessing.get_context("spawn")
+        self._conn, child_conn = context.Pipe()
+        self._process = context.Process(target=extraction.serve, args=(child_conn, self.max_chars),
+                                        name="resume-extraction", daemon=True)
+        self._process.start()
+        child_conn.close()
+
+    def extract(self, data: bytes) -> str:
+        """Text of the file; raises ExtractionError, ExtractionTimeout, or OSError/EOFError if the child died."""
+        if self._process is None or not self._process.is_alive():
+            self.close()
+            self._start()
+        try:
+            self._conn.send_bytes(data)
+            if not self._conn.poll(self.timeout):
+                raise ExtractionTimeout(f"Extraction took longer than {self.timeout:g}s")
+            outcome, value = self._conn.recv()
+        except BaseException:
+            self.close()
+            raise
+        if outcome != "ok":
+            raise extraction.ExtractionError(value)
+        return value
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+        if self._process is not None:
+            if self._process.is_alive():
+                self._process.kill()
+            self._process.join(5)
+            self._process = None
+
+
+# ======================
+# Extractor
+# ======================
+def _backoff(attempts: int) -> timedelta:
+    return timedelta(seconds=RESUME_EXTRACT_BACKOFF_SECONDS * (2 ** (attempts - 1)))
+
+
+def _read(link: str) -> bytes:
+    with storage.get_backend().open(link) as f:
+        data = f.read(RESUME_EXTRACT_MAX_BYTES + 1)
+    if len(data) > RESUME_EXTRACT_MAX_BYTES:
+        raise extraction.ExtractionError(f"File exceeds {RESUME_EXTRACT_MAX_BYTES} bytes")
+    return data
+
+
+class Extractor:
+    def __init__(self, workers: int = RESUME_EXTRACT_WORKERS, session_factory=SessionLocal):
+        self.workers = workers
+        self.session_factory = session_factory
+        self.worker_id = uuid.uuid4().hex
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def start(self):
+        if not self._threads:
+            for index in range(self.workers):
+                thread = threading.Thread(target=self._run, args=(f"{self.worker_id}-{index}",),
+                                          name=f"resume-extractor-{index}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def stop(self, timeout: float = 10):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def _run(self, claimer: str):
+        process = ExtractionProcess()
+        try:
+            while not self._stop.is_set():
+                try:
+                    handled = self.drain_once(claimer, process)
+                except Exception:
+                    logger.exception("Resume extraction failed")
+                    handled = 0
+                if handled < RESUME_EXTRACT_BATCH_SIZE:
+                    self._stop.wait(RESUME_EXTRACT_POLL_SECONDS)
+        finally:
+            process.close()
+
+    def _claim(self, db: Session, claimer: str, now: datetime) -> List[models.ResumeText]:
+        # release claims of extractors that died mid-batch
+        db.query(ResumeText).filter(
+            ResumeText.status == Status.extracting,
+            ResumeText.claimed_at < now - timedelta(seconds=RESUME_EXTRACT_LEASE_SECONDS),
+        ).update({ResumeText.status: Status.pending, ResumeText.claimed_by: None}, synchronize_session=False)
+
+        due = (
+            db.query(ResumeText.id)
+            .filter(ResumeText.status == Status.pending, ResumeText.next_attempt_at <= now)
+            .order_by(ResumeText.next_attempt_at)
+            .limit(RESUME_EXTRACT_BATCH_SIZE)
+            .subquery()
+        )
+        db.query(ResumeText).filter(
+            ResumeText.id.in_(due.select()),
+            ResumeText.status == Status.pending,
+        ).update({ResumeText.status: Status.extracting, ResumeText.claimed_by: claimer, ResumeText.claimed_at: now},
+                 synchronize_session=False)
+        db.commit()
+
+        return (
+            db.query(ResumeText)
+            .filter(ResumeText.claimed_by == claimer, ResumeText.status == Status.extracting)
+            .order_by(ResumeText.id)
+            .all()
+        )
+
+    def drain_once(self, claimer: Optional[str] = None, process: Optional[ExtractionProcess] = None) -> int:
+        """Extracts one batch of due resumes, committing each; returns how many rows it handled."""
+        claimer = claimer or self.worker_id
+        owned = process is None
+        process = process or ExtractionProcess()
+        db = self.session_factory()
+        try:
+            rows = self._claim(db, claimer, datetime.utcnow())
+            for row in rows:
+                self._extract(row, process)
+                db.commit()
+            return len(rows)
+        finally:
+            db.close()
+            if owned:
+                process.close()
+
+    def _extract(self, row: models.ResumeText, process: ExtractionProcess):
+        started = time.perf_counter()
+        row.claimed_by = None
+        row.claimed_at = None
+        row.attempts += 1
+        try:
+            row.body = process.extract(_read(row.resume_link))
+        except extraction.ExtractionError as e:
+            row.status = Status.failed
+            row.last_error = str(e)[:2000]
+            outcome = "failed"
+        except Exception as e:
+            # timeouts, dead children and storage errors may pass on a later attempt
+            row.last_error = f"{type(e).__name__}: {e}"[:2000]
+            if row.attempts >= RESUME_EXTRACT_MAX_ATTEMPTS:
+                row.status = Status.failed
+                outcome = "failed"
+                logger.error("Giving up on extracting %s: %s", row.resume_link, row.last_error)
+            else:
+                row.status = Status.pending
+                row.next_attempt_at = datetime.utcnow() + _backoff(row.attempts)
+                outcome = "retried"
+        else:
+            row.status = Status.done
+            row.last_error = None
+            row.extracted_at = datetime.utcnow()
+            outcome = "extracted"
+        metrics.resume_extractions.inc((outcome,))
+        metrics.resume_extraction_duration.observe((outcome,), time.perf_counter() - started)
+
+
+def queue_depth(db: Session) -> dict:
+    """Rows per extraction status."""
+    counts = dict(db.query(ResumeText.status, func.count()).group_by(ResumeText.status).all())
+    return {status.value: counts.get(status, 0) for status in Status}
+
+
+_extractor: Optional[Extractor] = None
+
+
+def start_extractor():
+    global _extractor
+    if RESUME_EXTRACT_ENABLED and RESUME_EXTRACT_WORKERS > 0 and _extractor is None:
+        _extractor = Extractor()
+        _extractor.start()
+
+
+def stop_extractor():
+    global _extractor
+    if _extractor is not None:
+        _extractor.stop()
+        _extractor = None
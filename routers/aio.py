@@ -0,0 +1,151 @@
+# routers/aio.py
+"""
+Builds the async flavour of a router from its synchronous endpoints.
+
+Endpoints keep a single implementation written against a sync Session. In
+async mode each one is served by an ``async def`` wrapper that receives an
+AsyncSession and runs the original function through ``AsyncSession.run_sync``:
+the queries go through the async driver on the event loop, so requests wait
+on I/O instead of holding one of the threadpool's few threads. Endpoints that
+are already ``async def`` just get AsyncSessions injected and reach the
+database through ``database.run_db``.
+"""
+import dataclasses
+import inspect
+from typing import Callable, Dict
+
+from fastapi import APIRouter, params
+from fastapi.routing import APIRoute
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def keep_sync(endpoint):
+    """
+    Leaves an endpoint on the threadpool in async mode. Use it for endpoints
+    that do blocking or CPU-heavy work besides queries, which would otherwise
+    stall the event loop.
+    """
+    endpoint.keep_sync = True
+    return endpoint
+
+
+class _Asyncifier:
+    def __init__(self, session_dependencies: Dict[Callable, Callable]):
+        # sync session dependency -> async session dependency, e.g. {get_db: get_async_db}
+        self.session_dependencies = session_dependencies
+        self._converted: Dict[Callable, Callable] = {}
+
+    def convert(self, call: Callable) -> Callable:
+        """Async twin of `call`, or `call` itself if it never touches a Session."""
+        if call not in self._converted:
+            self._converted[call] = self._convert(call)
+        return self._converted[call]
+
+    def _convert(self, call: Callable) -> Callable:
+        if not inspect.isfunction(call) or inspect.isgeneratorfunction(call) \
+                or getattr(call, "keep_sync", False):
+            return call
+
+        signature = inspect.signature(call)
+        new_params, session_params, changed = [], [], False
+        for param in signature.parameters.values():
+            dep = param.default
+            if isinstance(dep, params.Depends) and dep.dependency in self.session_dependencies:
+                session_params.append(param.name)
+                param = param.replace(
+                    default=self._depends_like(dep, self.session_dependencies[dep.dependency]),
+                    annotation=AsyncSession,
+                )
+                changed = True
+            elif isinstance(dep, params.Depends) and dep.dependency is not None:
+                converted = self.convert(dep.dependency)
+                if converted is not dep.dependency:
+                    param = param.replace(default=self._depends_like(dep, converted))
+                    changed = True
+            new_params.append(param)
+
+        if not changed:
+            return call
+
+        if inspect.iscoroutinefunction(call):
+            # already async: it just needs AsyncSessions injected (see database.run_db)
+            async def wrapper(**kwargs):
+                return await call(**kwargs)
+        else:
+            wrapper = self._run_sync_wrapper(call, session_params)
+
+        # copy identity by hand: functools.wraps would set __wrapped__, and
+        # FastAPI unwraps it to decide whether a callable is a coroutine
+        for attr in ("__module__", "__name__", "__qualname__", "__doc__"):
+            setattr(wrapper, attr, getattr(call, attr))
+        wrapper.__signature__ = signature.replace(parameters=new_params)
+        return wrapper
+
+    @staticmethod
+    def _run_sync_wrapper(call: Callable, session_params):
+        async def wrapper(**kwargs):
+            sessions = {name: kwargs.pop(name) for name in session_params}
+            if not sessions:
+                # only nested dependencies were converted
+                return call(**kwargs)
+
+            def run(_):
+                return call(**kwargs, **{name: db.sync_session for name, db in sessions.items()})
+
+            # any session's greenlet can drive the others' sync facades
+            return await next(iter(sessions.values())).run_sync(run)
+
+        return wrapper
+
+    @staticmethod
+    def _depends_like(dep: params.Depends, dependency: Callable) -> params.Depends:
+        # keeps the marker's class (Depends / Security) and its options
+        return dataclasses.replace(dep, dependency=dependency)
+
+
+def asyncify_router(router: APIRouter, session_dependencies: Dict[Callable, Callable]) -> APIRouter:
+    """
+    Returns a router with the same routes, in the same order, whose Session-using
+    endpoints (and dependencies such as get_current_user) run on AsyncSessions.
+    Endpoints marked with keep_sync are carried over unchanged.
+    """
+    asyncifier = _Asyncifier(session_dependencies)
+    async_router = APIRouter()
+
+    for route in router.routes:
+        if not isinstance(route, APIRoute):
+            async_router.routes.append(route)
+            continue
+
+        endpoint = asyncifier.convert(route.endpoint)
+        dependencies = [
+            _Asyncifier._depends_like(dep, asyncifier.convert(dep.dependency))
+            for dep in route.dependencies
+        ]
+        if endpoint is route.endpoint and all(
+            new.dependency is old.dependency for new, old in zip(dependencies, route.dependencies)
+        ):
+            async_router.routes.append(route)
+            continue
+
+        async_router.add_api_route(
+            route.path,
+            endpoint,
+            response_model=route.response_model,
+            status_code=route.status_code,
+            tags=route.tags,
+            dependencies=dependencies,
+            summary=route.summary,
+            description=route.description,
+            response_description=route.response_description,
+            responses=route.responses,
+            deprecated=route.deprecated,
+            methods=route.methods,
+            operation_id=route.operation_id,
+            include_in_schema=route.include_in_schema,
+            response_class=route.response_class,
+            name=route.name,
+            openapi_extra=route.openapi_extra,
+        )
+
+    return async_router
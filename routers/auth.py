@@ -1,42 +1,74 @@
 # routers/auth.py
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
-from database import get_db
-import models, schemas
-from utils import hash_password, verify_password, create_access_token
+from database import get_db, run_db
+import models, schemas, responses
+import hashing
+from utils import create_access_token
 
 router = APIRouter(prefix="/api", tags=["auth"])
 
-@router.post("/signup", response_model=schemas.BaseResponse)
-def signup(payload: schemas.UserSignup, db: Session = Depends(get_db)):
-    # Check for existing email
-    existing = db.query(models.User).filter(models.User.email == payload.email).first()
-    if existing:
-        return schemas.BaseResponse(success=False, message="Email already registered", errors=["Email exists"])
 
+def _find_user_by_email(db: Session, email: str):
+    return db.query(models.User).filter(models.User.email == email).first()
+
+
+def _create_user(db: Session, payload: schemas.UserSignup, password_hash: str):
     user = models.User(
         name=payload.name,
         email=payload.email,
-        password=hash_password(payload.password),
+        password=password_hash,
         role=payload.role.value,
         is_verified=True  # Mark as verified immediately
     )
     db.add(user)
     db.commit()
     db.refresh(user)
+    return user
+
+
+def _update_password_hash(db: Session, user_id: str, password_hash: str):
+    db.query(models.User).filter(models.User.id == user_id).update({models.User.password: password_hash})
+    db.commit()
 
-    return schemas.BaseResponse(success=True, message="User registered successfully.", object={"user_id": user.id})
 
-@router.post("/login", response_model=schemas.BaseResponse)
-def login(payload: schemas.UserLogin, db: Session = Depends(get_db)):
-    user = db.query(models.User).filter(models.User.email == payload.email).first()
+# Both endpoints are async so the bcrypt work can be awaited on the hashing
+# pool; their queries run off the event loop through run_db.
+
+@router.post("/signup", response_model=schemas.BaseResponse[schemas.UserCreated])
+async def signup(payload: schemas.UserSignup, db: Session = Depends(get_db)):
+    # Check for existing email
+    existing = await run_db(db, _find_user_by_email, payload.email)
+    if existing:
+        return schemas.BaseResponse(success=False, message="Email already registered", errors=["Email exists"])
+
+    password_hash = await hashing.hash_password_async(payload.password)
+    user = await run_db(db, _create_user, payload, password_hash)
+
+    return responses.respond(schemas.BaseResponse[schemas.UserCreated](
+        success=True, message="User registered successfully.", object=schemas.UserCreated(user_id=user.id)))
+
+@router.post("/login", response_model=schemas.BaseResponse[schemas.LoginResponseObject])
+async def login(payload: schemas.UserLogin, db: Session = Depends(get_db)):
+    user = await run_db(db, _find_user_by_email, payload.email)
     if not user:
         return schemas.BaseResponse(success=False, message="Invalid credentials", errors=["Invalid email/password"])
 
-    if not verify_password(payload.password, user.password):
+    if not await hashing.verify_password_async(payload.password, user.password):
         return schemas.BaseResponse(success=False, message="Invalid credentials", errors=["Invalid email/password"])
 
     # No email verification check here anymore
 
+    # Opportunistically upgrade hashes made with an older BCRYPT_ROUNDS; this is
+    # the only time the plain password is available to do it.
+    if hashing.needs_rehash(user.password):
+        try:
+            new_hash = await hashing.hash_password_async(payload.password)
+        except hashing.HashPoolSaturated:
+            pass  # try again on a later login
+        else:
+            await run_db(db, _update_password_hash, user.id, new_hash)
+
     token = create_access_token(user.id, user.role)
-    return schemas.BaseResponse(success=True, message="Login successful", object={"token": token})
+    return responses.respond(schemas.BaseResponse[schemas.LoginResponseObject](
+        success=True, message="Login successful", object=schemas.LoginResponseObject(token=token)))
@@ -1,36 +1,74 @@
 # routers/jobs.py
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import literal, select, union_all
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from database import get_db
-import models, schemas
+from database import get_db, get_read_db
+import models
+import schemas
+import catalog
+import counters
+import exports
+import facets
+import http_cache
+import job_import
+import notifications
+import pagination
+import principals
+import recommend
+import responses
+import resumes
+import search
+import storage
+import transitions
+from routers.aio import keep_sync
 from utils import decode_access_token
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from typing import List
 from uuid import UUID
-from sqlalchemy import func
 from fastapi import File, UploadFile
-from datetime import datetime
-# from utils import upload_to_cloudinary, send_email  # You'll need to implement these helpers
 
 # Use HTTPBearer
 bearer_scheme = HTTPBearer()
 
 router = APIRouter(prefix="/api/jobs", tags=["jobs"])
 
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme), db: Session = Depends(get_db)) -> models.User:
+CURSOR_DESCRIPTION = "Cursor paging: pass an empty value for the first page, then each page's next_cursor"
+WITH_TOTAL_DESCRIPTION = "In cursor mode, also return the (cached) total"
+
+# list endpoints select just the columns they return, as plain rows (no entities, no identity map)
+JOB_LIST_COLUMNS = (
+    models.Job.id, models.Job.title, models.Job.description, models.Job.location,
+    models.Job.status, models.Job.created_at,
+)
+
+def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme), db: Session = Depends(get_db)) -> principals.Principal:
     token = credentials.credentials  # Extract raw token
+    principal = principals.cache.get(token)
+    if principal:
+        return principal
+
     payload = decode_access_token(token)
     if not payload:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or expired token")
     user_id = payload.get("sub")
-    user = db.query(models.User).filter(models.User.id == user_id).first()
+    user = (
+        db.query(models.User.id, models.User.role, models.User.name)
+        .filter(models.User.id == user_id)
+        .first()
+    )
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
-    return user
+
+    principal = principals.Principal(id=user.id, role=user.role, name=user.name)
+    principals.cache.put(token, principal, payload.get("exp"))
+    return principal
 
 
-@router.post("/", response_model=schemas.BaseResponse)
-def create_job(payload: schemas.JobCreate, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
+@router.post("/", response_model=schemas.BaseResponse[schemas.JobRef])
+@keep_sync  # updates the shared recommendation index under a file lock; stays off the event loop
+def create_job(payload: schemas.JobCreate, db: Session = Depends(get_db), current_user: principals.Principal = Depends(get_current_user)):
     if current_user.role != models.UserRole.company:
         return schemas.BaseResponse(success=False, message="Only companies can create jobs", errors=["Unauthorized"])
 
@@ -42,20 +80,42 @@ def create_job(payload: schemas.JobCreate, db: Session = Depends(get_db), curren
         created_by=current_user.id
     )
     db.add(job)
+    db.flush()
+    counters.create(db, job.id)
+    facets.record(db, added=[facets.job_key(job)])
+    catalog.bump(db)
     db.commit()
     db.refresh(job)
-    return schemas.BaseResponse(success=True, message="Job created", object={"job_id": job.id})
+    recommend.update_jobs([job], new=True)
+    return responses.respond(schemas.BaseResponse[schemas.JobRef](
+        success=True, message="Job created", object=schemas.JobRef(job_id=job.id)))
+
 
+@router.post("/import")
+async def import_jobs(request: Request, db: Session = Depends(get_db), current_user: principals.Principal = Depends(get_current_user)):
+    """
+    Bulk-creates jobs from an NDJSON body, one JobCreate object per line, and
+    streams back an NDJSON report: one entry per non-blank line, then a summary.
+    """
+    if current_user.role != models.UserRole.company:
+        return schemas.BaseResponse(success=False, message="Only companies can create jobs", errors=["Unauthorized"])
+
+    report = await job_import.run(db, current_user.id, request.stream())
+    return StreamingResponse(job_import.iter_report(report), media_type="application/x-ndjson")
 
-@router.put("/{job_id}", response_model=schemas.BaseResponse)
-def update_job(job_id: UUID, payload: schemas.JobUpdate, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
-    job = db.query(models.Job).filter(models.Job.id == str(job_id)).first()
+
+@router.put("/{job_id}", response_model=schemas.BaseResponse[schemas.JobRef])
+@keep_sync  # updates the shared recommendation index under a file lock; stays off the event loop
+def update_job(job_id: UUID, payload: schemas.JobUpdate, db: Session = Depends(get_db), current_user: principals.Principal = Depends(get_current_user)):
+    job = db.query(models.Job).filter(models.Job.id == job_id).first()
     if not job:
         return schemas.BaseResponse(success=False, message="Job not found", errors=["No job"])
 
     if job.created_by != current_user.id:
         return schemas.BaseResponse(success=False, message="Unauthorized access", errors=["Unauthorized"])
 
+    old_key = facets.job_key(job)
+
     # forward-only status progression
     if payload.status:
         order = ["Draft", "Open", "Closed"]
@@ -72,245 +132,496 @@ def update_job(job_id: UUID, payload: schemas.JobUpdate, db: Session = Depends(g
     if payload.location is not None:
         job.location = payload.location
 
+    job.version = models.Job.version + 1
+    facets.record(db, added=[facets.job_key(job)], removed=[old_key])
+    catalog.bump(db)
     db.commit()
     db.refresh(job)
-    return schemas.BaseResponse(success=True, message="Job updated", object={"job_id": job.id})
+    recommend.update_jobs([job])
+    return responses.respond(schemas.BaseResponse[schemas.JobRef](
+        success=True, message="Job updated", object=schemas.JobRef(job_id=job.id)))
 
 
 @router.delete("/{job_id}", response_model=schemas.BaseResponse)
-def delete_job(job_id: UUID, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
-    job = db.query(models.Job).filter(models.Job.id == str(job_id)).first()
+@keep_sync  # updates the shared recommendation index under a file lock; stays off the event loop
+def delete_job(job_id: UUID, db: Session = Depends(get_db), current_user: principals.Principal = Depends(get_current_user)):
+    job = db.query(models.Job).filter(models.Job.id == job_id).first()
     if not job:
         return schemas.BaseResponse(success=False, message="Job not found", errors=["No job"])
 
     if job.created_by != current_user.id:
         return schemas.BaseResponse(success=False, message="Unauthorized access", errors=["Unauthorized"])
 
+    # applications go with the job, in the same transaction (applications.job_id has no ON DELETE)
+    db.query(models.Application).filter(models.Application.job_id == job.id).delete(synchronize_session=False)
+    counters.delete(db, job.id)
+    facets.record(db, removed=[facets.job_key(job)])
     db.delete(job)
+    catalog.bump(db)
     db.commit()
+    recommend.remove_jobs([str(job_id)])
     return schemas.BaseResponse(success=True, message="Job deleted")
 
 
-@router.get("/browse", response_model=schemas.PaginatedResponse)
+@router.get("/browse", response_model=schemas.JobBrowseResponse)
 def browse_jobs(
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    request: Request,
+    db: Session = Depends(get_read_db),
+    current_user: principals.Principal = Depends(get_current_user),
+    q: str = Query(None, description="Full-text search over title, description, location and company"),
     title: str = Query(None),
     location: str = Query(None),
     company_name: str = Query(None),
+    status_filter: models.JobStatus = Query(None, description="Filter by job status"),
     page: int = Query(1, ge=1),
-    size: int = Query(10, ge=1, le=100)
+    size: int = Query(10, ge=1, le=100),
+    cursor: str = Query(None, description=CURSOR_DESCRIPTION),
+    with_total: bool = Query(False, description=WITH_TOTAL_DESCRIPTION),
+    with_facets: bool = Query(False, description="Also return job counts by location, company and status "
+                                                 "for the matching jobs (the status counts ignore status_filter)")
 ):
-    query = db.query(models.Job).join(models.User, models.Job.owner_id == models.User.id)
+    # the response depends only on the catalog and the query string
+    generation, modified = catalog.current(db)
+    etag = http_cache.make_etag("browse", generation, sorted(request.query_params.multi_items()))
+
+    def build():
+        query = (
+            db.query(*JOB_LIST_COLUMNS, models.User.name.label("company_name"))
+            .join(models.User, models.Job.created_by == models.User.id)
+        )
 
-    if title:
-        query = query.filter(models.Job.title.ilike(f"%{title}%"))
-    if location:
-        query = query.filter(models.Job.location.ilike(f"%{location}%"))
-    if company_name:
-        query = query.filter(models.User.name.ilike(f"%{company_name}%"))
+        hits = search.match_subquery(db, q=q, title=title, location=location, company_name=company_name)
+        if hits is not None:
+            query = query.join(hits, hits.c.job_id == models.Job.id).add_columns(hits.c.score)
+            order_by = [hits.c.score, models.Job.id]
+            row_key = lambda row: (row.score, row.id)
+        else:
+            order_by = [models.Job.created_at, models.Job.id]
+            row_key = lambda row: (row.created_at, row.id)
+
+        if status_filter:
+            query = query.filter(models.Job.status == status_filter)
+
+        try:
+            results, meta = pagination.paginate(
+                query,
+                order_by=order_by,
+                row_key=row_key,
+                count_query=query.with_entities(models.Job.id),
+                count_key=("browse", generation, q, title, location, company_name, status_filter),
+                cursor=cursor,
+                with_total=with_total,
+                page=page,
+                size=size
+            )
+        except pagination.InvalidCursor as e:
+            return schemas.PaginatedResponse(success=False, message="Invalid cursor", errors=[str(e)])
+
+        jobs_list = [
+            {
+                "id": row.id,
+                "title": row.title,
+                "description": row.description,
+                "location": row.location,
+                "status": row.status,
+                "created_at": row.created_at,
+                "company_name": row.company_name
+            }
+            for row in results
+        ]
+
+        facet_counts = None
+        if with_facets:
+            facet_counts = (facets.hit_facets(db, hits, status_filter) if hits is not None
+                            else facets.catalog_facets(db, generation, status_filter))
+
+        return schemas.JobBrowseResponse(
+            success=True,
+            message="Jobs fetched successfully",
+            object={"items": jobs_list, **meta},
+            facets=facet_counts
+        )
 
-    total = query.count()
-    jobs = query.offset((page - 1) * size).limit(size).all()
+    return http_cache.conditional_response(request, etag, modified, build)
 
-    return schemas.PaginatedResponse(
-        success=True,
-        message="Jobs fetched successfully",
-        object={
-            "items": jobs,
-            "total": total,
-            "page": page,
-            "size": size,
-            "pages": (total + size - 1) // size
-        }
-    )
 
-
-@router.get("/my", response_model=schemas.PaginatedResponse)
+@router.get("/my", response_model=schemas.PaginatedResponse[schemas.MyJobListItem])
 def view_my_jobs(
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    current_user: principals.Principal = Depends(get_current_user),
     status_filter: models.JobStatus = Query(None, description="Filter by job status"),
     page: int = Query(1, ge=1),
-    size: int = Query(10, ge=1, le=100)
+    size: int = Query(10, ge=1, le=100),
+    cursor: str = Query(None, description=CURSOR_DESCRIPTION),
+    with_total: bool = Query(False, description=WITH_TOTAL_DESCRIPTION),
+    include_archived: bool = Query(False, description="Also list archived (long closed) jobs")
 ):
     if current_user.role != models.UserRole.company:
         return schemas.PaginatedResponse(success=False, message="Only companies can view their posted jobs")
 
-    query = (
-        db.query(models.Job, func.count(models.Application.id).label("applications_count"))
-        .outerjoin(models.Application, models.Application.job_id == models.Job.id)
-        .filter(models.Job.created_by == current_user.id)
-        .group_by(models.Job.id)
-    )
-
+    jobs_query = db.query(models.Job.id).filter(models.Job.created_by == current_user.id)
     if status_filter:
-        query = query.filter(models.Job.status == status_filter)
+        jobs_query = jobs_query.filter(models.Job.status == status_filter)
 
-    total = query.count()
-    results = query.offset((page - 1) * size).limit(size).all()
+    # counters are maintained on write, so this is a primary-key join rather than a COUNT
+    query = jobs_query.with_entities(*JOB_LIST_COLUMNS, *counters.COLUMNS, literal(False).label("archived")).outerjoin(
+        models.JobApplicationStats, models.JobApplicationStats.job_id == models.Job.id
+    )
+    order_by = [models.Job.created_at, models.Job.id]
+
+    if include_archived:
+        Archive = models.JobArchive
+        archived_query = (
+            db.query(*[getattr(Archive, column.key) for column in JOB_LIST_COLUMNS],
+                     *[getattr(Archive, column.key) for column in counters.COLUMNS], literal(True).label("archived"))
+            .filter(Archive.created_by == current_user.id)
+        )
+        if status_filter:
+            archived_query = archived_query.filter(Archive.status == status_filter)
+        jobs = union_all(query.statement, archived_query.statement).subquery()
+        query = db.query(jobs)
+        jobs_query = db.query(jobs.c.id)
+        order_by = [jobs.c.created_at, jobs.c.id]
+
+    try:
+        results, meta = pagination.paginate(
+            query,
+            order_by=order_by,
+            row_key=lambda row: (row.created_at, row.id),
+            count_query=jobs_query,
+            count_key=("my_jobs", current_user.id, status_filter, include_archived),
+            cursor=cursor,
+            with_total=with_total,
+            page=page,
+            size=size
+        )
+    except pagination.InvalidCursor as e:
+        return schemas.PaginatedResponse(success=False, message="Invalid cursor", errors=[str(e)])
 
     jobs_list = [
         {
-            "title": job.title,
-            "description": job.description,
-            "location": job.location,
-            "status": job.status,
-            "created_at": job.created_at,
-            "applications_count": applications_count
+            "id": row.id,
+            "title": row.title,
+            "description": row.description,
+            "location": row.location,
+            "status": row.status,
+            "created_at": row.created_at,
+            "applications_count": row.total or 0,
+            "applications_by_status": counters.as_dict(row),
+            "archived": row.archived
         }
-        for job, applications_count in results
+        for row in results
     ]
 
-    return schemas.PaginatedResponse(
+    return responses.respond(schemas.PaginatedResponse[schemas.MyJobListItem](
         success=True,
         message="My jobs fetched successfully",
-        object={
-            "items": jobs_list,
-            "total": total,
-            "page": page,
-            "size": size,
-            "pages": (total + size - 1) // size
-        }
-    )
+        object={"items": jobs_list, **meta}
+    ))
+
 
+@router.get("/recommended", response_model=schemas.BaseResponse[List[schemas.RecommendedJob]])
+@keep_sync  # scores the whole job index in numpy; stays off the event loop
+def recommended_jobs(
+    db: Session = Depends(get_read_db),
+    current_user: principals.Principal = Depends(get_current_user),
+    limit: int = Query(10, ge=1, le=50)
+):
+    """Open jobs similar to the ones the applicant applied to, best match first."""
+    if current_user.role != models.UserRole.applicant:
+        return schemas.BaseResponse(success=False, message="Only applicants get job recommendations")
+
+    scores = dict(recommend.recommend(db, current_user.id, limit))
+    rows = []
+    if scores:
+        rows = (
+            db.query(*JOB_LIST_COLUMNS, models.User.name.label("company_name"))
+            .join(models.User, models.Job.created_by == models.User.id)
+            .filter(models.Job.id.in_(list(scores)), models.Job.status == models.JobStatus.open)
+            .all()
+        )
+    rows.sort(key=lambda row: scores[row.id], reverse=True)
 
-@router.get("/{job_id}", response_model=schemas.BaseResponse)
+    jobs_list = [
+        schemas.RecommendedJob(
+            id=row.id,
+            title=row.title,
+            description=row.description,
+            location=row.location,
+            status=row.status,
+            created_at=row.created_at,
+            company_name=row.company_name,
+            score=round(scores[row.id], 4),
+        )
+        for row in rows
+    ]
+    return responses.respond(schemas.BaseResponse[List[schemas.RecommendedJob]](
+        success=True, message="Recommended jobs fetched successfully", object=jobs_list))
+
+
+@router.get("/{job_id}", response_model=schemas.BaseResponse[schemas.JobDetail])
 def view_job_details(
     job_id: UUID,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    request: Request,
+    db: Session = Depends(get_read_db),
+    current_user: principals.Principal = Depends(get_current_user),
+    include_archived: bool = Query(False, description="Also look the job up among archived (long closed) jobs")
 ):
-    job = db.query(models.Job).filter(models.Job.id == str(job_id)).first()
-    if not job:
+    source = models.Job
+    current = db.query(source.version, source.updated_at).filter(source.id == job_id).first()
+    if not current and include_archived:
+        source = models.JobArchive
+        current = db.query(source.version, source.updated_at).filter(source.id == job_id).first()
+    if not current:
         return schemas.BaseResponse(success=False, message="Job not found", errors=["No job"])
+    archived = source is models.JobArchive
+
+    def build():
+        job = db.query(source).filter(source.id == job_id).first()
+        if not job:
+            return schemas.BaseResponse(success=False, message="Job not found", errors=["No job"])
 
-    job_data = {
-        "id": job.id,
-        "title": job.title,
-        "description": job.description,
-        "location": job.location,
-        "status": job.status,
-        "created_at": job.created_at,
-        "created_by": job.created_by
-    }
+        job_data = {
+            "id": job.id,
+            "title": job.title,
+            "description": job.description,
+            "location": job.location,
+            "status": job.status,
+            "created_at": job.created_at,
+            "created_by": job.created_by,
+            "archived": archived
+        }
+        return schemas.BaseResponse[schemas.JobDetail](success=True, message="Job details fetched", object=job_data)
 
-    return schemas.BaseResponse(success=True, message="Job details fetched", object=job_data)
+    etag = http_cache.make_etag("archived_job" if archived else "job", job_id, current.version)
+    return http_cache.conditional_response(request, etag, current.updated_at, build)
 
 
-@router.get("/{job_id}/applications", response_model=schemas.PaginatedResponse)
+@router.get("/{job_id}/applications", response_model=schemas.PaginatedResponse[schemas.ApplicationListItem])
 def view_job_applications(
     job_id: UUID,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    current_user: principals.Principal = Depends(get_current_user),
     status_filter: models.ApplicationStatus = Query(None, description="Filter by application status"),
     page: int = Query(1, ge=1),
-    size: int = Query(10, ge=1, le=100)
+    size: int = Query(10, ge=1, le=100),
+    cursor: str = Query(None, description=CURSOR_DESCRIPTION),
+    with_total: bool = Query(False, description=WITH_TOTAL_DESCRIPTION),
+    keyword: str = Query(None, max_length=200, description="Only applicants whose resume contains all these words (prefix match)")
 ):
-    job = db.query(models.Job).filter(models.Job.id == str(job_id)).first()
+    job = db.query(models.Job.created_by).filter(models.Job.id == job_id).first()
     if not job:
         return schemas.PaginatedResponse(success=False, message="Job not found")
 
     if job.created_by != current_user.id or current_user.role != models.UserRole.company:
         return schemas.PaginatedResponse(success=False, message="Unauthorized access")
 
-    query = db.query(models.Application).join(models.User, models.User.id == models.Application.user_id)
-    query = query.filter(models.Application.job_id == str(job_id))
-
+    apps_query = db.query(models.Application.id).filter(models.Application.job_id == job_id)
     if status_filter:
-        query = query.filter(models.Application.status == status_filter)
-
-    total = query.count()
-    applications = query.offset((page - 1) * size).limit(size).all()
+        apps_query = apps_query.filter(models.Application.status == status_filter)
+    # resumes are searchable once the background extractor has processed them (see resumes.py)
+    hits = search.resume_match_subquery(db, keyword)
+    if hits is not None:
+        apps_query = apps_query.filter(models.Application.resume_link.in_(select(hits.c.resume_link)))
+
+    # applicant names come from the same query, not from a lazy load per row
+    query = apps_query.with_entities(
+        models.Application.id,
+        models.User.name.label("applicant_name"),
+        models.Application.resume_link,
+        models.Application.cover_letter,
+        models.Application.status,
+        models.Application.applied_at,
+    ).join(models.User, models.User.id == models.Application.applicant_id)
+
+    try:
+        applications, meta = pagination.paginate(
+            query,
+            order_by=[models.Application.applied_at, models.Application.id],
+            row_key=lambda row: (row.applied_at, row.id),
+            count_query=apps_query,
+            count_key=("job_applications", str(job_id), status_filter, keyword),
+            cursor=cursor,
+            with_total=with_total,
+            page=page,
+            size=size
+        )
+    except pagination.InvalidCursor as e:
+        return schemas.PaginatedResponse(success=False, message="Invalid cursor", errors=[str(e)])
 
     app_list = [
         {
-            "applicant_name": app.user.name,
-            "resume_link": app.resume_link,
-            "cover_letter": app.cover_letter,
-            "status": app.status,
-            "applied_at": app.created_at
+            "applicant_name": row.applicant_name,
+            "resume_link": row.resume_link,
+            "cover_letter": row.cover_letter,
+            "status": row.status,
+            "applied_at": row.applied_at
         }
-        for app in applications
+        for row in applications
     ]
 
-    return schemas.PaginatedResponse(
+    return responses.respond(schemas.PaginatedResponse[schemas.ApplicationListItem](
         success=True,
         message="Applications fetched successfully",
-        object={
-            "items": app_list,
-            "total": total,
-            "page": page,
-            "size": size,
-            "pages": (total + size - 1) // size
-        }
+        object={"items": app_list, **meta}
+    ))
+
+
+@router.post("/{job_id}/applications/status", response_model=schemas.BaseResponse[schemas.ApplicationStatusUpdateResult])
+def update_application_statuses(
+    job_id: UUID,
+    payload: schemas.ApplicationStatusUpdate,
+    db: Session = Depends(get_db),
+    current_user: principals.Principal = Depends(get_current_user)
+):
+    """
+    Moves many of a job's applications to one status in a single UPDATE and
+    reports the outcome for each: updated, unchanged (already there),
+    invalid_transition (see transitions.ALLOWED) or not_found.
+    """
+    job = db.query(models.Job.created_by).filter(models.Job.id == job_id).first()
+    if not job:
+        return schemas.BaseResponse(success=False, message="Job not found", errors=["No job"])
+
+    if job.created_by != current_user.id or current_user.role != models.UserRole.company:
+        return schemas.BaseResponse(success=False, message="Unauthorized access", errors=["Unauthorized"])
+
+    try:
+        outcomes = transitions.apply(
+            db,
+            str(job_id),
+            models.ApplicationStatus(payload.status.value),
+            application_ids=[str(i) for i in payload.application_ids] if payload.application_ids else None,
+            status_filter=models.ApplicationStatus(payload.status_filter.value) if payload.status_filter else None,
+        )
+    except transitions.ConcurrentUpdate as e:
+        db.rollback()
+        return schemas.BaseResponse(success=False, message="Applications changed meanwhile, please retry", errors=[str(e)])
+    db.commit()
+
+    totals = {outcome.value: 0 for outcome in schemas.TransitionOutcomeEnum}
+    for _, outcome, _ in outcomes:
+        totals[outcome] += 1
+    result = schemas.ApplicationStatusUpdateResult(
+        status=payload.status,
+        **totals,
+        results=[
+            {"application_id": application_id, "outcome": outcome, "previous_status": previous}
+            for application_id, outcome, previous in outcomes
+        ]
+    )
+    return responses.respond(schemas.BaseResponse[schemas.ApplicationStatusUpdateResult](
+        success=True, message=f"{totals['updated']} application(s) updated", object=result))
+
+
+@router.get("/{job_id}/applications/export")
+def export_job_applications(
+    job_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: principals.Principal = Depends(get_current_user),
+    status_filter: models.ApplicationStatus = Query(None, description="Filter by application status"),
+    format: schemas.ExportFormatEnum = Query(schemas.ExportFormatEnum.csv, description="csv or ndjson")
+):
+    """Streams every application of the job (same order and fields as the list endpoint)."""
+    job = db.query(models.Job.created_by).filter(models.Job.id == job_id).first()
+    if not job:
+        return schemas.BaseResponse(success=False, message="Job not found", errors=["No job"])
+
+    if job.created_by != current_user.id or current_user.role != models.UserRole.company:
+        return schemas.BaseResponse(success=False, message="Unauthorized access", errors=["Unauthorized"])
+
+    return StreamingResponse(
+        exports.job_applications(str(job_id), format.value, status_filter),
+        media_type=exports.MEDIA_TYPES[format.value],
+        headers={"Content-Disposition": f'attachment; filename="applications-{job_id}.{format.value}"'}
     )
 
 
-@router.post("/{job_id}/apply", response_model=schemas.BaseResponse)
+def _is_duplicate_application(error: IntegrityError) -> bool:
+    # decided by the driver's error code, not the (version and locale dependent) message;
+    # on SQLite uq_applications_job_applicant is the table's only unique index besides the key
+    orig = error.orig
+    if getattr(orig, "sqlite_errorname", None) == "SQLITE_CONSTRAINT_UNIQUE":
+        return True
+    diag = getattr(orig, "diag", None)
+    return getattr(orig, "pgcode", None) == "23505" \
+        and getattr(diag, "constraint_name", None) == "uq_applications_job_applicant"
+
+
+@router.post("/{job_id}/apply", response_model=schemas.BaseResponse[schemas.ApplicationCreated])
+@keep_sync  # streams the upload to disk and fsyncs it; stays off the event loop
 def apply_for_job(
     job_id: UUID,
     cover_letter: str = Query(None, max_length=200),
     resume_file: UploadFile = File(...),
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    current_user: principals.Principal = Depends(get_current_user)
 ):
     # 1. Check role
     if current_user.role != models.UserRole.applicant:
         return schemas.BaseResponse(success=False, message="Only applicants can apply", errors=["Unauthorized"])
 
     # 2. Validate job exists
-    job = db.query(models.Job).filter(models.Job.id == str(job_id)).first()
+    job = db.query(models.Job).filter(models.Job.id == job_id).first()
     if not job:
         return schemas.BaseResponse(success=False, message="Job not found", errors=["No job"])
 
-    # 3. Prevent duplicate applications
-    existing_app = db.query(models.Application).filter(
-        models.Application.job_id == str(job_id),
-        models.Application.user_id == current_user.id
-    ).first()
-    if existing_app:
-        return schemas.BaseResponse(success=False, message="You have already applied to this job", errors=["Duplicate application"])
-
-    # 4. Validate resume file format
-    allowed_types = ["application/pdf", "application/vnd.openxmlformats-officedocument.wordprocessingml.document"]
-    if resume_file.content_type not in allowed_types:
+    # 3. Store the resume: streamed in chunks, size-capped, type checked from its
+    #    magic bytes, and durable on disk before the application row exists
+    try:
+        blob = storage.get_backend().save(resume_file.file)
+    except storage.FileTooLarge:
+        return schemas.BaseResponse(success=False, message="Resume file is too large", errors=["Resume too large"])
+    except storage.UnsupportedFileType:
         return schemas.BaseResponse(success=False, message="Unsupported file type", errors=["Invalid resume format"])
+    resume_url = blob.link
 
-    # 5. Upload resume to Cloudinary (TODO: implement upload_to_cloudinary)
-    resume_url = upload_to_cloudinary(resume_file)
-
-    # 6. Create application
+    # 4. Create application; the unique index on (job_id, applicant_id) rejects
+    #    duplicates, so there is no separate lookup and no race between requests
     application = models.Application(
         job_id=str(job_id),
-        user_id=current_user.id,
+        applicant_id=current_user.id,
         resume_link=resume_url,
         cover_letter=cover_letter,
-        status=models.ApplicationStatus.Applied,
-        created_at=datetime.utcnow()
+        status=models.ApplicationStatus.applied
     )
     db.add(application)
-    db.commit()
-    db.refresh(application)
-
-    # 7. Send email notification to company (you need to implement send_email)
-    company_user = db.query(models.User).filter(models.User.id == job.created_by).first()
+    try:
+        db.flush()
+    except IntegrityError as e:
+        db.rollback()
+        if _is_duplicate_application(e):
+            return schemas.BaseResponse(success=False, message="You have already applied to this job", errors=["Duplicate application"])
+        raise
+    counters.record_application(db, str(job_id))
+    # queued for text extraction, which happens in the background (see resumes.py)
+    resumes.enqueue(db, resume_url)
+
+    # 5. Queue the email to the company in the same transaction; the outbox
+    #    dispatcher delivers it (merged with other new applicants) in the background
+    company_user = db.query(models.User.email).filter(models.User.id == job.created_by).first()
     if company_user and company_user.email:
-        send_email(
-            to_email=company_user.email,
+        notifications.enqueue(
+            db,
+            kind="application_received",
+            recipient=company_user.email,
             subject="New Job Application Received",
-            body=f"{current_user.name} has applied for your job '{job.title}'."
+            body=f"{current_user.name} has applied for your job '{job.title}'.",
+            coalesce_key=f"application_received:{job.created_by}"
         )
 
-    return schemas.BaseResponse(
+    db.commit()
+    db.refresh(application)
+
+    return responses.respond(schemas.BaseResponse[schemas.ApplicationCreated](
         success=True,
         message="Application submitted successfully",
-        object={
-            "application_id": application.id,
-            "job_id": job_id,
-            "resume_link": resume_url,
-            "cover_letter": cover_letter,
-            "status": application.status,
-            "applied_at": application.created_at
-        }
-    )
+        object=schemas.ApplicationCreated(
+            application_id=application.id,
+            job_id=str(job_id),
+            resume_link=resume_url,
+            cover_letter=cover_letter,
+            status=application.status,
+            applied_at=application.applied_at
+        )
+    ))
@@ -1,8 +1,12 @@
-from pydantic import BaseModel, EmailStr, constr, validator
-from typing import Optional, List, Dict, Any
+from pydantic import BaseModel, ConfigDict, EmailStr, conlist, constr, model_validator, validator
+from typing import Optional, List, Dict, Any, Generic, TypeVar, Union
+from datetime import datetime
 import re
+from uuid import UUID
 import enum
 
+T = TypeVar("T")
+
 
 # ======================
 # Enums
@@ -17,33 +21,62 @@ class JobStatusEnum(str, enum.Enum):
     Closed = "Closed"
 
 class ApplicationStatusEnum(str, enum.Enum):
-    Pending = "Pending"
+    Applied = "Applied"
     Reviewed = "Reviewed"
-    Accepted = "Accepted"
+    Interview = "Interview"
     Rejected = "Rejected"
+    Hired = "Hired"
+
+class TransitionOutcomeEnum(str, enum.Enum):
+    updated = "updated"
+    unchanged = "unchanged"
+    invalid_transition = "invalid_transition"
+    not_found = "not_found"
+
+class ExportFormatEnum(str, enum.Enum):
+    csv = "csv"
+    ndjson = "ndjson"
 
 
 # ======================
 # Base response schemas
 # ======================
-class BaseResponse(BaseModel):
+# Both envelopes are generic over their payload: endpoints declare e.g.
+# BaseResponse[JobDetail] as response_model, while a bare BaseResponse (any
+# payload) still serves for errors.
+class BaseResponse(BaseModel, Generic[T]):
     success: bool
     message: str
-    object: Optional[Dict[str, Any]] = None
+    object: Optional[T] = None
     errors: Optional[List[str]] = None
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
+
+
+class OffsetPage(BaseModel, Generic[T]):
+    items: List[T]
+    total: int
+    page: int
+    size: int
+    pages: int
 
 
-class PaginatedResponse(BaseModel):
+class CursorPage(BaseModel, Generic[T]):
+    items: List[T]
+    total: Optional[int] = None
+    size: int
+    next_cursor: Optional[str]
+
+
+class PaginatedResponse(BaseModel, Generic[T]):
     success: bool
     message: str
-    object: Dict[str, Any]  # { "items": [...], "total": int, "page": int, "size": int }
+    # page mode:   { "items": [...], "total": int, "page": int, "size": int, "pages": int }
+    # cursor mode: { "items": [...], "total": int | None, "size": int, "next_cursor": str | None }
+    object: Optional[Union[OffsetPage[T], CursorPage[T]]] = None
     errors: Optional[List[str]] = None
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # ======================
@@ -79,6 +112,10 @@ class UserLogin(BaseModel):
     password: str
 
 
+class UserCreated(BaseModel):
+    user_id: str
+
+
 class LoginResponseObject(BaseModel):
     token: str
 
@@ -100,30 +137,61 @@ class JobUpdate(BaseModel):
     status: Optional[JobStatusEnum] = None
 
 
+class JobRef(BaseModel):
+    job_id: str
+
+
 class JobListItem(BaseModel):
-    id: int
+    id: str
     title: str
     description: str
     location: Optional[str]
     status: JobStatusEnum
-    created_at: str
-    applications_count: int
+    created_at: datetime
+    company_name: str
+
+
+class RecommendedJob(JobListItem):
+    score: float
+
 
-    class Config:
-        orm_mode = True
+class FacetValue(BaseModel):
+    value: Optional[str]
+    label: Optional[str] = None  # display name, for values that are ids
+    count: int
+
+
+class JobFacets(BaseModel):
+    location: List[FacetValue]
+    company: List[FacetValue]
+    status: List[FacetValue]
+
+
+class JobBrowseResponse(PaginatedResponse[JobListItem]):
+    facets: Optional[JobFacets] = None
+
+
+class MyJobListItem(BaseModel):
+    id: str
+    title: str
+    description: str
+    location: Optional[str]
+    status: JobStatusEnum
+    created_at: datetime
+    applications_count: int
+    applications_by_status: Dict[ApplicationStatusEnum, int]
+    archived: bool = False
 
 
 class JobDetail(BaseModel):
-    id: int
+    id: str
     title: str
     description: str
     location: Optional[str]
     status: JobStatusEnum
-    created_at: str
+    created_at: datetime
     created_by: str
-
-    class Config:
-        orm_mode = True
+    archived: bool = False
 
 
 # ======================
@@ -132,9 +200,44 @@ class JobDetail(BaseModel):
 class ApplicationListItem(BaseModel):
     applicant_name: str
     resume_link: str
-    cover_letter: str
+    cover_letter: Optional[str]
+    status: ApplicationStatusEnum
+    applied_at: datetime
+
+
+class ApplicationStatusUpdate(BaseModel):
     status: ApplicationStatusEnum
-    applied_at: str
+    # which of the job's applications to move: these ids, those currently in status_filter, or
+    # both (ids outside the filter are then reported as not_found)
+    application_ids: Optional[conlist(UUID, min_length=1, max_length=5000)] = None
+    status_filter: Optional[ApplicationStatusEnum] = None
 
-    class Config:
-        orm_mode = True
+    @model_validator(mode="after")
+    def has_selection(self):
+        if self.application_ids is None and self.status_filter is None:
+            raise ValueError("Give application_ids, status_filter or both.")
+        return self
+
+
+class ApplicationTransition(BaseModel):
+    application_id: str
+    outcome: TransitionOutcomeEnum
+    previous_status: Optional[ApplicationStatusEnum]
+
+
+class ApplicationStatusUpdateResult(BaseModel):
+    status: ApplicationStatusEnum
+    updated: int
+    unchanged: int
+    invalid_transition: int
+    not_found: int
+    results: List[ApplicationTransition]
+
+
+class ApplicationCreated(BaseModel):
+    application_id: str
+    job_id: str
+    resume_link: str
+    cover_letter: Optional[str]
+    status: ApplicationStatusEnum
+    applied_at: datetime
@@ -0,0 +1,156 @@
+# search.py
+"""
+Full-text search over the job catalog.
+
+SQLite keeps an FTS5 index (``jobs_fts``) whose rowids are handed out by
+``job_search_keys``; Postgres keeps a weighted tsvector per job in
+``job_search`` behind a GIN index. In both cases database triggers on ``jobs``
+(and on company renames in ``users``) keep the index in sync, so every write
+path updates it in the same transaction as the job row itself. The tables
+and triggers are created by the migrations (migrations/versions/0001).
+
+Extracted resume text (resumes.py) is indexed the same way: ``resume_fts``
+on SQLite, a generated tsvector column of ``resume_texts`` on Postgres
+(migrations/versions/0007).
+"""
+import re
+from typing import Optional
+
+from sqlalchemy import Float, String, text
+from sqlalchemy.orm import Session
+
+from guid import GUID
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# bm25 column weights for SQLite, in jobs_fts column order
+_BM25_WEIGHTS = "10.0, 1.0, 2.0, 2.0"
+
+# tsvector weight classes for Postgres
+_PG_WEIGHTS = {"title": "A", "description": "B", "location": "C", "company_name": "D"}
+
+
+def rebuild(db: Session) -> int:
+    """
+    Repopulates the index from the jobs table, e.g. if it was damaged or has
+    drifted (`python manage.py rebuild-search`); returns the number of jobs
+    indexed. Does not commit.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        db.execute(text("DELETE FROM jobs_fts"))
+        db.execute(text("DELETE FROM job_search_keys"))
+        db.execute(text("INSERT INTO job_search_keys (job_id) SELECT id FROM jobs"))
+        return db.execute(text(
+            "INSERT INTO jobs_fts (rowid, title, description, location, company_name) "
+            "SELECT k.id, j.title, j.description, j.location, u.name "
+            "FROM job_search_keys k JOIN jobs j ON j.id = k.job_id "
+            "LEFT JOIN users u ON u.id = j.created_by"
+        )).rowcount
+    if dialect == "postgresql":
+        return db.execute(text(
+            "INSERT INTO job_search (job_id, document) "
+            "SELECT j.id, job_search_document(j) FROM jobs j "
+            "ON CONFLICT (job_id) DO UPDATE SET document = EXCLUDED.document"
+        )).rowcount
+    raise NotImplementedError(f"Full-text search is not supported on {dialect}")
+
+
+def tokenize(value: Optional[str]):
+    return _TOKEN_RE.findall(value or "")
+
+
+def _fts5_terms(value: Optional[str]) -> Optional[str]:
+    tokens = tokenize(value)
+    if not tokens:
+        return None
+    return "(" + " AND ".join(f'"{t}"*' for t in tokens) + ")"
+
+
+def _tsquery_terms(value: Optional[str], weight: str = "") -> Optional[str]:
+    tokens = tokenize(value.lower() if value else None)
+    if not tokens:
+        return None
+    return "(" + " & ".join(f"{t}:*{weight}" for t in tokens) + ")"
+
+
+def match_subquery(
+    db: Session,
+    q: Optional[str] = None,
+    title: Optional[str] = None,
+    location: Optional[str] = None,
+    company_name: Optional[str] = None,
+):
+    """
+    Returns a subquery of (job_id, score) for jobs matching every given filter,
+    where a higher score means a more relevant match. Each filter matches the
+    words it contains as prefixes, so "pyth eng" finds "Python Engineer".
+    Returns None when no filter carries any searchable words.
+    """
+    dialect = db.get_bind().dialect.name
+    scoped = {"title": title, "location": location, "company_name": company_name}
+
+    if dialect == "sqlite":
+        clauses = [_fts5_terms(q)] + [
+            f"{column} : {terms}" if terms else None
+            for column, terms in ((c, _fts5_terms(v)) for c, v in scoped.items())
+        ]
+        clauses = [c for c in clauses if c]
+        if not clauses:
+            return None
+        stmt = text(
+            f"SELECT k.job_id AS job_id, -bm25(jobs_fts, {_BM25_WEIGHTS}) AS score "
+            "FROM jobs_fts JOIN job_search_keys k ON k.id = jobs_fts.rowid "
+            "WHERE jobs_fts MATCH :match"
+        ).bindparams(match=" AND ".join(clauses))
+
+    elif dialect == "postgresql":
+        clauses = [_tsquery_terms(q)] + [
+            _tsquery_terms(v, _PG_WEIGHTS[c]) for c, v in scoped.items()
+        ]
+        clauses = [c for c in clauses if c]
+        if not clauses:
+            return None
+        stmt = text(
+            "SELECT s.job_id AS job_id, ts_rank(s.document, query) AS score "
+            "FROM job_search s, to_tsquery('simple', :match) query "
+            "WHERE s.document @@ query"
+        ).bindparams(match=" & ".join(clauses))
+
+    else:
+        raise NotImplementedError(f"Full-text search is not supported on {dialect}")
+
+    return stmt.columns(job_id=GUID, score=Float).subquery("hits")
+
+
+def resume_match_subquery(db: Session, keywords: Optional[str]):
+    """
+    Returns a subquery of the resume_link of every extracted resume containing
+    all the words of `keywords` (as prefixes, like match_subquery), or None
+    when `keywords` has no searchable words.
+    """
+    dialect = db.get_bind().dialect.name
+
+    if dialect == "sqlite":
+        terms = _fts5_terms(keywords)
+        if not terms:
+            return None
+        stmt = text(
+            "SELECT r.resume_link AS resume_link "
+            "FROM resume_fts JOIN resume_texts r ON r.id = resume_fts.rowid "
+            "WHERE resume_fts MATCH :match"
+        ).bindparams(match=terms)
+
+    elif dialect == "postgresql":
+        terms = _tsquery_terms(keywords)
+        if not terms:
+            return None
+        stmt = text(
+            "SELECT r.resume_link AS resume_link FROM resume_texts r "
+            "WHERE r.document @@ to_tsquery('simple', :match)"
+        ).bindparams(match=terms)
+
+    else:
+        raise NotImplementedError(f"Full-text search is not supported on {dialect}")
+
+    return stmt.columns(resume_link=String).subquery("resume_hits")
@@ -0,0 +1,109 @@
+# serve.py
+"""
+Production server entry point.
+
+    python serve.py
+
+Runs the app under gunicorn with uvicorn workers: WEB_CONCURRENCY worker
+processes (default: one per CPU core), forked from a master that has already
+imported the app (SERVER_PRELOAD), so workers start in milliseconds and share
+the imported code pages. On SIGTERM the master stops accepting connections,
+lets each worker finish its in-flight requests for up to
+SERVER_GRACEFUL_TIMEOUT_SECONDS and then runs the app's lifespan shutdown
+(main.lifespan). MAX_REQUESTS recycles workers to bound slow leaks.
+
+Where gunicorn is unavailable (e.g. Windows) it falls back to uvicorn's own
+multi-process supervisor, which has the same graceful shutdown but imports
+the app in every worker.
+
+Settings are read from the environment; a .env file in the working directory
+is loaded first, here rather than at import time of the app modules.
+"""
+import os
+
+
+def _env_bool(name: str, default: str) -> bool:
+    return os.getenv(name, default).lower() in ("1", "true", "yes")
+
+
+def settings() -> dict:
+    return {
+        "host": os.getenv("HOST", "0.0.0.0"),
+        "port": int(os.getenv("PORT", "8000")),
+        "workers": int(os.getenv("WEB_CONCURRENCY") or os.cpu_count() or 1),
+        "preload": _env_bool("SERVER_PRELOAD", "true"),
+        "graceful_timeout": int(os.getenv("SERVER_GRACEFUL_TIMEOUT_SECONDS", "30")),
+        "keepalive": int(os.getenv("SERVER_KEEPALIVE_SECONDS", "5")),
+        "max_requests": int(os.getenv("MAX_REQUESTS", "0")),
+        "max_requests_jitter": int(os.getenv("MAX_REQUESTS_JITTER", "0")),
+    }
+
+
+def _post_fork(server, worker):
+    # with preload the engines were created in the master; start each worker with empty pools
+    import database
+    database.reset_after_fork()
+
+
+def run_gunicorn(config: dict):
+    from gunicorn.app.base import BaseApplication
+
+    try:
+        import uvicorn_worker  # noqa: F401
+        worker_class = "uvicorn_worker.UvicornWorker"
+    except ImportError:
+        worker_class = "uvicorn.workers.UvicornWorker"
+
+    class Server(BaseApplication):
+        def load_config(self):
+            options = {
+                "bind": f"{config['host']}:{config['port']}",
+                "workers": config["workers"],
+                "worker_class": worker_class,
+                "preload_app": config["preload"],
+                "graceful_timeout": config["graceful_timeout"],
+                "keepalive": config["keepalive"],
+                "max_requests": config["max_requests"],
+                "max_requests_jitter": config["max_requests_jitter"],
+                "post_fork": _post_fork,
+                "accesslog": "-",
+            }
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            from main import app
+            return app
+
+    Server().run()
+
+
+def run_uvicorn(config: dict):
+    import uvicorn
+
+    uvicorn.run(
+        "main:app",
+        host=config["host"],
+        port=config["port"],
+        workers=config["workers"],
+        timeout_graceful_shutdown=config["graceful_timeout"],
+        timeout_keep_alive=config["keepalive"],
+        limit_max_requests=config["max_requests"] or None,
+    )
+
+
+def main():
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    config = settings()
+    try:
+        import gunicorn  # noqa: F401
+    except ImportError:
+        run_uvicorn(config)
+    else:
+        run_gunicorn(config)
+
+
+if __name__ == "__main__":
+    main()
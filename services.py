@@ -1,16 +1,19 @@
 # services.py
+from sqlalchemy.orm import Session
+
+import notifications
 from utils import APP_BASE_URL
 
-def send_verification_email(to_email: str, token: str):
+def send_verification_email(db: Session, to_email: str, token: str):
     """
-    Dev helper: prints the verification URL.
-    Replace with SMTP or an email provider in production.
+    Queues the verification email in the caller's transaction; the outbox
+    dispatcher delivers it through the configured transport (NOTIFY_TRANSPORT).
     """
     verify_url = f"{APP_BASE_URL}/api/verify-email?token={token}"
-    # In production: send email via SMTP / provider.
-    print("=== VERIFICATION EMAIL ===")
-    print(f"To: {to_email}")
-    print("Subject: Verify your email")
-    print("Body:")
-    print(f"Click to verify: {verify_url}")
-    print("==========================")
+    notifications.enqueue(
+        db,
+        kind="verify_email",
+        recipient=to_email,
+        subject="Verify your email",
+        body=f"Click to verify: {verify_url}"
+    )
@@ -0,0 +1,173 @@
+# storage.py
+"""
+Pluggable storage for uploaded resumes.
+
+The default backend is a local content-addressed blob store: uploads are
+streamed to disk in fixed-size chunks while their SHA-256 is computed, so
+memory per upload stays constant, and identical files are stored once under
+their hash. The size limit is enforced while streaming and the file type is
+decided from its magic bytes, never from the client's Content-Type.
+"""
+import hashlib
+import os
+import tempfile
+import zipfile
+from dataclasses import dataclass
+from typing import BinaryIO, Callable, Dict, Iterable, Optional
+
+RESUME_STORAGE_BACKEND = os.getenv("RESUME_STORAGE_BACKEND", "local")
+RESUME_STORAGE_DIR = os.getenv("RESUME_STORAGE_DIR", "./resumes")
+RESUME_MAX_BYTES = int(os.getenv("RESUME_MAX_BYTES", str(5 * 1024 * 1024)))
+
+CHUNK_SIZE = 64 * 1024
+
+PDF = "application/pdf"
+DOCX = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+RESUME_TYPES = (PDF, DOCX)
+
+
+class StorageError(Exception):
+    pass
+
+
+class FileTooLarge(StorageError):
+    pass
+
+
+class UnsupportedFileType(StorageError):
+    pass
+
+
+@dataclass
+class StoredBlob:
+    link: str          # what gets saved in Application.resume_link
+    sha256: str
+    size: int
+    content_type: str
+    created: bool      # False when an identical file was already stored
+
+
+def sniff_content_type(head: bytes, path: str) -> Optional[str]:
+    """Content type from the file's leading bytes (and, for zip containers, its directory)."""
+    if head.startswith(b"%PDF-"):
+        return PDF
+    if head.startswith(b"PK\x03\x04"):
+        try:
+            with zipfile.ZipFile(path) as archive:
+                if "word/document.xml" in archive.namelist():
+                    return DOCX
+        except zipfile.BadZipFile:
+            return None
+    return None
+
+
+class StorageBackend:
+    scheme = ""
+
+    def save(self, stream: BinaryIO, allowed_types: Iterable[str] = RESUME_TYPES,
+             max_bytes: int = RESUME_MAX_BYTES) -> StoredBlob:
+        """Stores `stream` durably and returns where it went; raises StorageError subclasses on rejection."""
+        raise NotImplementedError
+
+    def open(self, link: str) -> BinaryIO:
+        raise NotImplementedError
+
+
+class LocalBlobStore(StorageBackend):
+    """Blobs live at <root>/<aa>/<bb>/<sha256>; links look like local://<sha256>."""
+
+    scheme = "local"
+
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+        self.tmp_dir = os.path.join(self.root, "tmp")
+
+    def path_for(self, digest: str) -> str:
+        return os.path.join(self.root, digest[:2], digest[2:4], digest)
+
+    def save(self, stream: BinaryIO, allowed_types: Iterable[str] = RESUME_TYPES,
+             max_bytes: int = RESUME_MAX_BYTES) -> StoredBlob:
+        os.makedirs(self.tmp_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.tmp_dir)
+        try:
+            hasher = hashlib.sha256()
+            size = 0
+            head = b""
+            with os.fdopen(fd, "wb") as out:
+                while True:
+                    chunk = stream.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    if size > max_bytes:
+                        raise FileTooLarge(f"File exceeds {max_bytes} bytes")
+                    if len(head) < 8:
+                        head += chunk[:8 - len(head)]
+                    hasher.update(chunk)
+                    out.write(chunk)
+                out.flush()
+                os.fsync(out.fileno())
+
+            content_type = sniff_content_type(head, tmp_path)
+            if content_type not in allowed_types:
+                raise UnsupportedFileType("File content is not an accepted type")
+
+            digest = hasher.hexdigest()
+            final_path = self.path_for(digest)
+            created = not os.path.exists(final_path)
+            if created:
+                os.makedirs(os.path.dirname(final_path), exist_ok=True)
+                os.replace(tmp_path, final_path)
+                _fsync_dir(os.path.dirname(final_path))
+            return StoredBlob(
+                link=f"{self.scheme}://{digest}",
+                sha256=digest,
+                size=size,
+                content_type=content_type,
+                created=created,
+            )
+        finally:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+
+    def open(self, link: str) -> BinaryIO:
+        prefix = f"{self.scheme}://"
+        if not link.startswith(prefix):
+            raise StorageError(f"Not a {self.scheme} link: {link}")
+        return open(self.path_for(link[len(prefix):]), "rb")
+
+
+def _fsync_dir(path: str):
+    # makes the rename itself durable; not supported on every platform
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+_BACKENDS: Dict[str, Callable[[], StorageBackend]] = {
+    "local": lambda: LocalBlobStore(RESUME_STORAGE_DIR),
+}
+
+_backend: Optional[StorageBackend] = None
+
+
+def register_backend(name: str, factory: Callable[[], StorageBackend]):
+    _BACKENDS[name] = factory
+
+
+def get_backend() -> StorageBackend:
+    global _backend
+    if _backend is None:
+        try:
+            _backend = _BACKENDS[RESUME_STORAGE_BACKEND]()
+        except KeyError:
+            raise StorageError(f"Unknown RESUME_STORAGE_BACKEND: {RESUME_STORAGE_BACKEND}")
+    return _backend
@@ -0,0 +1,151 @@
+import io
+import zipfile
+import zlib
+from datetime import datetime
+
+import pytest
+
+import extraction
+import models
+import resumes
+
+
+def make_pdf(content: bytes, flate: bool = True) -> bytes:
+    if flate:
+        content = zlib.compress(content)
+        dictionary = b"<< /Length %d /Filter /FlateDecode >>" % len(content)
+    else:
+        dictionary = b"<< /Length %d >>" % len(content)
+    return (b"%PDF-1.4\n1 0 obj << /Type /Catalog >> endobj\n4 0 obj " + dictionary
+            + b"\nstream\n" + content + b"\nendstream\nendobj\ntrailer << >>\n%%EOF")
+
+
+def make_docx(document_xml: str) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", "<Types/>")
+        archive.writestr("word/document.xml", document_xml)
+    return buffer.getvalue()
+
+
+def paragraphs(*runs: str) -> str:
+    body = "".join(f'<w:p><w:r><w:t xml:space="preserve">{run}</w:t></w:r></w:p>' for run in runs)
+    return f'<?xml version="1.0"?><w:document><w:body>{body}</w:body></w:document>'
+
+
+# ======================
+# extraction.extract
+# ======================
+def test_flate_pdf_text_with_kerning_and_escapes():
+    pdf = make_pdf(b"BT /F1 12 Tf 72 712 Td (Senior \\(Python\\)) Tj T* [(Dev) 20 (eloper) -300 (K\\366ln)] TJ ET")
+    assert extraction.extract(pdf, 1000) == "Senior (Python) Developer Köln"
+
+
+def test_uncompressed_pdf_text():
+    assert extraction.extract(make_pdf(b"BT (Data engineer) Tj ET", flate=False), 1000) == "Data engineer"
+
+
+def test_pdf_without_text_fails():
+    with pytest.raises(extraction.ExtractionError):
+        extraction.extract(b"%PDF-1.4\nno content streams here", 1000)
+
+
+def test_docx_entities_tabs_and_paragraphs():
+    xml = paragraphs("Kubernetes &amp; PostgreSQL", "C&#43;&#x2B; &lt;senior&gt;").replace(
+        "</w:t></w:r></w:p><w:p>", "</w:t><w:tab/><w:t>Go</w:t></w:r></w:p><w:p>", 1)
+    assert extraction.extract(make_docx(xml), 1000) == "Kubernetes & PostgreSQL Go C++ <senior>"
+
+
+def test_text_is_normalized_and_capped():
+    docx = make_docx(paragraphs("ﬁnance   lead", "x" * 50))
+    assert extraction.extract(docx, 1000).startswith("finance lead x")
+    assert len(extraction.extract(docx, 20)) == 20
+
+
+def test_truncated_docx_fails():
+    docx = make_docx(paragraphs("Python developer"))
+    with pytest.raises(extraction.ExtractionError):
+        extraction.extract(docx[:len(docx) // 2], 1000)
+
+
+def test_bad_zip_fails():
+    with pytest.raises(extraction.ExtractionError):
+        extraction.extract(b"PK\x03\x04 not really a zip file", 1000)
+
+
+def test_zip_without_document_fails():
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("notes.txt", "hello")
+    with pytest.raises(extraction.ExtractionError):
+        extraction.extract(buffer.getvalue(), 1000)
+
+
+def test_oversize_document_xml_is_read_up_to_the_cap(monkeypatch):
+    monkeypatch.setattr(extraction, "DOCX_MAX_XML_BYTES", 400)
+    # compresses to almost nothing, but would decompress far past the cap
+    docx = make_docx(paragraphs("Python developer", "filler " * 200_000, "Kubernetes"))
+    text = extraction.extract(docx, 10_000)
+    assert text.startswith("Python developer")
+    assert "Kubernetes" not in text
+
+
+def test_other_files_are_rejected():
+    with pytest.raises(extraction.ExtractionError):
+        extraction.extract(b"GIF89a...", 1000)
+
+
+# ======================
+# resumes.Extractor._extract
+# ======================
+class FakeProcess:
+    def __init__(self, outcome):
+        self.outcome = outcome
+
+    def extract(self, data: bytes) -> str:
+        if isinstance(self.outcome, Exception):
+            raise self.outcome
+        return self.outcome
+
+
+def claimed_row(attempts: int = 0) -> models.ResumeText:
+    return models.ResumeText(resume_link="local://abc", status=models.ExtractionStatus.extracting, attempts=attempts,
+                             next_attempt_at=datetime.utcnow(), claimed_by="me", claimed_at=datetime.utcnow())
+
+
+@pytest.fixture(autouse=True)
+def stored_file(monkeypatch):
+    monkeypatch.setattr(resumes, "_read", lambda link: b"%PDF-1.4")
+
+
+def test_extracted_text_is_stored():
+    row = claimed_row()
+    resumes.Extractor()._extract(row, FakeProcess("python developer"))
+    assert row.status == models.ExtractionStatus.done
+    assert row.body == "python developer"
+    assert row.attempts == 1 and row.claimed_by is None and row.extracted_at is not None
+
+
+def test_timeout_is_retried_later():
+    row = claimed_row()
+    before = datetime.utcnow()
+    resumes.Extractor()._extract(row, FakeProcess(resumes.ExtractionTimeout("too slow")))
+    assert row.status == models.ExtractionStatus.pending
+    assert row.attempts == 1
+    assert row.next_attempt_at > before
+    assert "ExtractionTimeout" in row.last_error
+    assert row.body is None
+
+
+def test_timeout_fails_after_the_last_attempt():
+    row = claimed_row(attempts=resumes.RESUME_EXTRACT_MAX_ATTEMPTS - 1)
+    resumes.Extractor()._extract(row, FakeProcess(resumes.ExtractionTimeout("too slow")))
+    assert row.status == models.ExtractionStatus.failed
+
+
+def test_unparseable_file_fails_at_once():
+    row = claimed_row()
+    resumes.Extractor()._extract(row, FakeProcess(extraction.ExtractionError("No text found in PDF")))
+    assert row.status == models.ExtractionStatus.failed
+    assert row.attempts == 1
+    assert row.last_error == "No text found in PDF"
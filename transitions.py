@@ -0,0 +1,94 @@
+# transitions.py
+"""
+Application status transitions.
+
+Applications move forward through the pipeline Applied -> Reviewed ->
+Interview and end as Rejected or Hired; stages may be skipped, but never
+revisited, and the two end states are final. apply() moves a set of a job's
+applications to one target status: a single locking SELECT reads their
+current status (which also yields the per-application outcome), then one
+set-based UPDATE moves every eligible row, guarded by the statuses it was
+allowed to move from, and the job's counters are adjusted per previous status.
+"""
+from typing import Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+from sqlalchemy.orm import Session
+
+import counters
+import models
+
+Status = models.ApplicationStatus
+
+PIPELINE = (Status.applied, Status.reviewed, Status.interview)
+FINAL = (Status.rejected, Status.hired)
+
+# status -> statuses it may move to
+ALLOWED: Dict[Status, FrozenSet[Status]] = {
+    **{status: frozenset(PIPELINE[i + 1:] + FINAL) for i, status in enumerate(PIPELINE)},
+    **{status: frozenset() for status in FINAL},
+}
+
+UPDATED = "updated"
+UNCHANGED = "unchanged"
+INVALID_TRANSITION = "invalid_transition"
+NOT_FOUND = "not_found"
+
+
+class ConcurrentUpdate(Exception):
+    """Raised when rows changed status between the read and the UPDATE; the caller should roll back."""
+
+
+def can_transition(old: Status, new: Status) -> bool:
+    return new in ALLOWED[old]
+
+
+def sources(target: Status) -> List[Status]:
+    """Statuses an application may be moved to `target` from."""
+    return [status for status, targets in ALLOWED.items() if target in targets]
+
+
+def apply(db: Session, job_id: str, target: Status, application_ids: Optional[Sequence[str]] = None,
+          status_filter: Optional[Status] = None) -> List[Tuple[str, str, Optional[Status]]]:
+    """
+    Moves the job's applications selected by `application_ids` and/or
+    `status_filter` to `target`. Returns (application id, outcome, previous
+    status) per application, in request order for ids. Does not commit.
+    """
+    Application = models.Application
+    selected = db.query(Application.id, Application.status).filter(Application.job_id == job_id)
+    if application_ids is not None:
+        selected = selected.filter(Application.id.in_(application_ids))
+    if status_filter is not None:
+        selected = selected.filter(Application.status == status_filter)
+    current = dict(selected.with_for_update())
+
+    moved: Dict[Status, int] = {}
+    outcomes = []
+    requested = dict.fromkeys(application_ids) if application_ids is not None else current
+    for application_id in requested:
+        old = current.get(application_id)
+        if old is None:
+            outcomes.append((application_id, NOT_FOUND, None))
+        elif old == target:
+            outcomes.append((application_id, UNCHANGED, old))
+        elif not can_transition(old, target):
+            outcomes.append((application_id, INVALID_TRANSITION, old))
+        else:
+            outcomes.append((application_id, UPDATED, old))
+            moved[old] = moved.get(old, 0) + 1
+    if not moved:
+        return outcomes
+
+    update = db.query(Application).filter(Application.job_id == job_id, Application.status.in_(sources(target)))
+    if application_ids is not None:
+        eligible = [application_id for application_id, outcome, _ in outcomes if outcome == UPDATED]
+        update = update.filter(Application.id.in_(eligible))
+    if status_filter is not None:
+        update = update.filter(Application.status == status_filter)
+    updated = update.update({Application.status: target}, synchronize_session=False)
+    if updated != sum(moved.values()):
+        raise ConcurrentUpdate(f"expected to update {sum(moved.values())} applications, updated {updated}")
+
+    for old, count in moved.items():
+        counters.record_transition(db, job_id, old, target, count)
+    return outcomes
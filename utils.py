@@ -1,26 +1,28 @@
 # utils.py
 import os
 from datetime import datetime, timedelta
+from functools import lru_cache
 from jose import jwt, JWTError, ExpiredSignatureError
 from passlib.context import CryptContext
-from dotenv import load_dotenv
-
-load_dotenv()
 
 SECRET_KEY = os.getenv("SECRET_KEY", "dev-secret")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "60"))
 VERIFICATION_TOKEN_EXPIRE_MINUTES = int(os.getenv("VERIFICATION_TOKEN_EXPIRE_MINUTES", "60"))
 APP_BASE_URL = os.getenv("APP_BASE_URL", "http://localhost:8000")
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# built on first use, so importing the app stays cheap (and hash pool workers build their own)
+@lru_cache(maxsize=None)
+def pwd_context() -> CryptContext:
+    return CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
 
-# hashing
+# hashing (CPU-heavy: request handlers go through the pool in hashing.py)
 def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+    return pwd_context().hash(password)
 
 def verify_password(plain: str, hashed: str) -> bool:
-    return pwd_context.verify(plain, hashed)
+    return pwd_context().verify(plain, hashed)
 
 # verification token (email)
 def create_verification_token(subject: str) -> str: